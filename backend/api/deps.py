@@ -1,6 +1,6 @@
 """FastAPI dependency injection functions for database connections."""
 from typing import Generator
-from db import FileDB, ConversionDB, ConversionRelationsDB
+from db import FileDB, ConversionDB, ConversionRelationsDB, UploadSessionDB, ConverterStatsDB
 
 
 def get_file_db() -> Generator[FileDB, None, None]:
@@ -28,3 +28,21 @@ def get_conversion_relations_db() -> Generator[ConversionRelationsDB, None, None
         yield db
     finally:
         db.close()
+
+
+def get_upload_session_db() -> Generator[UploadSessionDB, None, None]:
+    """Dependency that provides an UploadSessionDB instance and ensures cleanup."""
+    db = UploadSessionDB()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_converter_stats_db() -> Generator[ConverterStatsDB, None, None]:
+    """Dependency that provides a ConverterStatsDB instance and ensures cleanup."""
+    db = ConverterStatsDB()
+    try:
+        yield db
+    finally:
+        db.close()
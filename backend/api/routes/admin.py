@@ -0,0 +1,63 @@
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from core import get_settings
+from core.profiling import is_profile_id, list_profiles
+from api.schemas import ProfileListResponse, ErrorResponse
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+settings = get_settings()
+
+PROFILE_MEDIA_TYPES = {"prof": "application/octet-stream", "txt": "text/plain"}
+
+
+def require_profiling():
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+
+@router.get(
+    "/profiles",
+    summary="List captured request profiles",
+    responses={
+        200: {
+            "model": ProfileListResponse,
+            "description": "Captured profiles, newest first"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Profiling is disabled"
+        }
+    }
+)
+def get_profiles():
+    """List the request profiles captured by the profiling middleware"""
+    require_profiling()
+    return {"profiles": list_profiles(settings.profile_dir)}
+
+
+@router.get(
+    "/profiles/{profile_id}/{kind}",
+    summary="Download a request profile",
+    response_class=FileResponse,
+    responses={
+        200: {
+            "content": {"application/octet-stream": {}, "text/plain": {}},
+            "description": "cProfile stats (prof) or the text report with top functions and allocations (txt)"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Profile not found"
+        }
+    }
+)
+def download_profile(profile_id: str, kind: Literal["prof", "txt"]):
+    """Download the cProfile stats or the text report of a captured profile"""
+    require_profiling()
+    if not is_profile_id(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    path = settings.profile_dir / f"{profile_id}.{kind}"
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path=path, filename=path.name, media_type=PROFILE_MEDIA_TYPES[kind])
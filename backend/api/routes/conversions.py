@@ -1,24 +1,56 @@
 import json
+import time
+import asyncio
+import shutil
 from pathlib import Path
 import uuid
-import hashlib
-from fastapi import APIRouter, Depends, HTTPException
-from converters import ConverterInterface
-from registry import ConverterRegistry
-from core import get_settings, sanitize_extension, delete_file_and_metadata, validate_safe_path
-from db import ConversionDB, FileDB, ConversionRelationsDB
-from api.deps import get_file_db, get_conversion_db, get_conversion_relations_db
-from api.schemas import ConversionRequest, ConversionListResponse, FileMetadata, ErrorResponse, FileDeleteResponse
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from registry import get_registry
+from core import get_settings, sanitize_extension, delete_file_and_metadata, validate_safe_path, move_and_hash, link_or_copy
+from core import metrics
+from core.timing import phase, annotate
+from core.scheduler import get_scheduler
+from core.admission import get_admission_controller
+from core.worker_pool import ConversionTask, get_worker_pool
+from core.resource_limits import ConversionLimitExceeded
+from converters import InvalidConversionOptions
+from core.coalescing import Coalescer
+from core.estimator import work_measure, estimate_conversion
+from db import ConversionDB, FileDB, ConversionRelationsDB, ConverterStatsDB
+from api.deps import get_file_db, get_conversion_db, get_conversion_relations_db, get_converter_stats_db
+from api.schemas import ConversionRequest, ConversionListResponse, FileMetadata, ErrorResponse, FileDeleteResponse, ConverterSelectionResponse, ConversionEstimate, ConverterUsageResponse
 
 
 router = APIRouter(prefix="/conversions", tags=["conversions"])
-registry = ConverterRegistry()
+registry = get_registry()
 settings = get_settings()
+inflight_conversions = Coalescer("conversion_inflight")
 UPLOAD_DIR = settings.upload_dir
 TEMP_DIR = settings.tmp_dir
 CONVERTED_DIR = settings.output_dir
 
 
+def estimate_for(metadata: dict, converter_name: str, cost_pair: tuple, pair_stats: dict, converter_stats_db: ConverterStatsDB) -> dict:
+    """
+    Estimate a conversion of a stored file from the converter's history.
+
+    Args:
+        metadata: Stored metadata of the input file
+        converter_name: Converter that would run the conversion
+        cost_pair: Normalized (input format, output format)
+        pair_stats: Observed totals per converter name for the format pair
+        converter_stats_db: Database with the estimator's history
+
+    Returns:
+        Estimate as returned by core.estimator.estimate_conversion
+    """
+    work_unit, _ = work_measure(metadata)
+    model = converter_stats_db.get_model(converter_name, *cost_pair, work_unit)
+    prior_seconds = registry.estimate_seconds(converter_name, metadata['size_bytes'], pair_stats)
+    return estimate_conversion(metadata, model, prior_seconds)
+
+
 @router.get(
         "/complete",
         summary="List completed conversions",
@@ -59,6 +91,103 @@ def list_conversions(
     return {"conversions": conversion_records}
 
 
+@router.get(
+        "/converters",
+        summary="Show how a converter is chosen for a format pair",
+        responses={
+            200: {
+                "model": ConverterSelectionResponse,
+                "description": "Candidate converters, preferred first, with their priority and observed cost"
+            }
+        }
+)
+def get_converter_selection(
+    input_format: str = Query(..., description="Input file format"),
+    output_format: str = Query(..., description="Target format"),
+    converter_stats_db: ConverterStatsDB = Depends(get_converter_stats_db)
+):
+    """Rank the converters that support a conversion, as used to pick one for it."""
+    input_format = registry.get_normalized_format(sanitize_extension(input_format))
+    output_format = registry.get_normalized_format(sanitize_extension(output_format))
+    candidates = registry.rank_converters(
+        input_format, output_format, converter_stats_db.get_pair_stats(input_format, output_format)
+    )
+    return {
+        "input_format": input_format,
+        "output_format": output_format,
+        "selected": candidates[0]['name'] if candidates else None,
+        "candidates": candidates
+    }
+
+
+@router.get(
+        "/stats",
+        summary="Resource usage per converter and format pair",
+        responses={
+            200: {
+                "model": ConverterUsageResponse,
+                "description": "CPU time, memory, I/O and outcomes of past conversions, aggregated per converter and format pair"
+            }
+        }
+)
+def get_conversion_stats(converter_stats_db: ConverterStatsDB = Depends(get_converter_stats_db)):
+    """Aggregate the recorded resource usage of conversions, for capacity planning."""
+    return {"stats": converter_stats_db.usage_summary()}
+
+
+@router.get(
+        "/estimate",
+        summary="Estimate a conversion before running it",
+        responses={
+            200: {
+                "model": ConversionEstimate,
+                "description": "Estimated conversion time, output size and queue wait"
+            },
+            400: {
+                "model": ErrorResponse,
+                "description": "No converter found for the conversion"
+            },
+            404: {
+                "model": ErrorResponse,
+                "description": "File not found"
+            }
+        }
+)
+async def get_conversion_estimate(
+    id: str = Query(..., description="ID of the uploaded file"),
+    output_format: str = Query(..., description="Target format"),
+    priority: Optional[Literal["interactive", "bulk"]] = Query(None, description="Scheduler lane the conversion would be requested with"),
+    file_db: FileDB = Depends(get_file_db),
+    converter_stats_db: ConverterStatsDB = Depends(get_converter_stats_db)
+):
+    """Estimate how long converting a file would take and how large the result would be, learned from past conversions."""
+    og_metadata = file_db.get_file_metadata(id)
+    if og_metadata is None:
+        raise HTTPException(status_code=404, detail=f"No file found with id {id}")
+    input_format = og_metadata['media_type']
+    output_format = sanitize_extension(output_format)
+
+    cost_pair = (registry.get_normalized_format(input_format), registry.get_normalized_format(output_format))
+    pair_stats = converter_stats_db.get_pair_stats(*cost_pair)
+    converter_name = registry.select_converter(input_format, output_format, pair_stats)
+    if converter_name is None:
+        raise HTTPException(status_code=400, detail=f"No converter found for {input_format} to {output_format}")
+
+    estimate = estimate_for(og_metadata, converter_name, cost_pair, pair_stats, converter_stats_db)
+    scheduler = get_scheduler()
+    lane = scheduler.classify(estimate['estimated_seconds'], priority)
+    queue_seconds, _ = scheduler.forecast((lane, estimate['estimated_seconds']))["new"]
+    return {
+        "file_id": id,
+        "converter": converter_name,
+        "input_format": input_format,
+        "output_format": output_format,
+        "lane": lane,
+        **estimate,
+        "estimated_queue_seconds": round(queue_seconds, 3),
+    }
+
+
 @router.post(
         "/",
         summary="Create a new conversion",
@@ -69,19 +198,25 @@ def list_conversions(
             },
             400: {
                 "model": ErrorResponse,
-                "description": "Invalid input or conversion error (no converter found)"
+                "description": "Invalid input or conversion error (no converter found, or options that do not fit the file, e.g. an unknown column)"
             },
             404: {
                 "model": ErrorResponse,
                 "description": "File not found"
+            },
+            422: {
+                "model": ErrorResponse,
+                "description": "The conversion exceeded its CPU time, memory or wall-clock limit, or the image pixel or memory budget"
             }
         }
 )
 async def create_conversion(
     conversion_request: ConversionRequest,
+    request: Request,
     file_db: FileDB = Depends(get_file_db),
     conversion_db: ConversionDB = Depends(get_conversion_db),
-    conversion_relations_db: ConversionRelationsDB = Depends(get_conversion_relations_db)
+    conversion_relations_db: ConversionRelationsDB = Depends(get_conversion_relations_db),
+    converter_stats_db: ConverterStatsDB = Depends(get_converter_stats_db)
 ):
     """Create a new conversion for a previously uploaded file."""
     og_id = conversion_request.id
@@ -93,30 +228,179 @@ async def create_conversion(
         raise HTTPException(status_code=404, detail=f"No file found with id {og_id}")
     
     # Validate the original file's storage path
-    validate_safe_path(og_metadata['storage_path'], raise_exception=True)
+    with phase("validate"):
+        validate_safe_path(og_metadata['storage_path'], raise_exception=True)
     
     input_format = og_metadata['media_type']
     converted_id = str(uuid.uuid4())
     converted_metadata = dict(og_metadata)
     
-    # Find the appropriate converter for this conversion
-    converter_type = registry.get_converter_for_conversion(input_format, output_format)
-    if converter_type is None:
+    # Find the cheapest converter for this conversion, from the costs observed so far
+    cost_pair = (registry.get_normalized_format(input_format), registry.get_normalized_format(output_format))
+    pair_stats = converter_stats_db.get_pair_stats(*cost_pair)
+    converter_name = registry.select_converter(input_format, output_format, pair_stats)
+    if converter_name is None:
         raise HTTPException(status_code=400, detail=f"No converter found for {input_format} to {output_format}")
 
-    # Perform the conversion using the converter interface
-    converter: ConverterInterface = converter_type(og_metadata['storage_path'], f'{TEMP_DIR}/', input_format, output_format)
-    output_files = converter.convert()
-    moved_output_file = Path(output_files[0]).rename(f'{CONVERTED_DIR}/{converted_id}.{output_format}')
+    # Describe the conversion so a worker process can run it. Converters name
+    # their output after the input, so every execution writes to its own
+    # directory; conversions of one file with other options run in parallel
+    job_dir = Path(TEMP_DIR) / converted_id
+    task = ConversionTask(
+        converter_name,
+        og_metadata['storage_path'],
+        f'{job_dir}/',
+        input_format,
+        output_format,
+        options=conversion_request.converter_options(),
+        quality=conversion_request.quality
+    )
+    metric_labels = {"converter": converter_name, "input_format": input_format, "output_format": output_format}
+
+    # Queue the conversion in a scheduler lane chosen by its estimated cost
+    scheduler = get_scheduler()
+    estimate = estimate_for(og_metadata, converter_name, cost_pair, pair_stats, converter_stats_db)
+    lane = scheduler.classify(estimate['estimated_seconds'], conversion_request.priority)
+    annotate(**metric_labels, input_size_bytes=og_metadata['size_bytes'], lane=lane)
+
+    worker_pool = get_worker_pool()
+    # Resources used by the job, filled in by run_conversion
+    job_usage = {}
+
+    def run_conversion():
+        started = time.perf_counter()
+        job_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            with phase("convert"):
+                # Pre-warmed worker process (with resource limits and usage
+                # accounting), or this process when they are disabled
+                output_files, usage = worker_pool.run(task) if worker_pool else (task.run(), {})
+            job_usage.update(usage)
+            return output_files
+        except Exception as e:
+            job_usage.update(getattr(e, "usage", None) or {})
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        finally:
+            job_usage['wall_seconds'] = time.perf_counter() - started
+
+    usage_record = {
+        "converter": converter_name,
+        "input_format": cost_pair[0],
+        "output_format": cost_pair[1],
+        "input_bytes": og_metadata['size_bytes']
+    }
+    client = get_admission_controller().client_id(request.scope)
+
+    async def execute_conversion():
+        # Shared by every identical request in flight, so it outlives this
+        # request's database connections and writes to a shared output path
+        stats_db = ConverterStatsDB()
+        try:
+            try:
+                output_files = await scheduler.run(
+                    run_conversion,
+                    lane=lane,
+                    client=client,
+                    cost=estimate['estimated_seconds'],
+                    info={
+                        "file_id": og_id,
+                        **metric_labels,
+                        "input_size_bytes": og_metadata['size_bytes'],
+                        "estimated_output_bytes": estimate['estimated_output_bytes']
+                    },
+                    # Every waiter left while it ran (a failed run removes it itself)
+                    discard=lambda output_files: shutil.rmtree(job_dir, ignore_errors=True)
+                )
+            except InvalidConversionOptions:
+                # Rejected by the converter before it converted anything
+                metrics.conversions_total.inc(**metric_labels, status="invalid")
+                raise
+            except ConversionLimitExceeded:
+                metrics.conversions_total.inc(**metric_labels, status="limit")
+                stats_db.record_usage({**usage_record, **job_usage, "status": "limit"})
+                raise
+            except Exception:
+                metrics.conversions_total.inc(**metric_labels, status="error")
+                if job_usage:
+                    stats_db.record_usage({**usage_record, **job_usage, "status": "error"})
+                raise
+            try:
+                elapsed = job_usage['wall_seconds']
+                metrics.conversion_duration.observe(elapsed, **metric_labels)
+                stats_db.record_run(converter_name, *cost_pair, elapsed, og_metadata['size_bytes'])
+                metrics.conversions_total.inc(**metric_labels, status="success")
+                # Multi-file outputs (e.g. partitioned parquet datasets) are delivered as a ZIP archive
+                output_extension = 'zip' if Path(output_files[0]).suffix == '.zip' else output_format
+                # Move and hash in a worker thread, reading the output once in fixed-size blocks.
+                # The shared output stays in the job directory until it is discarded
+                shared_output_file, size_bytes, sha256_checksum = await asyncio.to_thread(
+                    move_and_hash, output_files[0], job_dir / f'output.{output_extension}'
+                )
+                metrics.adjust_storage(shared_output_file, size_bytes)
+            except BaseException:
+                shutil.rmtree(job_dir, ignore_errors=True)
+                raise
+            metrics.conversion_input_bytes.inc(og_metadata['size_bytes'], input_format=input_format, output_format=output_format)
+            metrics.conversion_output_bytes.inc(size_bytes, input_format=input_format, output_format=output_format)
+            stats_db.record_sample(
+                converter_name, *cost_pair, estimate['work_unit'], estimate['work_amount'], elapsed, size_bytes
+            )
+            stats_db.record_usage({**usage_record, **job_usage, "status": "success", "output_bytes": size_bytes})
+            return {
+                "path": shared_output_file,
+                "extension": output_extension,
+                "size_bytes": size_bytes,
+                "sha256_checksum": sha256_checksum
+            }
+        finally:
+            stats_db.close()
+
+    def store_output(shared: dict) -> dict:
+        # Each request gets its own converted file, sharing the data of the output
+        stored = link_or_copy(shared['path'], f'{CONVERTED_DIR}/{converted_id}.{shared["extension"]}')
+        metrics.adjust_storage(stored, shared['size_bytes'])
+        return {**shared, "path": stored}
+
+    def discard_output(shared: dict):
+        # Removes the job directory with the shared output in it
+        shutil.rmtree(Path(shared['path']).parent, ignore_errors=True)
+        metrics.adjust_storage(shared['path'], -shared['size_bytes'])
+
+    # Identical conversions in flight (same input content, target and options) share one execution
+    coalesce_key = (
+        og_metadata['sha256_checksum'],
+        *cost_pair,
+        conversion_request.quality,
+        json.dumps(task.options, sort_keys=True, default=str)
+    )
+    try:
+        output = await inflight_conversions.run(
+            coalesce_key,
+            execute_conversion,
+            consume=store_output,
+            discard=discard_output
+        )
+    except InvalidConversionOptions as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConversionLimitExceeded as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    output_extension = output['extension']
+    moved_output_file = output['path']
+    size_bytes = output['size_bytes']
+    sha256_checksum = output['sha256_checksum']
 
     # Store the converted file metadata in the conversion database and create a relation to the original file
     converted_metadata['id'] = converted_id
-    converted_metadata['media_type'] = f"{output_format}"
-    converted_metadata['extension'] = f".{output_format}"
+    converted_metadata['media_type'] = f"{output_extension}"
+    converted_metadata['extension'] = f".{output_extension}"
     converted_metadata['storage_path'] = str(moved_output_file)
-    converted_metadata['size_bytes'] = moved_output_file.stat().st_size
-    converted_metadata['sha256_checksum'] = hashlib.sha256(moved_output_file.read_bytes()).hexdigest()
+    converted_metadata['size_bytes'] = size_bytes
+    converted_metadata['sha256_checksum'] = sha256_checksum
     converted_metadata.pop('created_at', None)  # Remove created_at from original metadata if it exists
+    # The original's probed properties don't describe the converted file
+    for column in FileDB.PROBE_COLUMNS:
+        converted_metadata.pop(column, None)
     conversion_db.insert_file_metadata(converted_metadata)
     # Store relation with denormalized original file metadata
     conversion_relations_db.insert_conversion_relation({
@@ -1,14 +1,19 @@
 import os
+import time
 import uuid
+import asyncio
 import hashlib
 
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, BackgroundTasks, Request, Query
 from fastapi.responses import FileResponse
 from zipfile import ZipFile
 from pathlib import Path
-from core import get_settings, detect_media_type, sanitize_extension, delete_file_and_metadata, validate_safe_path
+from core import get_settings, detect_media_type, detect_media_type_from_buffer, sanitize_extension, delete_file_and_metadata, validate_safe_path
+from core import metrics
+from core.timing import phase
+from core.probe import probe_file
 from db import FileDB, ConversionDB, ConversionRelationsDB
-from registry import ConverterRegistry
+from registry import get_registry
 from api.deps import get_file_db, get_conversion_db, get_conversion_relations_db
 from api.schemas import FileListResponse, FileUploadResponse, FileDeleteResponse, ErrorResponse, BatchDownloadRequest
 
@@ -16,37 +21,29 @@ router = APIRouter(prefix="/files", tags=["files"])
 
 # Define upload directory
 settings = get_settings()
-converter_registry = ConverterRegistry()
+converter_registry = get_registry()
 UPLOAD_DIR = settings.upload_dir
 CONVERTED_DIR = settings.output_dir
 TMP_DIR = settings.tmp_dir
+UPLOAD_BUFFER_BYTES = settings.upload_buffer_mb * 1024 * 1024
+# libmagic only inspects the start of a file
+MAGIC_SNIFF_BYTES = 1024 * 1024
 
 
-async def save_file(file: UploadFile, db: FileDB) -> dict:
-    """Save an uploaded file to disk and store its metadata in the database."""
+def new_upload_path(original_filename: str) -> tuple[str, str, Path]:
+    """Allocate an id and storage path for a new upload."""
     uuid_str = str(uuid.uuid4())
-    original_filename = file.filename or "upload"
     file_extension = sanitize_extension(Path(original_filename).suffix.lower())
     unique_filename = f"{uuid_str}"
     if file_extension:
         unique_filename += f".{file_extension}"
     os.makedirs(UPLOAD_DIR, exist_ok=True)
+    return uuid_str, file_extension, Path(UPLOAD_DIR) / unique_filename
 
-    file_path = Path(UPLOAD_DIR) / unique_filename
-    hasher = hashlib.sha256()
-    size_bytes = 0
-    # Stream upload to disk and compute hash in one pass
-    with file_path.open("wb") as buffer:
-        while True:
-            chunk = await file.read(1024 * 1024)  # Read in 1MB chunks
-            if not chunk:
-                break
-            buffer.write(chunk)
-            hasher.update(chunk)
-            size_bytes += len(chunk)
-    
-    media_type = detect_media_type(file_path)
 
+def record_upload(db: FileDB, uuid_str: str, file_path: Path, original_filename: str,
+                  file_extension: str, media_type: str, size_bytes: int, sha256_checksum: str) -> dict:
+    """Store the metadata of a completed upload and add its compatible formats."""
     metadata = {
         "id": uuid_str,
         "storage_path": str(file_path),
@@ -54,13 +51,99 @@ async def save_file(file: UploadFile, db: FileDB) -> dict:
         "media_type": media_type,
         "extension": file_extension,
         "size_bytes": size_bytes,
-        "sha256_checksum": hasher.hexdigest(),
+        "sha256_checksum": sha256_checksum,
     }
     db.insert_file_metadata(metadata)
     metadata["compatible_formats"] = converter_registry.get_compatible_formats(media_type)
     return metadata
 
 
+def probe_upload(file_id: str, file_path: str, media_type: str):
+    """Probe a stored upload and save its media properties (run as a background task)."""
+    db = FileDB()
+    try:
+        db.update_probe(file_id, probe_file(file_path, media_type))
+    finally:
+        db.close()
+
+
+def observe_upload(method: str, size_bytes: int, started: float):
+    """Record upload throughput metrics for a completed upload request."""
+    metrics.upload_bytes.inc(size_bytes, method=method)
+    metrics.upload_duration.observe(time.perf_counter() - started, method=method)
+
+
+def write_and_hash(buffer, hasher, data: bytes | bytearray):
+    """Write a block to disk and add it to the running checksum."""
+    with phase("write"):
+        buffer.write(data)
+    with phase("hash"):
+        hasher.update(data)
+
+
+async def save_stream(request: Request, original_filename: str, db: FileDB) -> dict:
+    """
+    Stream a raw request body straight to its final storage path.
+
+    Body chunks are gathered into large blocks that are written and hashed
+    in a worker thread, keeping disk I/O and SHA-256 off the event loop. The
+    media type is sniffed from the first block while it is still in memory.
+    """
+    uuid_str, file_extension, file_path = new_upload_path(original_filename)
+    hasher = hashlib.sha256()
+    size_bytes = 0
+    media_type = None
+    pending = bytearray()
+    try:
+        with file_path.open("wb", buffering=0) as buffer:
+            async for chunk in request.stream():
+                pending += chunk
+                if len(pending) < UPLOAD_BUFFER_BYTES:
+                    continue
+                block, pending = pending, bytearray()
+                if media_type is None:
+                    media_type = detect_media_type_from_buffer(original_filename, bytes(block[:MAGIC_SNIFF_BYTES]))
+                await asyncio.to_thread(write_and_hash, buffer, hasher, block)
+                size_bytes += len(block)
+            if pending or media_type is None:
+                if media_type is None:
+                    media_type = detect_media_type_from_buffer(original_filename, bytes(pending[:MAGIC_SNIFF_BYTES]))
+                await asyncio.to_thread(write_and_hash, buffer, hasher, pending)
+                size_bytes += len(pending)
+    except BaseException:
+        # Don't leave a partial upload behind (e.g. client disconnect)
+        file_path.unlink(missing_ok=True)
+        raise
+
+    return record_upload(
+        db, uuid_str, file_path, original_filename, file_extension,
+        media_type, size_bytes, hasher.hexdigest()
+    )
+
+
+async def save_file(file: UploadFile, db: FileDB) -> dict:
+    """Save an uploaded file to disk and store its metadata in the database."""
+    original_filename = file.filename or "upload"
+    uuid_str, file_extension, file_path = new_upload_path(original_filename)
+    hasher = hashlib.sha256()
+    size_bytes = 0
+    # Stream upload to disk and compute hash in one pass
+    with file_path.open("wb") as buffer:
+        while True:
+            chunk = await file.read(1024 * 1024)  # Read in 1MB chunks
+            if not chunk:
+                break
+            write_and_hash(buffer, hasher, chunk)
+            size_bytes += len(chunk)
+    
+    media_type = detect_media_type(file_path)
+
+    return record_upload(
+        db, uuid_str, file_path, original_filename, file_extension,
+        media_type, size_bytes, hasher.hexdigest()
+    )
+
+
 @router.get(
     "/",
     summary="List all uploaded files",
@@ -94,18 +177,61 @@ def list_files(file_db: FileDB = Depends(get_file_db)):
     }
 )
 async def upload_file(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     file_db: FileDB = Depends(get_file_db)
 ):
     """Upload a file and save it to the server"""
     try:
+        started = time.perf_counter()
         metadata = await save_file(file, file_db)
+        observe_upload("multipart", metadata["size_bytes"], started)
+        metrics.adjust_storage(metadata["storage_path"], metadata["size_bytes"])
+        # Probe after the response is sent, off the request path
+        background_tasks.add_task(probe_upload, metadata["id"], metadata["storage_path"], metadata["media_type"])
         return {"message": "File uploaded successfully", "metadata": metadata}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
     finally:
         await file.close()
 
+
+@router.put(
+    "/",
+    summary="Upload a file as the raw request body",
+    responses={
+        200: {
+            "model": FileUploadResponse,
+            "description": "File uploaded successfully"
+        },
+        500: {
+            "model": ErrorResponse,
+            "description": "Upload failed"
+        }
+    }
+)
+async def upload_file_raw(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    filename: str = Query("upload", description="Original filename, used for the extension and media type"),
+    file_db: FileDB = Depends(get_file_db)
+):
+    """
+    Upload a file sent as the raw request body (not multipart).
+
+    The body is streamed directly to storage without being spooled to a
+    temporary file first, so each byte is written to disk once.
+    """
+    try:
+        started = time.perf_counter()
+        metadata = await save_stream(request, filename, file_db)
+        observe_upload("raw", metadata["size_bytes"], started)
+        metrics.adjust_storage(metadata["storage_path"], metadata["size_bytes"])
+        background_tasks.add_task(probe_upload, metadata["id"], metadata["storage_path"], metadata["media_type"])
+        return {"message": "File uploaded successfully", "metadata": metadata}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
 @router.get(
     "/{file_id}",
     summary="Download a converted file",
@@ -192,7 +318,10 @@ def batch_download_files(
             zip_file.write(file_path, arcname=file_path.name)
     
     # Schedule cleanup of temp ZIP file after response is sent
+    zip_size = zip_path.stat().st_size
+    metrics.adjust_storage(zip_path, zip_size)
     background_tasks.add_task(os.unlink, zip_path)
+    background_tasks.add_task(metrics.adjust_storage, zip_path, -zip_size)
     
     return FileResponse(
         path=zip_path,
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from core import get_settings
+from core.admission import get_admission_controller
 from api.schemas import AppInfo, HealthStatus, ReadinessResponse
 import sqlite3
 import os
@@ -81,6 +82,10 @@ def readiness():
     except Exception as e:
         checks["storage"] = f"error: {e}"
 
+    # Saturation check, so load balancers steer traffic to other instances
+    reason = get_admission_controller().saturation()
+    checks["capacity"] = "ok" if reason is None else f"saturated: {reason}"
+
     # Determine overall status
     if all(v == "ok" for v in checks.values()):
         return {"status": "ready", "checks": checks}
@@ -1,8 +1,32 @@
+import os
 from fastapi import APIRouter
+from core.scheduler import get_scheduler
+from core.shared_state import get_shared_state
+from api.schemas import JobListResponse
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
-@router.get("/")
-def list_jobs():
-    return {"jobs": []}
+@router.get(
+    "/",
+    summary="List running and queued conversions",
+    responses={
+        200: {
+            "model": JobListResponse,
+            "description": "Scheduler lanes and their running and queued conversion jobs"
+        }
+    }
+)
+async def list_jobs():
+    """List the conversions running and queued on every worker process, per scheduler lane"""
+    scheduler = get_scheduler()
+    pid = os.getpid()
+    listing = {
+        "workers": scheduler.workers,
+        "lanes": scheduler.lane_stats(),
+        "jobs": [{**job, "worker_pid": pid} for job in scheduler.list_jobs()],
+    }
+    shared_state = get_shared_state()
+    if shared_state is not None:
+        listing = shared_state.merge_jobs(listing)
+    return listing
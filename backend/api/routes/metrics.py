@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from core import metrics
+from core.shared_state import get_shared_state
+from db import FileDB, ConversionDB, UploadSessionDB
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def seed_storage_metrics():
+    """
+    Initialize the storage usage gauges from the recorded file sizes.
+
+    After this, usage is kept up to date as files are added and removed
+    (by every worker process, see core/shared_state.py), so the data
+    directories never have to be scanned. tmp only holds files of requests
+    in flight, so it starts empty.
+    """
+    databases = {"uploads": [FileDB(), UploadSessionDB()], "outputs": [ConversionDB()]}
+    totals = {"tmp": 0}
+    for directory, dbs in databases.items():
+        totals[directory] = 0
+        for db in dbs:
+            try:
+                totals[directory] += db.total_size_bytes()
+            finally:
+                db.close()
+    metrics.seed_storage(totals)
+
+
+@router.get(
+    "/",
+    summary="Prometheus metrics",
+    response_class=PlainTextResponse,
+    responses={
+        200: {
+            "content": {PROMETHEUS_CONTENT_TYPE: {}},
+            "description": "Metrics in the Prometheus text exposition format"
+        }
+    }
+)
+def get_metrics():
+    """Expose conversion, upload, database, cache and storage metrics for Prometheus"""
+    shared_state = get_shared_state()
+    peers = shared_state.peer_metrics() if shared_state is not None else ()
+    return PlainTextResponse(metrics.render_metrics(peers), media_type=PROMETHEUS_CONTENT_TYPE)
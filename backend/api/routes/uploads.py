@@ -0,0 +1,396 @@
+import os
+import time
+import asyncio
+import hashlib
+
+from fastapi import APIRouter, HTTPException, Depends, Request, BackgroundTasks
+from pathlib import Path
+from core import get_settings, detect_media_type, hash_file
+from core import metrics
+from core.timing import phase
+from db import FileDB, UploadSessionDB
+from api.deps import get_file_db, get_upload_session_db
+from api.routes.files import new_upload_path, record_upload, observe_upload, probe_upload, UPLOAD_BUFFER_BYTES
+from api.schemas import UploadSessionCreateRequest, UploadSessionResponse, FileUploadResponse, FileDeleteResponse, ErrorResponse
+
+router = APIRouter(prefix="/files/uploads", tags=["uploads"])
+
+settings = get_settings()
+DEFAULT_CHUNK_SIZE = settings.upload_chunk_mb * 1024 * 1024
+MAX_SESSION_BYTES = settings.upload_session_max_mb * 1024 * 1024
+CLAIM_STALE_SECONDS = settings.upload_chunk_claim_seconds
+# A chunk's claim is refreshed this often while its body is being received
+CLAIM_REFRESH_SECONDS = CLAIM_STALE_SECONDS / 4
+
+# Running SHA-256 of each session's contiguous received prefix, as
+# [hasher, bytes hashed]. Per worker process (see core/shared_state.py);
+# rebuilt from disk on completion if missing (e.g. after a restart, or when
+# the chunks went to another worker).
+session_hashes: dict[str, list] = {}
+session_locks: dict[str, asyncio.Lock] = {}
+
+
+def chunk_count(session: dict) -> int:
+    return -(-session["size_bytes"] // session["chunk_size"])
+
+
+def chunk_length(session: dict, chunk_index: int) -> int:
+    """Exact size of a chunk; only the last one may be shorter."""
+    start = chunk_index * session["chunk_size"]
+    return min(session["chunk_size"], session["size_bytes"] - start)
+
+
+def received_ranges(session: dict, received: list[int]) -> list[tuple[int, int]]:
+    """Merge sorted received chunk indexes into [start, end) byte ranges."""
+    ranges = []
+    for chunk_index in received:
+        start = chunk_index * session["chunk_size"]
+        end = start + chunk_length(session, chunk_index)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def session_status(session: dict, received: list[int]) -> dict:
+    ranges = received_ranges(session, received)
+    received_set = set(received)
+    return {
+        "id": session["id"],
+        "original_filename": session["original_filename"],
+        "size_bytes": session["size_bytes"],
+        "chunk_size": session["chunk_size"],
+        "total_chunks": chunk_count(session),
+        "received_ranges": ranges,
+        "received_bytes": sum(end - start for start, end in ranges),
+        "missing_chunks": [i for i in range(chunk_count(session)) if i not in received_set],
+    }
+
+
+def preallocate(file_path: Path, size_bytes: int):
+    """Create the final file at full size, reserving the disk space up front."""
+    with file_path.open("wb") as f:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(f.fileno(), 0, size_bytes)
+        else:
+            f.truncate(size_bytes)
+
+
+async def advance_hash(session: dict, received: list[int]):
+    """
+    Extend the session's checksum over its contiguous received prefix.
+
+    Chunks may arrive out of order, so the hash only moves forward once the
+    gap in front of it has been filled. Returns the hasher, which stays
+    usable if the session is forgotten meanwhile.
+    """
+    prefix_chunks = 0
+    for chunk_index in received:
+        if chunk_index != prefix_chunks:
+            break
+        prefix_chunks += 1
+    prefix_end = min(prefix_chunks * session["chunk_size"], session["size_bytes"])
+
+    async with session_locks.setdefault(session["id"], asyncio.Lock()):
+        state = session_hashes.setdefault(session["id"], [hashlib.sha256(), 0])
+        if prefix_end > state[1]:
+            with phase("hash"):
+                await asyncio.to_thread(hash_file, session["storage_path"], state[0], state[1], prefix_end)
+            state[1] = prefix_end
+        return state[0]
+
+
+def forget_session(session_id: str):
+    session_hashes.pop(session_id, None)
+    session_locks.pop(session_id, None)
+
+
+def get_session_or_404(session_id: str, db: UploadSessionDB) -> dict:
+    session = db.get_session(session_id)
+    if session is None:
+        # It may have been completed, aborted or expired by another worker process
+        forget_session(session_id)
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+
+async def advance_hash_or_404(session: dict, received: list[int], db: UploadSessionDB):
+    """advance_hash, with a 404 if the session was aborted or expired meanwhile."""
+    try:
+        return await advance_hash(session, received)
+    finally:
+        # Also drops the checksum of a session deleted while it was hashed
+        get_session_or_404(session["id"], db)
+
+
+def delete_session_upload(session: dict, db: UploadSessionDB) -> bool:
+    """Delete an unfinished session and its preallocated file; False if it was already gone."""
+    forget_session(session["id"])
+    # The row is deleted first, so only one of concurrent deletes (or a
+    # completion) goes on to remove the file
+    if not db.delete_session(session["id"]):
+        return False
+    Path(session["storage_path"]).unlink(missing_ok=True)
+    metrics.adjust_storage(session["storage_path"], -session["size_bytes"])
+    return True
+
+
+def expire_idle_sessions():
+    """Delete abandoned sessions (run as a background task)."""
+    db = UploadSessionDB()
+    try:
+        for session in db.list_idle_sessions(settings.upload_session_idle_hours):
+            delete_session_upload(session, db)
+    finally:
+        db.close()
+
+
+async def write_chunk(
+    session: dict, request: Request, chunk_index: int, offset: int, expected_length: int, db: UploadSessionDB
+) -> int:
+    """Write a chunk's request body at its offset in the session's file, keeping its claim fresh."""
+    started = time.perf_counter()
+    refreshed = time.monotonic()
+    try:
+        fd = os.open(session["storage_path"], os.O_WRONLY)
+    except FileNotFoundError:
+        # Expired or aborted while the request came in
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    try:
+        written = 0
+        pending = bytearray()
+        async for body_chunk in request.stream():
+            pending += body_chunk
+            if time.monotonic() - refreshed >= CLAIM_REFRESH_SECONDS:
+                db.refresh_chunk_claim(session["id"], chunk_index)
+                refreshed = time.monotonic()
+            if written + len(pending) > expected_length:
+                raise HTTPException(status_code=400, detail=f"Chunk {chunk_index} must be exactly {expected_length} bytes")
+            if len(pending) >= UPLOAD_BUFFER_BYTES:
+                block, pending = pending, bytearray()
+                with phase("write"):
+                    await asyncio.to_thread(os.pwrite, fd, block, offset + written)
+                written += len(block)
+        if pending:
+            with phase("write"):
+                await asyncio.to_thread(os.pwrite, fd, pending, offset + written)
+            written += len(pending)
+    finally:
+        os.close(fd)
+    if written != expected_length:
+        raise HTTPException(status_code=400, detail=f"Chunk {chunk_index} must be exactly {expected_length} bytes")
+    observe_upload("chunked", written, started)
+    return written
+
+
+@router.post(
+    "/",
+    summary="Start a resumable upload",
+    responses={
+        200: {
+            "model": UploadSessionResponse,
+            "description": "Upload session created"
+        },
+        413: {
+            "model": ErrorResponse,
+            "description": "File is larger than the server accepts"
+        }
+    }
+)
+def create_upload_session(
+    request: UploadSessionCreateRequest,
+    background_tasks: BackgroundTasks,
+    session_db: UploadSessionDB = Depends(get_upload_session_db)
+):
+    """
+    Create an upload session for a file sent in numbered chunks.
+
+    The final file is allocated at full size right away; chunks are written
+    into it at their offsets, so no assembly copy is needed at the end.
+    Sessions without a new chunk for UPLOAD_SESSION_IDLE_HOURS are deleted.
+    """
+    if MAX_SESSION_BYTES and request.size_bytes > MAX_SESSION_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File is larger than the limit of {settings.upload_session_max_mb} MB"
+        )
+    background_tasks.add_task(expire_idle_sessions)
+    uuid_str, file_extension, file_path = new_upload_path(request.filename)
+    try:
+        preallocate(file_path, request.size_bytes)
+    except OSError as e:
+        file_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=507, detail=f"Could not allocate upload: {str(e)}")
+
+    session = {
+        "id": uuid_str,
+        "storage_path": str(file_path),
+        "original_filename": request.filename,
+        "extension": file_extension,
+        "size_bytes": request.size_bytes,
+        "chunk_size": request.chunk_size or DEFAULT_CHUNK_SIZE,
+        "sha256_checksum": request.sha256_checksum,
+    }
+    session_db.insert_session(session)
+    metrics.adjust_storage(file_path, request.size_bytes)
+    return session_status(session, [])
+
+
+@router.get(
+    "/{session_id}",
+    summary="Get the received ranges of a resumable upload",
+    responses={
+        200: {
+            "model": UploadSessionResponse,
+            "description": "Upload session status"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Upload session not found"
+        }
+    }
+)
+def get_upload_session(session_id: str, session_db: UploadSessionDB = Depends(get_upload_session_db)):
+    """Report which byte ranges have been received, so a client can resume"""
+    session = get_session_or_404(session_id, session_db)
+    return session_status(session, session_db.list_received_chunks(session_id))
+
+
+@router.put(
+    "/{session_id}/chunks/{chunk_index}",
+    summary="Upload one chunk of a resumable upload",
+    responses={
+        200: {
+            "model": UploadSessionResponse,
+            "description": "Chunk stored"
+        },
+        400: {
+            "model": ErrorResponse,
+            "description": "Chunk size does not match the session"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Upload session not found"
+        },
+        409: {
+            "model": ErrorResponse,
+            "description": "Chunk was already received or is being uploaded"
+        }
+    }
+)
+async def upload_chunk(
+    session_id: str,
+    chunk_index: int,
+    request: Request,
+    session_db: UploadSessionDB = Depends(get_upload_session_db)
+):
+    """
+    Store one chunk, sent as the raw request body.
+
+    Chunks can be sent in any order and in parallel. A received chunk
+    cannot be sent again, since it may already be part of the running
+    checksum; a chunk whose upload failed can. The body is written in place
+    at the chunk's offset.
+    """
+    session = get_session_or_404(session_id, session_db)
+    if not 0 <= chunk_index < chunk_count(session):
+        raise HTTPException(status_code=400, detail=f"Chunk index must be between 0 and {chunk_count(session) - 1}")
+    expected_length = chunk_length(session, chunk_index)
+    offset = chunk_index * session["chunk_size"]
+
+    if not session_db.claim_chunk(session_id, chunk_index, CLAIM_STALE_SECONDS):
+        raise HTTPException(status_code=409, detail=f"Chunk {chunk_index} was already received or is being uploaded")
+    try:
+        await write_chunk(session, request, chunk_index, offset, expected_length, session_db)
+    except BaseException:
+        session_db.release_chunk(session_id, chunk_index)
+        raise
+
+    session_db.mark_chunk_received(session_id, chunk_index)
+    received = session_db.list_received_chunks(session_id)
+    await advance_hash_or_404(session, received, session_db)
+    return session_status(session, received)
+
+
+@router.post(
+    "/{session_id}/complete",
+    summary="Finish a resumable upload",
+    responses={
+        200: {
+            "model": FileUploadResponse,
+            "description": "File uploaded successfully"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Upload session not found, or completed or aborted by another request"
+        },
+        409: {
+            "model": ErrorResponse,
+            "description": "Chunks are still missing"
+        },
+        422: {
+            "model": ErrorResponse,
+            "description": "Checksum does not match"
+        }
+    }
+)
+async def complete_upload_session(
+    session_id: str,
+    background_tasks: BackgroundTasks,
+    session_db: UploadSessionDB = Depends(get_upload_session_db),
+    file_db: FileDB = Depends(get_file_db)
+):
+    """Check that every chunk arrived and register the assembled file"""
+    session = get_session_or_404(session_id, session_db)
+    received = session_db.list_received_chunks(session_id)
+    status = session_status(session, received)
+    if status["missing_chunks"]:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload incomplete: {len(status['missing_chunks'])} chunks missing"
+        )
+
+    checksum = (await advance_hash_or_404(session, received, session_db)).hexdigest()
+    if session["sha256_checksum"] and session["sha256_checksum"].lower() != checksum:
+        raise HTTPException(status_code=422, detail="Checksum mismatch: the uploaded file does not match sha256_checksum")
+
+    # Deleting the session claims the completion: of concurrent completions
+    # (or an abort) only one gets the row
+    forget_session(session_id)
+    if not session_db.delete_session(session_id):
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    file_path = Path(session["storage_path"])
+    try:
+        metadata = record_upload(
+            file_db, session_id, file_path, session["original_filename"], session["extension"],
+            detect_media_type(file_path), session["size_bytes"], checksum
+        )
+    except Exception:
+        file_path.unlink(missing_ok=True)
+        metrics.adjust_storage(file_path, -session["size_bytes"])
+        raise
+    background_tasks.add_task(probe_upload, metadata["id"], metadata["storage_path"], metadata["media_type"])
+    return {"message": "File uploaded successfully", "metadata": metadata}
+
+
+@router.delete(
+    "/{session_id}",
+    summary="Abort a resumable upload",
+    responses={
+        200: {
+            "model": FileDeleteResponse,
+            "description": "Upload session deleted"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Upload session not found"
+        }
+    }
+)
+def abort_upload_session(session_id: str, session_db: UploadSessionDB = Depends(get_upload_session_db)):
+    """Abort an upload and delete the partially received file"""
+    session = get_session_or_404(session_id, session_db)
+    if not delete_session_upload(session, session_db):
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return {"message": "Upload session deleted"}
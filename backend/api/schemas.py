@@ -1,10 +1,101 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Any, Literal, Optional, Union
+
+
+class RowFilter(BaseModel):
+    column: str = Field(..., example="date", description="Column to test")
+    op: Literal["==", "!=", "<", "<=", ">", ">=", "in", "not in"] = Field(..., example=">=", description="Comparison operator")
+    value: Any = Field(..., example="2024-01-01", description="Value to compare against (a list for 'in'/'not in')")
+
+    @model_validator(mode="after")
+    def check_value_shape(self):
+        """Membership tests take a list; a string would be matched character by character."""
+        if self.op in ("in", "not in"):
+            if not isinstance(self.value, list):
+                raise ValueError(f"'{self.op}' needs a list value")
+        elif isinstance(self.value, (list, dict)):
+            raise ValueError(f"'{self.op}' needs a single value, not a {type(self.value).__name__}")
+        return self
+
+
+class DataOptions(BaseModel):
+    columns: Optional[list[str]] = Field(None, example=["date", "region", "revenue"], description="Columns to keep, in output order")
+    filters: Optional[list[RowFilter]] = Field(None, description="Row predicates, all of which must match")
+    limit: Optional[int] = Field(None, ge=1, example=1000, description="Maximum number of rows to write")
+
+
+class ParquetOptions(BaseModel):
+    compression: Optional[Literal["snappy", "zstd", "gzip", "brotli", "lz4", "none"]] = Field(None, example="zstd", description="Compression codec (defaults to the server setting)")
+    compression_level: Optional[int] = Field(None, example=6, description="Codec-specific compression level")
+    row_group_size: Optional[int] = Field(None, ge=1, example=1048576, description="Maximum rows per row group")
+    dictionary_columns: Optional[list[str]] = Field(None, example=["region"], description="Only dictionary-encode these columns (default: all)")
+    write_statistics: Optional[bool] = Field(None, example=True, description="Write min/max column statistics")
+    partition_columns: Optional[list[str]] = Field(None, example=["year", "region"], description="Write a Hive-partitioned dataset, delivered as a ZIP archive")
+
+
+class ResizeOperation(BaseModel):
+    op: Literal["resize"]
+    max_width: Optional[int] = Field(None, ge=1, example=400, description="Maximum width in pixels")
+    max_height: Optional[int] = Field(None, ge=1, example=400, description="Maximum height in pixels")
+    fit: Literal["contain", "cover", "fill"] = Field("contain", example="contain", description="contain: fit inside the box, cover: fill the box and crop, fill: stretch to the box")
+
+
+class CropOperation(BaseModel):
+    op: Literal["crop"]
+    left: int = Field(..., ge=0, example=0, description="Left edge in pixels")
+    top: int = Field(..., ge=0, example=0, description="Top edge in pixels")
+    width: int = Field(..., ge=1, example=800, description="Width of the crop box")
+    height: int = Field(..., ge=1, example=600, description="Height of the crop box")
+
+
+class RotateOperation(BaseModel):
+    op: Literal["rotate"]
+    degrees: float = Field(..., example=90, description="Clockwise rotation in degrees")
+    expand: bool = Field(True, description="Grow the canvas to fit the rotated image")
+
+
+class FlipOperation(BaseModel):
+    op: Literal["flip"]
+    direction: Literal["horizontal", "vertical"] = Field(..., example="horizontal")
+
+
+class FlattenOperation(BaseModel):
+    op: Literal["flatten"]
+    background: str = Field("#ffffff", example="#ffffff", description="Background color for transparent areas")
+
+
+class GrayscaleOperation(BaseModel):
+    op: Literal["grayscale"]
+
+
+ImageOperation = Annotated[
+    Union[ResizeOperation, CropOperation, RotateOperation, FlipOperation, FlattenOperation, GrayscaleOperation],
+    Field(discriminator="op")
+]
+
+
+class ImageOptions(BaseModel):
+    max_width: Optional[int] = Field(None, ge=1, example=400, description="Maximum output width in pixels")
+    max_height: Optional[int] = Field(None, ge=1, example=400, description="Maximum output height in pixels")
+    fit: Literal["contain", "cover", "fill"] = Field("contain", example="contain", description="contain: fit inside the box, cover: fill the box and crop, fill: stretch to the box")
+    operations: Optional[list[ImageOperation]] = Field(None, description="Transforms applied in order, after the resize, on a single decoded image")
+    auto_orient: bool = Field(True, description="Rotate the image upright according to its EXIF orientation")
+    strip_metadata: bool = Field(False, description="Drop EXIF, ICC, XMP and comments from the output")
 
 
 class ConversionRequest(BaseModel):
     id: str = Field(..., example="123e4567-e89b-12d3-a456-426614174000", description="ID of file to convert")
     output_format: str = Field(..., example="png", description="Target format for conversion")
+    quality: Optional[Literal["high", "medium", "low", "lossless"]] = Field(None, example="high", description="Quality level for lossy image, audio and video formats")
+    encode_profile: Optional[Literal["fast", "balanced", "smallest"]] = Field(None, example="balanced", description="Image encoder trade-off between encode time and output size (defaults to the server setting)")
+    data_options: Optional[DataOptions] = Field(None, description="Column projection, row filters and row limit for tabular data conversions")
+    parquet_options: Optional[ParquetOptions] = Field(None, description="Parquet writer settings when the output format is parquet")
+    image_options: Optional[ImageOptions] = Field(None, description="Resize, transform and metadata settings for image conversions")
+    priority: Optional[Literal["interactive", "bulk"]] = Field(None, example="bulk", description="Scheduler lane; by default small jobs are interactive and large ones bulk")
+
+    def converter_options(self) -> dict:
+        """Options forwarded to the converter (everything except the file, target format, quality and priority)."""
+        return self.model_dump(exclude={"id", "output_format", "quality", "priority"}, exclude_none=True)
 
 
 class FileMetadata(BaseModel):
@@ -14,6 +105,15 @@ class FileMetadata(BaseModel):
     extension: str = Field(..., example=".jpg")
     size_bytes: int = Field(..., example=204800)
     sha256_checksum: str = Field(..., example="abc123def456...")
+    probe_status: Optional[Literal["ok", "failed", "unsupported"]] = Field(None, example="ok", description="Result of the upload probe; null while it is still running")
+    width: Optional[int] = Field(None, example=1920, description="Image or video width in pixels")
+    height: Optional[int] = Field(None, example=1080, description="Image or video height in pixels")
+    duration_seconds: Optional[float] = Field(None, example=63.5, description="Audio or video duration")
+    video_codec: Optional[str] = Field(None, example="h264")
+    audio_codec: Optional[str] = Field(None, example="aac")
+    bit_rate: Optional[int] = Field(None, example=4500000, description="Overall bit rate in bits per second")
+    row_count: Optional[int] = Field(None, example=1000000, description="Rows in a tabular file")
+    data_schema: Optional[list[dict[str, str]]] = Field(None, example=[{"name": "id", "type": "int64"}], description="Column names and types of a tabular file")
 
 
 class FileMetadataWithFormats(FileMetadata):
@@ -30,6 +130,21 @@ class ConversionItem(BaseModel):
     original_file: Optional[FileMetadata] = Field(None, description="Original file metadata")
 
 
+class ConverterCandidate(BaseModel):
+    name: str = Field(..., example="PillowConverter", description="Converter class name")
+    priority: int = Field(..., example=10, description="Static preference, used until a cost is measured and to break ties (lower wins)")
+    runs: int = Field(..., example=42, description="Conversions of this format pair observed for the converter")
+    seconds_per_mb: Optional[float] = Field(None, example=0.35, description="Observed conversion time per MB of input")
+    estimated_seconds_per_mb: float = Field(..., example=0.35, description="Cost the candidates are ranked on: observed once measured, the converter's declared prior until then")
+
+
+class ConverterSelectionResponse(BaseModel):
+    input_format: str = Field(..., example="gif")
+    output_format: str = Field(..., example="mp4")
+    selected: Optional[str] = Field(None, example="FFmpegConverter", description="Converter used for this conversion (except for an occasional run of an unmeasured candidate), or null if none supports it")
+    candidates: list[ConverterCandidate] = Field(..., description="Converters supporting both formats, preferred first")
+
+
 class ConversionListResponse(BaseModel):
     conversions: list[ConversionItem] = Field(..., description="List of completed conversions")
 
@@ -50,6 +165,7 @@ class HealthStatus(BaseModel):
 class ReadinessChecks(BaseModel):
     database: str = Field(..., example="ok", description="Database check status")
     storage: str = Field(..., example="ok", description="Storage check status")
+    capacity: str = Field(..., example="ok", description="Admission control status: ok, or why uploads and conversions are being turned away")
 
 
 class ReadinessResponse(BaseModel):
@@ -66,9 +182,109 @@ class FileUploadResponse(BaseModel):
     metadata: FileMetadataWithFormats = Field(..., description="Uploaded file metadata with compatible formats")
 
 
+class UploadSessionCreateRequest(BaseModel):
+    filename: str = Field(..., example="recording.mp4", description="Original filename, used for the extension and media type")
+    size_bytes: int = Field(..., ge=1, example=4294967296, description="Total size of the file in bytes")
+    chunk_size: Optional[int] = Field(None, ge=1024 * 1024, example=16777216, description="Chunk size in bytes (server default if omitted); every chunk except the last has exactly this size")
+    sha256_checksum: Optional[str] = Field(None, example="abc123def456...", description="Expected SHA-256 of the whole file, verified when the upload is completed")
+
+
+class UploadSessionResponse(BaseModel):
+    id: str = Field(..., example="123e4567-e89b-12d3-a456-426614174000", description="Upload session ID, which becomes the file ID")
+    original_filename: str = Field(..., example="recording.mp4")
+    size_bytes: int = Field(..., example=4294967296)
+    chunk_size: int = Field(..., example=16777216)
+    total_chunks: int = Field(..., example=256, description="Number of chunks the file is split into")
+    received_ranges: list[tuple[int, int]] = Field(..., example=[[0, 33554432], [67108864, 83886080]], description="Received byte ranges as [start, end) pairs")
+    received_bytes: int = Field(..., example=50331648, description="Total bytes received so far")
+    missing_chunks: list[int] = Field(..., example=[2, 5], description="Indexes of chunks not yet received")
+
+
 class FileDeleteResponse(BaseModel):
     message: str = Field(..., example="File deleted successfully", description="Deletion status message")
 
 
 class BatchDownloadRequest(BaseModel):
     file_ids: list[str] = Field(..., example=["123e4567-e89b-12d3-a456-426614174000", "987fcdeb-51a2-43f1-b789-123456789abc"], description="List of converted file IDs to download")
+
+
+class ProfileInfo(BaseModel):
+    id: str = Field(..., example="20260101T120000-1a2b3c4d", description="Profile ID, used to download its files")
+    method: str = Field(..., example="POST")
+    path: str = Field(..., example="/api/conversions/")
+    status: Optional[int] = Field(None, example=200, description="Response status, if a response was started")
+    duration_ms: float = Field(..., example=1520.4, description="Time the request took while profiled")
+    peak_memory_bytes: int = Field(..., example=73400320, description="Peak memory traced by tracemalloc during the request")
+    created_at: float = Field(..., example=1767268800.0, description="Unix time the profile was written")
+
+
+class ProfileListResponse(BaseModel):
+    profiles: list[ProfileInfo] = Field(..., description="Captured profiles, newest first")
+
+
+class ConverterUsageStats(BaseModel):
+    converter: str = Field(..., example="FFmpegConverter")
+    input_format: str = Field(..., example="mov")
+    output_format: str = Field(..., example="mp4")
+    runs: int = Field(..., example=120, description="Conversions recorded, failed ones included")
+    failures: int = Field(..., example=2, description="Conversions that failed with an error")
+    limits_exceeded: int = Field(..., example=1, description="Conversions stopped by a CPU, memory or wall-clock limit")
+    avg_wall_seconds: Optional[float] = Field(None, example=12.4)
+    max_wall_seconds: Optional[float] = Field(None, example=95.0)
+    avg_cpu_seconds: Optional[float] = Field(None, example=40.2, description="CPU time, converter subprocesses included")
+    max_cpu_seconds: Optional[float] = Field(None, example=310.5)
+    cpu_seconds_per_input_mb: Optional[float] = Field(None, example=0.8, description="CPU time per MB of input")
+    avg_peak_rss_bytes: Optional[float] = Field(None, example=268435456, description="Peak resident memory of a conversion")
+    max_peak_rss_bytes: Optional[int] = Field(None, example=1073741824)
+    total_bytes_read: Optional[int] = Field(None, example=53687091200)
+    total_bytes_written: Optional[int] = Field(None, example=21474836480)
+
+
+class ConverterUsageResponse(BaseModel):
+    stats: list[ConverterUsageStats] = Field(..., description="Resource usage per converter and format pair")
+
+
+class ConversionEstimate(BaseModel):
+    file_id: str = Field(..., example="123e4567-e89b-12d3-a456-426614174000", description="ID of the file to convert")
+    converter: str = Field(..., example="PillowConverter", description="Converter that would run the conversion")
+    input_format: str = Field(..., example="png")
+    output_format: str = Field(..., example="webp")
+    lane: Literal["interactive", "bulk"] = Field(..., example="interactive", description="Scheduler lane the conversion would run in")
+    estimated_seconds: float = Field(..., example=0.42, description="Estimated conversion time, excluding queueing")
+    estimated_output_bytes: int = Field(..., example=153600, description="Estimated size of the converted file")
+    estimated_queue_seconds: float = Field(..., example=0.0, description="Expected wait for a worker, given the jobs already running and queued")
+    work_unit: Literal["seconds", "pixels", "rows", "bytes"] = Field(..., example="pixels", description="Measure of the input the estimate is based on")
+    work_amount: float = Field(..., example=2073600, description="Amount of work in the input, in work_unit")
+    samples: int = Field(..., example=25, description="Past conversions the estimate was learned from")
+    basis: Literal["history", "prior"] = Field(..., example="history", description="'history' when learned from past conversions, 'prior' while there are too few")
+
+
+class JobInfo(BaseModel):
+    id: str = Field(..., example="123e4567-e89b-12d3-a456-426614174000", description="Job ID")
+    lane: Literal["interactive", "bulk"] = Field(..., example="interactive", description="Scheduler lane")
+    client: str = Field(..., example="203.0.113.7", description="Client the job is accounted to")
+    state: Literal["queued", "running"] = Field(..., example="queued")
+    estimated_seconds: float = Field(..., example=0.42, description="Estimated conversion time")
+    queued_at: float = Field(..., example=1767268800.0, description="Unix time the job was queued")
+    started_at: Optional[float] = Field(None, example=1767268800.5, description="Unix time the job started running")
+    file_id: str = Field(..., example="123e4567-e89b-12d3-a456-426614174000", description="ID of the file being converted")
+    converter: str = Field(..., example="PillowConverter")
+    input_format: str = Field(..., example="png")
+    output_format: str = Field(..., example="webp")
+    input_size_bytes: int = Field(..., example=204800)
+    estimated_output_bytes: Optional[int] = Field(None, example=153600, description="Estimated size of the converted file")
+    eta_seconds: Optional[float] = Field(None, example=1.8, description="Expected seconds until the job finishes, from the estimates of the jobs ahead of it")
+    worker_pid: int = Field(..., example=4242, description="HTTP worker process the job runs in")
+
+
+class LaneStats(BaseModel):
+    lane: Literal["interactive", "bulk"] = Field(..., example="bulk")
+    reserved: int = Field(..., example=1, description="Worker slots only this lane may use")
+    running: int = Field(..., example=3, description="Jobs running in this lane")
+    queued: int = Field(..., example=12, description="Jobs waiting in this lane")
+
+
+class JobListResponse(BaseModel):
+    workers: int = Field(..., example=8, description="Conversion worker slots, across every HTTP worker process")
+    lanes: list[LaneStats] = Field(..., description="Per-lane capacity and load")
+    jobs: list[JobInfo] = Field(..., description="Running jobs, then queued jobs in the order they will start")
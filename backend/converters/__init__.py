@@ -1,7 +1,14 @@
-from .ffmpeg_convert import FFmpegConverter
-from .pillow_convert import PillowConverter
-from .pandas_convert import PandasConverter
-from .drawio_convert import DrawioConverter
-from .converter_interface import ConverterInterface
+from .converter_interface import ConverterInterface, InvalidConversionOptions
+from .manifest import ConverterSpec, CONVERTER_MANIFEST
 
-__all__ = ["FFmpegConverter", "PillowConverter", "PandasConverter", "ImgArrayConverter", "ConverterInterface"]
\ No newline at end of file
+# Converter classes are imported on first access (see manifest.py)
+_specs = {spec.name: spec for spec in CONVERTER_MANIFEST}
+
+
+def __getattr__(name):
+    if name in _specs:
+        return _specs[name].load()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["FFmpegConverter", "PillowConverter", "PandasConverter", "DrawioConverter", "ConverterInterface", "InvalidConversionOptions", "ConverterSpec", "CONVERTER_MANIFEST"]
@@ -2,11 +2,16 @@ import os
 from core import media_type_aliases
 from typing import Optional
 
+
+class InvalidConversionOptions(ValueError):
+    """The request's conversion options do not fit the input (e.g. an unknown column)."""
+
+
 class ConverterInterface:
     supported_input_formats: set = set()  # To be defined by subclasses with supported input formats
     supported_output_formats: set = set()  # To be defined by subclasses with supported output formats
 
-    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str):
+    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str, options: Optional[dict] = None):
         """
         Initialize converter interface.
         
@@ -15,11 +20,13 @@ class ConverterInterface:
             output_dir: Directory where the output file will be saved
             input_type: Format of the input file (e.g., "mp4", "mp3")
             output_type: Format of the output file (e.g., "mp4", "mp3")
+            options: Converter-specific conversion options (e.g., {"data_options": {...}})
         """
         self.input_file = input_file
         self.output_dir = output_dir
         self.input_type = media_type_aliases.get(input_type.lower(), input_type.lower())
         self.output_type = media_type_aliases.get(output_type.lower(), output_type.lower())
+        self.options = options or {}
         
         # Create output directory if it doesn't exist
         os.makedirs(self.output_dir, exist_ok=True)
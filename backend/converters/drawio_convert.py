@@ -5,17 +5,11 @@ from pathlib import Path
 from typing import Optional
 
 from .converter_interface import ConverterInterface
+from .manifest import DRAWIO_INPUT_FORMATS, DRAWIO_OUTPUT_FORMATS, drawio_compatible
 
 class DrawioConverter(ConverterInterface):
-    supported_input_formats = {
-        'drawio'
-    }
-    supported_output_formats = {
-        'png',
-        'pdf',
-        'svg',
-        'jpeg',
-    }
+    supported_input_formats = DRAWIO_INPUT_FORMATS
+    supported_output_formats = DRAWIO_OUTPUT_FORMATS
     
     # Draw.io CLI path by platform
     DRAWIO_PATHS = {
@@ -24,7 +18,7 @@ class DrawioConverter(ConverterInterface):
         'win32': 'C:\\Program Files\\draw.io\\draw.io.exe',
     }
     
-    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str):
+    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str, options: Optional[dict] = None):
         """
         Initialize Drawio converter.
         
@@ -33,8 +27,9 @@ class DrawioConverter(ConverterInterface):
             output_dir: Directory where the converted file will be saved
             input_type: Input file format (must be 'drawio')
             output_type: Output file format (e.g., 'png', 'pdf', 'svg', 'jpeg')
+            options: Conversion options from the request (optional)
         """
-        super().__init__(input_file, output_dir, input_type, output_type)
+        super().__init__(input_file, output_dir, input_type, output_type, options)
     
     def __can_convert(self) -> bool:
         """
@@ -70,10 +65,7 @@ class DrawioConverter(ConverterInterface):
         Returns:
             Set of compatible formats.
         """
-        base_formats = super().get_formats_compatible_with(format_type)
-        # Can convert FROM drawio but not TO drawio (export only)
-        base_formats.discard('drawio')
-        return base_formats
+        return drawio_compatible(format_type.lower())
     
     def convert(self, overwrite: bool = True, quality: Optional[str] = None) -> list[str]:
         """
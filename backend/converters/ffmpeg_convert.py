@@ -3,35 +3,16 @@ import os
 from pathlib import Path
 from typing import Optional
 from .converter_interface import ConverterInterface
+from .manifest import FFMPEG_VIDEO_FORMATS, FFMPEG_AUDIO_FORMATS, FFMPEG_FORMATS, ffmpeg_compatible
 
 class FFmpegConverter(ConverterInterface):
-    video_formats: set = {
-        'mp4', 
-        'avi', 
-        'mov', 
-        'mkv', 
-        'webm', 
-        'flv', 
-        'wmv', 
-        'mpg', 
-        'mpeg', 
-        'm4v', 
-        'gif'
-      }
-    audio_formats: set = {
-        'mp3',
-        'wav',
-        'aac',
-        'flac',
-        'ogg',
-        'wma',
-        'm4a',
-        'opus'
-      }
-    supported_input_formats: set = video_formats | audio_formats
-    supported_output_formats: set = set(supported_input_formats)
+    # Formats are declared in the manifest, so routing does not import this module
+    video_formats: set = FFMPEG_VIDEO_FORMATS
+    audio_formats: set = FFMPEG_AUDIO_FORMATS
+    supported_input_formats: set = FFMPEG_FORMATS
+    supported_output_formats: set = FFMPEG_FORMATS
 
-    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str):
+    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str, options: Optional[dict] = None):
         """
         Initialize FFmpeg converter.
         
@@ -40,8 +21,9 @@ class FFmpegConverter(ConverterInterface):
             output_dir: Directory where the converted file will be saved
             input_type: Input file format (e.g., 'mp4', 'avi', 'mp3', 'wav')
             output_type: Output file format (e.g., 'mp4', 'avi', 'mp3', 'wav')
+            options: Conversion options from the request (optional)
         """
-        super().__init__(input_file, output_dir, input_type, output_type)
+        super().__init__(input_file, output_dir, input_type, output_type, options)
     
     def __can_convert(self) -> bool:
         """
@@ -80,11 +62,7 @@ class FFmpegConverter(ConverterInterface):
         Returns:
             Set of compatible formats.
         """
-        if format_type.lower() in cls.audio_formats:
-            # For audio formats, compatible formats are other audio formats
-            return cls.audio_formats - {format_type.lower()}
-        else:
-            return cls.supported_output_formats - {format_type.lower()}
+        return ffmpeg_compatible(format_type.lower())
     
     def convert(self, overwrite: bool = True, quality: Optional[str] = None) -> str:
         """
@@ -0,0 +1,115 @@
+"""
+Lightweight declaration of every converter.
+
+Routing only needs each converter's formats, so they are declared here
+without importing the implementations (which pull in pandas, pyarrow,
+Pillow, pillow_heif and cairosvg). A converter's module is imported the
+first time its class is needed, i.e. for its first conversion.
+"""
+import importlib
+import importlib.util
+from typing import Callable, Optional
+
+
+class ConverterSpec:
+    """
+    Formats of a converter and the module that implements it.
+
+    Args:
+        name: Converter class name
+        module: Module in the converters package that defines the class
+        input_formats: Formats the converter reads
+        output_formats: Formats the converter writes
+        compatible: Optional rule giving the output formats for an input
+            format (default: every output format except the input itself)
+        priority: Preference when several converters handle a format pair
+            and none of their costs have been measured yet (lower wins)
+        seconds_per_mb: Rough conversion time per MB of input, used to
+            estimate a job's cost, and to rank the converter against
+            measured ones, until it has been measured
+    """
+
+    def __init__(
+        self,
+        name: str,
+        module: str,
+        input_formats: set,
+        output_formats: set,
+        compatible: Optional[Callable[[str], set]] = None,
+        priority: int = 100,
+        seconds_per_mb: float = 1.0
+    ):
+        self.name = name
+        self.module = module
+        self.supported_input_formats = frozenset(input_formats)
+        self.supported_output_formats = frozenset(output_formats)
+        self.compatible = compatible
+        self.priority = priority
+        self.seconds_per_mb = seconds_per_mb
+        self._converter_class = None
+
+    def get_formats_compatible_with(self, format_type: str) -> set:
+        """
+        Get the set of compatible formats for conversion.
+
+        Args:
+            format_type: The input format to check compatibility for.
+
+        Returns:
+            Set of compatible formats.
+        """
+        if self.compatible is not None:
+            return self.compatible(format_type.lower())
+        return set(self.supported_output_formats - {format_type.lower()})
+
+    def load(self) -> type:
+        """Import the implementing module (once) and return the converter class."""
+        if self._converter_class is None:
+            module = importlib.import_module(f"{__package__}.{self.module}")
+            self._converter_class = getattr(module, self.name)
+        return self._converter_class
+
+
+FFMPEG_VIDEO_FORMATS = {'mp4', 'avi', 'mov', 'mkv', 'webm', 'flv', 'wmv', 'mpg', 'mpeg', 'm4v', 'gif'}
+FFMPEG_AUDIO_FORMATS = {'mp3', 'wav', 'aac', 'flac', 'ogg', 'wma', 'm4a', 'opus'}
+FFMPEG_FORMATS = FFMPEG_VIDEO_FORMATS | FFMPEG_AUDIO_FORMATS
+
+PILLOW_FORMATS = {
+    'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp', 'ico',
+    'ppm', 'pgm', 'pbm', 'pcx', 'heif', 'heic', 'svg'
+}
+# AVIF needs a Pillow build with libavif. Look for the plugin without
+# importing Pillow (the wheels bundle libavif with it).
+if importlib.util.find_spec('PIL._avif') is not None:
+    PILLOW_FORMATS.add('avif')
+
+PANDAS_FORMATS = {'csv', 'xlsx', 'json', 'parquet', 'yaml'}
+
+DRAWIO_INPUT_FORMATS = {'drawio'}
+DRAWIO_OUTPUT_FORMATS = {'png', 'pdf', 'svg', 'jpeg'}
+
+
+def ffmpeg_compatible(format_type: str) -> set:
+    # For audio formats, compatible formats are other audio formats
+    if format_type in FFMPEG_AUDIO_FORMATS:
+        return FFMPEG_AUDIO_FORMATS - {format_type}
+    return FFMPEG_FORMATS - {format_type}
+
+
+def pillow_compatible(format_type: str) -> set:
+    # Can convert FROM SVG but not TO SVG (rasterization only)
+    return PILLOW_FORMATS - {format_type, 'svg'}
+
+
+def drawio_compatible(format_type: str) -> set:
+    # Can convert FROM drawio but not TO drawio (export only)
+    return DRAWIO_OUTPUT_FORMATS - {format_type, 'drawio'}
+
+
+# In-process libraries are preferred over converters that start a subprocess
+CONVERTER_MANIFEST = [
+    ConverterSpec('FFmpegConverter', 'ffmpeg_convert', FFMPEG_FORMATS, FFMPEG_FORMATS, ffmpeg_compatible, priority=20, seconds_per_mb=2.0),
+    ConverterSpec('PillowConverter', 'pillow_convert', PILLOW_FORMATS, PILLOW_FORMATS, pillow_compatible, priority=10, seconds_per_mb=0.2),
+    ConverterSpec('PandasConverter', 'pandas_convert', PANDAS_FORMATS, PANDAS_FORMATS, priority=10, seconds_per_mb=0.5),
+    ConverterSpec('DrawioConverter', 'drawio_convert', DRAWIO_INPUT_FORMATS, DRAWIO_OUTPUT_FORMATS, drawio_compatible, priority=20, seconds_per_mb=5.0),
+]
@@ -1,20 +1,410 @@
 import os
+import re
+import shutil
+import json
+import operator
+import textwrap
 import pandas as pd
-import yaml, json
-from typing import Optional
-from .converter_interface import ConverterInterface
+import yaml
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+from zipfile import ZipFile
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.resolver import Resolver
+from yaml.events import SequenceStartEvent, SequenceEndEvent
+from core import get_settings
+from .converter_interface import ConverterInterface, InvalidConversionOptions
+from .manifest import PANDAS_FORMATS
+
+# Use the libyaml-backed loader/dumper when PyYAML was built against libyaml.
+# The streaming loader pairs the C parser with PyYAML's composer so top-level
+# sequence items can be built one node at a time.
+if yaml.__with_libyaml__:
+    from yaml.cyaml import CParser
+
+    YamlLoader = yaml.CSafeLoader
+    YamlDumper = yaml.CDumper
+
+    class YamlStreamingLoader(CParser, Composer, SafeConstructor, Resolver):
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            Composer.__init__(self)
+            SafeConstructor.__init__(self)
+            Resolver.__init__(self)
+else:
+    YamlLoader = yaml.SafeLoader
+    YamlDumper = yaml.Dumper
+    YamlStreamingLoader = yaml.SafeLoader
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_JSON_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+_JSON_STRUCTURE = re.compile(r'["\[\]{}]')
+_JSON_STRING_SPECIAL = re.compile(r'["\\]')
+
+# Row filter operators supported in DataOptions.filters ('in'/'not in' handled separately)
+_COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    """Yield lists of up to `size` items from an iterable."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _first_non_whitespace_char(path: str) -> str:
+    """Return the first non-whitespace character of a text file ('' if none)."""
+    with open(path, 'r') as f:
+        while chunk := f.read(4096):
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped[0]
+    return ''
+
+
+def _scan_json_value_end(text: str, state: list) -> Optional[int]:
+    """
+    Scan text for the end of a JSON object, array or string, resuming across reads.
+
+    Args:
+        text: The next part of the value
+        state: [depth, in_string, escaped] carried from the previous part,
+            [0, False, False] at the start of the value; updated in place
+
+    Returns:
+        Index in text just past the end of the value, or None if it continues
+    """
+    depth, in_string, escaped = state
+    i, n = 0, len(text)
+    if escaped and n:
+        # The escaped character is the first one of this part
+        i, escaped = 1, False
+    while i < n:
+        if in_string:
+            match = _JSON_STRING_SPECIAL.search(text, i)
+            if match is None:
+                break
+            if match.group() == '\\':
+                if match.end() == n:
+                    escaped = True
+                    break
+                i = match.end() + 1
+                continue
+            in_string = False
+            i = match.end()
+        else:
+            match = _JSON_STRUCTURE.search(text, i)
+            if match is None:
+                break
+            char, i = match.group(), match.end()
+            if char == '"':
+                in_string = True
+                continue
+            depth += 1 if char in '[{' else -1
+        if depth == 0:
+            state[:] = [depth, in_string, escaped]
+            return i
+    state[:] = [depth, in_string, escaped]
+    return None
+
+
+def _iter_json_array(path: str, read_size: int = 1024 * 1024) -> Iterator:
+    """
+    Incrementally parse the elements of a top-level JSON array.
+
+    Only the element currently being decoded (plus one read buffer) is held
+    in memory, so arbitrarily long arrays can be processed.
+
+    Args:
+        path: Path to a JSON file whose top-level value is an array
+        read_size: Number of characters to read from the file at a time
+
+    Yields:
+        Each element of the array, in order
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            """Append the next read to the unconsumed part of the buffer."""
+            nonlocal buffer, pos, eof
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return not eof
+
+        def next_token() -> str:
+            """Skip whitespace and return the next character ('' at end of file)."""
+            nonlocal pos
+            while True:
+                pos = _WHITESPACE.match(buffer, pos).end()
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not fill():
+                    return ''
+
+        if next_token() != '[':
+            raise ValueError(f"{path} does not contain a top-level JSON array")
+        pos += 1
+        if next_token() == ']':
+            return
+
+        # Whether the buffer holds the element at pos up to its end
+        complete = False
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # A number running up to the end of the buffer (perhaps cut
+                # after its '.' or 'e') may continue in the next read
+                if (
+                    not eof
+                    and isinstance(item, (int, float))
+                    and _JSON_NUMBER_TAIL.match(buffer, end).end() == len(buffer)
+                ):
+                    raise json.JSONDecodeError("Number may be truncated", buffer, end)
+            except json.JSONDecodeError:
+                # The element is split across reads, pull in more data
+                if complete or not fill():
+                    raise
+                if buffer[0] in '[{"':
+                    # Larger than a read: find its end read by read and join
+                    # the reads once, rather than re-parsing a growing buffer
+                    state = [0, False, False]
+                    pieces = [buffer]
+                    end = _scan_json_value_end(buffer, state)
+                    while end is None and (chunk := f.read(read_size)):
+                        pieces.append(chunk)
+                        end = _scan_json_value_end(chunk, state)
+                    eof = end is None
+                    buffer = ''.join(pieces)
+                    complete = True
+                continue
+            complete = False
+            yield item
+            pos = end
+
+            token = next_token()
+            if token == ']':
+                return
+            if token != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array in {path}")
+            pos += 1
+            next_token()
+
+
+def _iter_yaml_sequence(loader) -> Iterator:
+    """Yield constructed items of the sequence the loader is positioned inside."""
+    try:
+        while not loader.check_event(SequenceEndEvent):
+            node = loader.compose_node(None, None)
+            yield loader.construct_document(node)
+    finally:
+        loader.dispose()
+
+
+def open_sequence_stream(path: str, input_type: str) -> Optional[Iterator]:
+    """
+    Open a JSON or YAML document for item-by-item reading.
+
+    Args:
+        path: Path to the JSON/YAML file
+        input_type: Either 'json' or 'yaml'
+
+    Returns:
+        An iterator over the top-level sequence items, or None if the document's
+        top-level value is not a sequence (callers should load it whole).
+    """
+    if input_type == 'json':
+        if _first_non_whitespace_char(path) != '[':
+            return None
+        return _iter_json_array(path)
+
+    f = open(path, 'r')
+    loader = YamlStreamingLoader(f)
+    try:
+        # Skip StreamStart and DocumentStart, then look at the root node
+        loader.get_event()
+        loader.get_event()
+        if loader.check_event(SequenceStartEvent):
+            loader.get_event()
+
+            def items():
+                try:
+                    yield from _iter_yaml_sequence(loader)
+                finally:
+                    f.close()
+
+            return items()
+    except yaml.YAMLError:
+        pass
+    loader.dispose()
+    f.close()
+    return None
+
+
+def _coerce_filter_value(series: pd.Series, value):
+    """Convert a JSON filter value (or list of values) to match a column's dtype."""
+    try:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return pd.to_datetime(value)
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return pd.to_numeric(value)
+    except (ValueError, TypeError):
+        pass
+    return value
+
+
+def filter_frame(df: pd.DataFrame, filters: list[dict]) -> pd.DataFrame:
+    """
+    Keep the rows of a DataFrame matching every filter.
+
+    Args:
+        df: DataFrame chunk to filter
+        filters: List of {"column", "op", "value"} predicates
+
+    Returns:
+        The matching rows
+    """
+    if not filters:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for row_filter in filters:
+        column = row_filter['column']
+        if column not in df.columns:
+            # JSON/YAML records need not share keys: a record without the
+            # column does not match, as in record_matches
+            return df.iloc[0:0]
+        series = df[column]
+        value = _coerce_filter_value(series, row_filter['value'])
+        try:
+            if row_filter['op'] == 'in':
+                mask &= series.isin(list(value))
+            elif row_filter['op'] == 'not in':
+                mask &= ~series.isin(list(value))
+            else:
+                mask &= _COMPARISONS[row_filter['op']](series, value)
+        except TypeError:
+            raise InvalidConversionOptions(f"Cannot compare column {column} {row_filter['op']} {row_filter['value']!r}")
+    return df[mask]
+
+
+def record_matches(record, filters: list[dict]) -> bool:
+    """Check whether a JSON/YAML record (mapping) satisfies every filter."""
+    if not isinstance(record, dict):
+        return False
+    for row_filter in filters:
+        if row_filter['column'] not in record:
+            return False
+        field = record[row_filter['column']]
+        value = row_filter['value']
+        try:
+            # List membership (never substring matching), as in pandas and Arrow
+            if row_filter['op'] == 'in':
+                matched = field in list(value)
+            elif row_filter['op'] == 'not in':
+                matched = field not in list(value)
+            else:
+                matched = _COMPARISONS[row_filter['op']](field, value)
+        except TypeError:
+            matched = False
+        if not matched:
+            return False
+    return True
+
+
+def arrow_filter_expression(schema, filters: list[dict]):
+    """
+    Build a pyarrow dataset filter from row filters.
+
+    Filter values are cast to the column's Arrow type so that, for example, an
+    ISO date string can be compared with a timestamp column. The parquet scanner
+    uses the expression to skip row groups whose statistics cannot match.
+
+    Args:
+        schema: Arrow schema of the dataset
+        filters: List of {"column", "op", "value"} predicates
+
+    Returns:
+        A pyarrow compute Expression, or None if there are no filters
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    def cast(value, field_type):
+        try:
+            return pa.scalar(value).cast(field_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            return value
+
+    expression = None
+    for row_filter in filters:
+        column = row_filter['column']
+        if schema.get_field_index(column) == -1:
+            raise InvalidConversionOptions(f"Unknown filter column: {column}")
+        field_type = schema.field(column).type
+        field = pc.field(column)
+        if row_filter['op'] in ['in', 'not in']:
+            try:
+                values = pa.array([cast(v, field_type) for v in row_filter['value']], type=field_type)
+            except (pa.ArrowException, TypeError):
+                raise InvalidConversionOptions(f"Filter values for column {column} do not match its type {field_type}")
+            condition = field.isin(values)
+            if row_filter['op'] == 'not in':
+                condition = ~condition
+        else:
+            condition = _COMPARISONS[row_filter['op']](field, cast(row_filter['value'], field_type))
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def write_json_items(items: Iterable, output_file: str):
+    """
+    Write items as a JSON array one element at a time.
+
+    Produces the same layout as `json.dump(list(items), f, indent=2)`.
+    """
+    with open(output_file, 'w') as f:
+        empty = True
+        for item in items:
+            f.write('[\n' if empty else ',\n')
+            f.write(textwrap.indent(json.dumps(item, indent=2), '  ', lambda line: True))
+            empty = False
+        f.write('[]' if empty else '\n]')
+
+
+def write_yaml_items(items: Iterable, output_file: str, sort_keys: bool = True):
+    """
+    Write items as a YAML block sequence one element at a time.
+
+    Produces the same layout as `yaml.dump(list(items), f, default_flow_style=False)`.
+    """
+    with open(output_file, 'w') as f:
+        empty = True
+        for item in items:
+            yaml.dump([item], f, Dumper=YamlDumper, default_flow_style=False, sort_keys=sort_keys)
+            empty = False
+        if empty:
+            yaml.dump([], f, Dumper=YamlDumper, default_flow_style=False)
+
 
 class PandasConverter(ConverterInterface):
-    supported_input_formats: set = {
-        'csv', 
-        'xlsx', 
-        'json', 
-        'parquet', 
-        'yaml'
-    }
-    supported_output_formats: set = set(supported_input_formats)
+    supported_input_formats: set = PANDAS_FORMATS
+    supported_output_formats: set = PANDAS_FORMATS
 
-    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str):
+    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str, options: Optional[dict] = None):
         """
         Initialize Pandas converter.
         
@@ -23,8 +413,16 @@ class PandasConverter(ConverterInterface):
             output_dir: Directory where the output file will be saved
             input_type: Format of the input file (e.g., "csv", "xlsx")
             output_type: Format of the output file (e.g., "csv", "xlsx")
+            options: Conversion options from the request (optional)
         """
-        super().__init__(input_file, output_dir, input_type, output_type)
+        super().__init__(input_file, output_dir, input_type, output_type, options)
+        self.chunk_rows = get_settings().data_chunk_rows
+
+        # Column projection, row filters and row limit
+        data_options = self.options.get('data_options') or {}
+        self.columns = data_options.get('columns')
+        self.filters = data_options.get('filters') or []
+        self.limit = data_options.get('limit')
     
     def __can_convert(self) -> bool:
         """
@@ -42,6 +440,319 @@ class PandasConverter(ConverterInterface):
         
         return True
 
+    def _load_document(self):
+        """Load a whole JSON or YAML document into memory."""
+        with open(self.input_file, 'r') as f:
+            if self.input_type == 'yaml':
+                # YamlLoader is CSafeLoader or SafeLoader, which only build plain types
+                return yaml.load(f, Loader=YamlLoader)  # nosec B506
+            return json.load(f)
+
+    def _record_columns(self) -> Optional[list]:
+        """
+        Collect the column names of a JSON/YAML sequence of records in one pass.
+
+        Returns:
+            Column names in order of first appearance (matching `pd.DataFrame(records)`),
+            or None if the document is not a sequence of mappings.
+        """
+        items = open_sequence_stream(self.input_file, self.input_type)
+        if items is None:
+            return None
+        columns = {}
+        for item in items:
+            if not isinstance(item, dict):
+                items.close()
+                return None
+            columns.update(dict.fromkeys(item))
+        return list(columns)
+
+    def _input_columns(self) -> Optional[list]:
+        """
+        Column names of the input, from its header or schema.
+
+        Returns:
+            The columns of a csv, xlsx or parquet input, or None for JSON/YAML,
+            whose records need not share keys (a missing key reads as null)
+        """
+        if self.input_type == 'csv':
+            return list(pd.read_csv(self.input_file, nrows=0).columns)
+        if self.input_type == 'xlsx':
+            return list(pd.read_excel(self.input_file, nrows=0).columns)
+        if self.input_type == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.read_schema(self.input_file).names
+        return None
+
+    def _check_columns(self):
+        """Reject options naming a column the input does not have, before reading any rows."""
+        parquet_options = self.options.get('parquet_options') or {}
+        requested = [
+            *(self.columns or []),
+            *(f['column'] for f in self.filters),
+            *(parquet_options.get('partition_columns') or []),
+            *(parquet_options.get('dictionary_columns') or []),
+        ]
+        if not requested:
+            return
+        available = self._input_columns()
+        if available is None:
+            return
+        unknown = [column for column in dict.fromkeys(requested) if column not in available]
+        if unknown:
+            raise InvalidConversionOptions(f"Unknown column{'s' if len(unknown) > 1 else ''}: {', '.join(unknown)}")
+
+    def _read_columns(self) -> Optional[list]:
+        """Columns needed from the input: the selected ones plus any used by filters."""
+        if not self.columns:
+            return None
+        filter_columns = [f['column'] for f in self.filters]
+        return list(dict.fromkeys(self.columns + filter_columns))
+
+    def _read_frames(self) -> Iterator[pd.DataFrame]:
+        """
+        Read the input as a sequence of DataFrame chunks.
+
+        CSV and top-level JSON/YAML sequences are read incrementally, at most
+        `data_chunk_rows` rows at a time. Other inputs yield one frame. Only
+        the columns needed for projection and filtering are parsed.
+        """
+        usecols = self._read_columns()
+        # Without filters the row limit can stop the reader early
+        nrows = self.limit if not self.filters else None
+        if self.input_type == 'csv':
+            yield from pd.read_csv(self.input_file, usecols=usecols, nrows=nrows, chunksize=self.chunk_rows)
+        elif self.input_type == 'xlsx':
+            yield pd.read_excel(self.input_file, usecols=usecols, nrows=nrows)
+        elif self.input_type in ['json', 'yaml']:
+            items = open_sequence_stream(self.input_file, self.input_type)
+            if items is not None:
+                if nrows is not None:
+                    items = islice(items, nrows)
+                for batch in _batched(items, self.chunk_rows):
+                    yield pd.DataFrame(batch)
+            else:
+                # For nested structures, flatten them
+                yield pd.json_normalize(self._load_document())
+
+    def _scan_parquet(self) -> Iterator[pd.DataFrame]:
+        """
+        Read parquet input with projection and filters pushed into the Arrow scanner.
+
+        Only the selected columns are decoded, and row groups whose min/max
+        statistics rule out the filters are skipped without being read.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        dataset = ds.dataset(self.input_file, format='parquet')
+        expression = arrow_filter_expression(dataset.schema, self.filters)
+        try:
+            for batch in dataset.to_batches(columns=self.columns, filter=expression, batch_size=self.chunk_rows):
+                yield batch.to_pandas()
+        except pa.ArrowNotImplementedError as e:
+            # A filter value that cannot be compared with its column's type
+            raise InvalidConversionOptions(f"Cannot apply the filters to this file: {e}")
+
+    def _iter_frames(self) -> Iterator[pd.DataFrame]:
+        """Read the input as filtered, limited and projected DataFrame chunks."""
+        if self.input_type == 'parquet':
+            frames = self._scan_parquet()
+        else:
+            frames = (filter_frame(df, self.filters) for df in self._read_frames())
+
+        remaining = self.limit
+        for df in frames:
+            if remaining is not None:
+                df = df.head(remaining)
+                remaining -= len(df)
+            if self.columns:
+                df = df.reindex(columns=self.columns)
+            yield df
+            if remaining == 0:
+                break
+
+    def _select_records(self, items: Iterator) -> Iterator:
+        """Apply filters, row limit and projection to a stream of JSON/YAML records."""
+        if self.filters:
+            items = (item for item in items if record_matches(item, self.filters))
+        if self.limit is not None:
+            items = islice(items, self.limit)
+        if self.columns:
+            items = (
+                {column: item.get(column) for column in self.columns} if isinstance(item, dict) else item
+                for item in items
+            )
+        return items
+
+    def _convert_document(self, output_file: str):
+        """Convert between JSON and YAML directly, preserving nested structure."""
+        items = open_sequence_stream(self.input_file, self.input_type)
+        if items is not None:
+            items = self._select_records(items)
+            if self.output_type == 'yaml':
+                write_yaml_items(items, output_file, sort_keys=False)
+            else:  # json
+                write_json_items(items, output_file)
+            return
+
+        data = self._load_document()
+        if self.output_type == 'yaml':
+            with open(output_file, 'w') as f:
+                yaml.dump(data, f, Dumper=YamlDumper, default_flow_style=False, sort_keys=False)
+        else:  # json
+            with open(output_file, 'w') as f:
+                json.dump(data, f, indent=2)
+
+    def _write_frames(self, frames: Iterator[pd.DataFrame], output_file: str) -> str:
+        """
+        Write DataFrame chunks to the output format.
+
+        Returns:
+            Path to the written output (a ZIP archive for partitioned parquet)
+        """
+        if self.output_type == 'csv':
+            columns = self.columns
+            if columns is None and self.input_type in ['json', 'yaml']:
+                # Records may not share keys, so fix the header up front
+                columns = self._record_columns()
+            header = True
+            for df in frames:
+                if columns is not None:
+                    df = df.reindex(columns=columns)
+                df.to_csv(output_file, index=False, header=header, mode='w' if header else 'a')
+                header = False
+            if header:
+                pd.DataFrame(columns=columns).to_csv(output_file, index=False)
+        elif self.output_type == 'json':
+            records = (
+                record
+                for df in frames
+                for record in json.loads(df.to_json(orient='records'))
+            )
+            write_json_items(records, output_file)
+        elif self.output_type == 'yaml':
+            records = (
+                record
+                for df in frames
+                for record in df.to_dict(orient='records')
+            )
+            write_yaml_items(records, output_file)
+        elif self.output_type == 'parquet':
+            return self._write_parquet(frames, output_file)
+        elif self.output_type == 'xlsx':
+            # The xlsx writer needs the whole frame
+            df = pd.concat(list(frames) or [pd.DataFrame()], ignore_index=True)
+            df.to_excel(output_file, index=False)
+        return output_file
+
+    def _parquet_write_options(self) -> dict:
+        """Merge per-request parquet options over the defaults from settings."""
+        import pyarrow as pa
+        settings = get_settings()
+        parquet_options = self.options.get('parquet_options') or {}
+        compression = parquet_options.get('compression', settings.parquet_compression)
+        compression_level = parquet_options.get('compression_level', settings.parquet_compression_level)
+        # pyarrow would only fail once writing starts, as an ArrowInvalid
+        if compression_level is not None:
+            if compression == 'none' or not pa.Codec.supports_compression_level(compression):
+                raise InvalidConversionOptions(f"Compression {compression} does not take a compression level")
+            low, high = pa.Codec.minimum_compression_level(compression), pa.Codec.maximum_compression_level(compression)
+            if not low <= compression_level <= high:
+                raise InvalidConversionOptions(
+                    f"Compression level for {compression} must be between {low} and {high}, got {compression_level}"
+                )
+        return {
+            'compression': None if compression == 'none' else compression,
+            'compression_level': compression_level,
+            'use_dictionary': parquet_options.get('dictionary_columns') or True,
+            'write_statistics': parquet_options.get('write_statistics', settings.parquet_write_statistics),
+        }
+
+    def _iter_arrow_tables(self, frames: Iterator[pd.DataFrame]):
+        """
+        Convert DataFrame chunks to Arrow tables for writing.
+
+        Parquet input has a fixed schema, so its chunks are written as they
+        arrive. Other inputs infer dtypes per chunk and are combined first so
+        every row group shares one schema.
+        """
+        import pyarrow as pa
+        if self.input_type == 'parquet':
+            schema = None
+            for df in frames:
+                table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+                schema = table.schema
+                yield table
+        else:
+            df = pd.concat(list(frames) or [pd.DataFrame()], ignore_index=True)
+            yield pa.Table.from_pandas(df, preserve_index=False)
+
+    def _write_parquet(self, frames: Iterator[pd.DataFrame], output_file: str) -> str:
+        """
+        Write DataFrame chunks to parquet using the configured writer options.
+
+        With partition columns, a Hive-style dataset directory is written and
+        packed into a ZIP archive next to `output_file`.
+
+        Returns:
+            Path to the written parquet file or ZIP archive
+        """
+        import pyarrow.parquet as pq
+        parquet_options = self.options.get('parquet_options') or {}
+        write_options = self._parquet_write_options()
+        row_group_size = parquet_options.get('row_group_size') or get_settings().parquet_row_group_size
+        partition_columns = parquet_options.get('partition_columns')
+
+        if not partition_columns:
+            import pyarrow as pa
+            writer = None
+            pending = []
+            pending_rows = 0
+            try:
+                for table in self._iter_arrow_tables(frames):
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_file, table.schema, **write_options)
+                    # Buffer chunks so each row group reaches the requested size
+                    pending.append(table)
+                    pending_rows += table.num_rows
+                    if pending_rows >= row_group_size:
+                        combined = pa.concat_tables(pending)
+                        full_rows = pending_rows - pending_rows % row_group_size
+                        writer.write_table(combined.slice(0, full_rows), row_group_size=row_group_size)
+                        pending = [combined.slice(full_rows)]
+                        pending_rows -= full_rows
+                if writer is not None and pending_rows:
+                    writer.write_table(pa.concat_tables(pending), row_group_size=row_group_size)
+            finally:
+                if writer is not None:
+                    writer.close()
+            return output_file
+
+        dataset_dir = os.path.splitext(output_file)[0]
+        zip_path = f"{dataset_dir}.zip"
+        shutil.rmtree(dataset_dir, ignore_errors=True)
+        try:
+            for index, table in enumerate(self._iter_arrow_tables(frames)):
+                pq.write_to_dataset(
+                    table,
+                    dataset_dir,
+                    partition_cols=partition_columns,
+                    basename_template=f"part-{index}-{{i}}.parquet",
+                    existing_data_behavior='overwrite_or_ignore',
+                    max_rows_per_group=row_group_size,
+                    min_rows_per_group=0,
+                    **write_options
+                )
+            # Parquet pages are already compressed, so store them as-is
+            with ZipFile(zip_path, 'w') as zip_file:
+                for root, _, files in os.walk(dataset_dir):
+                    for name in sorted(files):
+                        path = os.path.join(root, name)
+                        zip_file.write(path, arcname=os.path.relpath(path, dataset_dir))
+        finally:
+            shutil.rmtree(dataset_dir, ignore_errors=True)
+        return zip_path
+
     def convert(self, overwrite: bool = True, quality: Optional[str] = None) -> list[str]:
         """
         Convert the input file to the output format using Pandas.
@@ -64,62 +775,16 @@ class PandasConverter(ConverterInterface):
         if os.path.exists(output_file) and not overwrite:
             raise FileExistsError(f"Output file {output_file} already exists and overwrite is set to False.")
         
+        self._check_columns()
+        if self.output_type == 'parquet':
+            self._parquet_write_options()
+
         # Handle YAML <-> JSON conversions directly (preserve nested structure)
         if self.input_type in ['yaml', 'json'] and self.output_type in ['yaml', 'json']:
-            if self.input_type == 'yaml':
-                with open(self.input_file, 'r') as f:
-                    data = yaml.safe_load(f)
-            else:  # json
-                with open(self.input_file, 'r') as f:
-                    data = json.load(f)
-            
-            if self.output_type == 'yaml':
-                with open(output_file, 'w') as f:
-                    yaml.dump(data, f, default_flow_style=False, sort_keys=False)
-            else:  # json
-                with open(output_file, 'w') as f:
-                    json.dump(data, f, indent=2)
-            
+            self._convert_document(output_file)
             return [output_file]
         
         # For tabular conversions, use pandas
-        df = None
-        if self.input_type == 'csv':
-            df = pd.read_csv(self.input_file)
-        elif self.input_type == 'xlsx':
-            df = pd.read_excel(self.input_file)
-        elif self.input_type == 'json':
-            with open(self.input_file, 'r') as f:
-                data = json.load(f)
-            # Try to convert to DataFrame - if it's a list of dicts, it works directly
-            if isinstance(data, list):
-                df = pd.DataFrame(data)
-            else:
-                # For nested structures, flatten them
-                df = pd.json_normalize(data)
-        elif self.input_type == 'parquet':
-            df = pd.read_parquet(self.input_file)
-        elif self.input_type == 'yaml':
-            with open(self.input_file, 'r') as f:
-                data = yaml.safe_load(f)
-            # Try to convert to DataFrame - if it's a list of dicts, it works directly
-            if isinstance(data, list):
-                df = pd.DataFrame(data)
-            else:
-                # For nested structures, flatten them
-                df = pd.json_normalize(data)
-        
-        # Write DataFrame to output format
-        if self.output_type == 'csv':
-            df.to_csv(output_file, index=False)
-        elif self.output_type == 'xlsx':
-            df.to_excel(output_file, index=False)
-        elif self.output_type == 'json':
-            df.to_json(output_file, orient='records', indent=2)
-        elif self.output_type == 'parquet':
-            df.to_parquet(output_file, index=False)
-        elif self.output_type == 'yaml':
-            with open(output_file, 'w') as f:
-                yaml.dump(df.to_dict(orient='records'), f, default_flow_style=False)
+        output_file = self._write_frames(self._iter_frames(), output_file)
         
-        return [output_file]
\ No newline at end of file
+        return [output_file]
@@ -1,9 +1,10 @@
 import os
 import sys
+import math
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional
 from io import BytesIO
-from PIL import Image
+from PIL import Image, ImageColor, ImageOps, ExifTags, TiffImagePlugin
 from pillow_heif import HeifImagePlugin
 
 # Add Homebrew library paths for Cairo on macOS
@@ -25,28 +26,369 @@ if sys.platform == 'darwin':  # macOS
     ctypes.util.find_library = custom_find_library
 
 import cairosvg
-from .converter_interface import ConverterInterface
+from cairosvg.helpers import node_format
+from cairosvg.parser import Tree
+from core import get_settings
+from core.resource_limits import ConversionLimitExceeded
+from .converter_interface import ConverterInterface, InvalidConversionOptions
+from .manifest import PILLOW_FORMATS, pillow_compatible
+
+# Pillow refuses to open images over twice MAX_IMAGE_PIXELS (about 179M
+# pixels by default), before the budget checks below run. Use the
+# configured budget instead; it is checked from the header on open.
+Image.MAX_IMAGE_PIXELS = get_settings().image_max_pixels
+
+
+def fit_size(
+    width: int,
+    height: int,
+    max_width: Optional[int],
+    max_height: Optional[int],
+    fit: str = 'contain'
+) -> tuple[tuple[int, int], Optional[tuple[int, int]]]:
+    """
+    Compute the resized dimensions of an image for a bounding box.
+
+    Images are never upscaled. When only one bound is given the aspect ratio
+    is always kept, regardless of the fit mode.
+
+    Args:
+        width: Source width in pixels
+        height: Source height in pixels
+        max_width: Maximum output width (None for unbounded)
+        max_height: Maximum output height (None for unbounded)
+        fit: 'contain' (fit inside the box), 'cover' (fill the box, then crop)
+            or 'fill' (stretch to the box)
+
+    Returns:
+        Tuple of (resize size, crop size or None). The crop size is only set
+        for 'cover' and is applied centered after resizing.
+    """
+    width_scale = max_width / width if max_width else None
+    height_scale = max_height / height if max_height else None
+
+    if width_scale is None or height_scale is None:
+        scale = min(1.0, width_scale or height_scale or 1.0)
+        return (max(1, round(width * scale)), max(1, round(height * scale))), None
+
+    if fit == 'fill':
+        return (min(width, max_width), min(height, max_height)), None
+
+    if fit == 'cover':
+        scale = min(1.0, max(width_scale, height_scale))
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        crop = (min(size[0], max_width), min(size[1], max_height))
+        return size, (crop if crop != size else None)
+
+    scale = min(1.0, width_scale, height_scale)
+    return (max(1, round(width * scale)), max(1, round(height * scale))), None
+
+
+# Encoder settings per output format and profile: 'fast' minimizes encode
+# time, 'smallest' minimizes output size, 'balanced' sits in between
+ENCODE_PROFILES = {
+    'png': {
+        'fast': {'compress_level': 1},
+        'balanced': {'compress_level': 6},
+        'smallest': {'compress_level': 9, 'optimize': True},
+    },
+    'webp': {
+        'fast': {'method': 0},
+        'balanced': {'method': 4},
+        'smallest': {'method': 6},
+    },
+    'jpeg': {
+        'fast': {},
+        'balanced': {'optimize': True},
+        'smallest': {'optimize': True, 'progressive': True},
+    },
+    'avif': {
+        'fast': {'speed': 9},
+        'balanced': {'speed': 6},
+        'smallest': {'speed': 4},
+    },
+}
+
+# Encoder quality per quality level for lossy formats
+QUALITY_LEVELS = {
+    'jpeg': {'high': 95, 'medium': 85, 'low': 60, 'lossless': 100},
+    'webp': {'high': 95, 'medium': 85, 'low': 60},
+    'avif': {'high': 90, 'medium': 75, 'low': 50, 'lossless': 100},
+}
+
+# Lossless WebP uses quality as compression effort rather than fidelity
+WEBP_LOSSLESS_EFFORT = {'fast': 25, 'balanced': 75, 'smallest': 100}
+
+
+def encoder_save_kwargs(output_fmt: str, quality: Optional[str], profile: str) -> dict:
+    """
+    Build Pillow save() arguments for an output format.
+
+    Args:
+        output_fmt: Normalized output format (e.g. 'jpeg', 'png', 'webp', 'avif')
+        quality: 'high', 'medium', 'low', 'lossless' or None (medium)
+        profile: Encode profile, 'fast', 'balanced' or 'smallest'
+
+    Returns:
+        Keyword arguments for Image.save()
+    """
+    save_kwargs = dict(ENCODE_PROFILES.get(output_fmt, {}).get(profile, {}))
+    quality = quality or 'medium'
+
+    if output_fmt == 'webp' and quality == 'lossless':
+        save_kwargs.update(lossless=True, quality=WEBP_LOSSLESS_EFFORT[profile])
+    elif output_fmt in QUALITY_LEVELS:
+        levels = QUALITY_LEVELS[output_fmt]
+        save_kwargs['quality'] = levels.get(quality, levels['medium'])
+
+    # Keep full chroma resolution when quality matters most
+    if output_fmt == 'jpeg':
+        save_kwargs['subsampling'] = 0 if quality in ['high', 'lossless'] else 2
+    elif output_fmt == 'avif':
+        save_kwargs['subsampling'] = '4:4:4' if quality in ['high', 'lossless'] else '4:2:0'
+    return save_kwargs
+
+
+# Image.info keys that carry metadata rather than pixel/encoding information
+METADATA_KEYS = {'exif', 'icc_profile', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop'}
+
+# EXIF orientations that swap width and height (90/270 degree rotations)
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def flatten_alpha(img: Image.Image, background: str = '#ffffff') -> Image.Image:
+    """
+    Composite an image with transparency onto a solid background.
+
+    Args:
+        img: Image to flatten (returned unchanged if it has no alpha)
+        background: Background color (any Pillow color string)
+
+    Returns:
+        RGB image without transparency
+    """
+    if img.mode == 'P':
+        img = img.convert('RGBA')
+    if img.mode not in ['RGBA', 'LA']:
+        return img
+    if img.mode == 'LA':
+        img = img.convert('RGBA')
+    flattened = Image.new('RGB', img.size, ImageColor.getrgb(background))
+    flattened.paste(img, mask=img.split()[-1])  # Use alpha channel as mask
+    return flattened
+
+
+def resize_image(
+    img: Image.Image,
+    max_width: Optional[int],
+    max_height: Optional[int],
+    fit: str = 'contain',
+    source_size: Optional[tuple[int, int]] = None
+) -> Image.Image:
+    """
+    Resize an image to a bounding box and fit mode.
+
+    `reducing_gap` first shrinks by an integer factor with a cheap box
+    reduction, then finishes with Lanczos resampling, which is much faster
+    than a single Lanczos pass over a large image with near-identical output.
+
+    Args:
+        img: Image to resize
+        max_width: Maximum output width (None for unbounded)
+        max_height: Maximum output height (None for unbounded)
+        fit: 'contain', 'cover' or 'fill' (see fit_size)
+        source_size: Size to compute the target from, if the image was already
+            decoded at reduced size (defaults to the image's own size)
+
+    Returns:
+        The resized (and, for 'cover', center-cropped) image
+    """
+    size, crop = fit_size(*(source_size or img.size), max_width, max_height, fit)
+    if size != img.size:
+        img = img.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    if crop is not None:
+        left = (img.width - crop[0]) // 2
+        top = (img.height - crop[1]) // 2
+        img = img.crop((left, top, left + crop[0], top + crop[1]))
+    return img
+
+
+def apply_operation(img: Image.Image, operation: dict) -> Image.Image:
+    """
+    Apply one declarative transform operation to an in-memory image.
+
+    Args:
+        img: Image to transform
+        operation: Operation dict with an 'op' key ('resize', 'crop', 'rotate',
+            'flip', 'flatten' or 'grayscale') and its parameters
+
+    Returns:
+        The transformed image
+
+    Raises:
+        InvalidConversionOptions: If the operation is unknown or its parameters
+            do not fit the image (e.g. a crop box outside it)
+    """
+    op = operation['op']
+    if op == 'resize':
+        return resize_image(img, operation.get('max_width'), operation.get('max_height'), operation.get('fit', 'contain'))
+    if op == 'crop':
+        left, top = operation['left'], operation['top']
+        right, bottom = left + operation['width'], top + operation['height']
+        # Checked here, against the image as the earlier steps left it
+        if left < 0 or top < 0 or right > img.width or bottom > img.height:
+            raise InvalidConversionOptions(
+                f"Crop box {(left, top, right, bottom)} exceeds the image size {img.width}x{img.height} at that step"
+            )
+        return img.crop((left, top, right, bottom))
+    if op == 'rotate':
+        # Pillow rotates counter-clockwise; the API takes clockwise degrees
+        degrees = operation['degrees'] % 360
+        if degrees in (90, 180, 270):
+            return img.transpose({
+                90: Image.Transpose.ROTATE_270,
+                180: Image.Transpose.ROTATE_180,
+                270: Image.Transpose.ROTATE_90,
+            }[degrees])
+        return img.rotate(-degrees, resample=Image.Resampling.BICUBIC, expand=operation.get('expand', True))
+    if op == 'flip':
+        if operation['direction'] == 'horizontal':
+            return img.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+        return img.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+    if op == 'flatten':
+        return flatten_alpha(img, operation.get('background', '#ffffff'))
+    if op == 'grayscale':
+        return img.convert('LA' if 'A' in img.getbands() else 'L')
+    raise InvalidConversionOptions(f"Unknown image operation: {op}")
+
+
+def svg_intrinsic_size(path: str) -> Optional[tuple[float, float]]:
+    """
+    Read an SVG's size from its width/height/viewBox attributes without rendering.
+
+    Returns:
+        (width, height) in user units, or None if it cannot be determined
+        without a rendering surface (e.g. sizes given in physical units).
+    """
+    try:
+        width, height, _ = node_format(None, Tree(url=path))
+    except Exception:
+        return None
+    return (width, height) if width and height else None
+
+
+# Output formats that keep every frame of animated input
+ANIMATED_OUTPUT_FORMATS = {'gif', 'webp', 'avif'}
+
+
+def decoded_bytes(size: tuple[int, int], mode: str) -> int:
+    """Memory Pillow needs to hold an image of this size and mode."""
+    if mode in ['1', 'L', 'P']:
+        bytes_per_pixel = 1
+    elif mode.startswith('I;16'):
+        bytes_per_pixel = 2
+    else:
+        # Multi-band modes are stored as 4 bytes per pixel
+        bytes_per_pixel = 4
+    return size[0] * size[1] * bytes_per_pixel
+
+
+# Target size of one full-resolution band when a single strip is split up
+BAND_BYTES = 16 * 1024 * 1024
+
+
+def decode_by_bands(path: str, factor: int) -> Image.Image:
+    """
+    Decode a strip- or tile-addressable image band by band, shrinking each band.
+
+    Each band of whole strips (or tile rows) is decoded on its own and reduced
+    by `factor` before the next one is read, so peak memory is the reduced
+    output plus a single band rather than the full-resolution image.
+
+    Args:
+        path: Path to an image whose tiles each cover part of the image
+            (e.g. an uncompressed striped or tiled TIFF)
+        factor: Integer reduction factor applied to both dimensions
+
+    Returns:
+        The reduced image
+    """
+    with Image.open(path) as img:
+        width, height = img.size
+        mode = img.mode
+        tiles = list(img.tile)
+        if len(tiles) == 1:
+            # A single uncompressed strip is split into row blocks using the
+            # strip's byte count, so it can be decoded a few rows at a time
+            tile = tiles[0]
+            x0, y0, x1, y1 = tile.extents
+            stride = img.tag_v2[TiffImagePlugin.STRIPBYTECOUNTS][0] // (y1 - y0)
+            block_rows = max(1, BAND_BYTES // max(1, decoded_bytes((width, factor), mode))) * factor
+            tiles = [
+                tile._replace(
+                    extents=(x0, top, x1, min(top + block_rows, y1)),
+                    offset=tile.offset + (top - y0) * stride,
+                    args=(tile.args[0], stride, 1),
+                )
+                for top in range(y0, y1, block_rows)
+            ]
+    reduced = Image.new(mode, (math.ceil(width / factor), math.ceil(height / factor)))
+
+    # Band boundaries fall on tile rows, and every band except the last spans
+    # a multiple of `factor` rows so the reduced bands line up exactly
+    row_starts = sorted({tile.extents[1] for tile in tiles}) + [height]
+    band_top = 0
+    for row in row_starts[1:]:
+        if row != height and (row - band_top) % factor:
+            continue
+        with Image.open(path) as band:
+            band._size = (width, row - band_top)
+            band.tile = [
+                tile._replace(extents=(x0, y0 - band_top, x1, y1 - band_top))
+                for tile in tiles
+                for x0, y0, x1, y1 in [tile.extents]
+                if band_top <= y0 < row
+            ]
+            band.load()
+            reduced.paste(band.reduce(factor), (0, band_top // factor))
+        band_top = row
+    return reduced
+
+
+def transformed_frames(source: Image.Image, transform: Callable[[Image.Image], Image.Image]) -> Iterator[Image.Image]:
+    """
+    Decode and transform the frames of an animated image one at a time.
+
+    Passed to the writer as append_images (after the first frame), so a
+    frame is only decoded when the writer reaches it. The GIF writer
+    consumes the frames as it goes; the WebP and AVIF writers collect the
+    transformed frames before encoding them.
+
+    Args:
+        source: Animated image, positioned anywhere
+        transform: Function turning one decoded frame into the output frame
+
+    Yields:
+        Each transformed frame, with the source frame's info (e.g. duration)
+    """
+    # Later frames of palette animations decode as RGB(A), so every frame
+    # is brought to one mode that the multi-frame writers accept
+    frame_mode = 'RGBA' if source.mode in ['P', 'PA', 'LA', 'RGBA'] else 'RGB'
+    for frame in range(source.n_frames):
+        source.seek(frame)
+        if source.mode != frame_mode:
+            source_frame = source.convert(frame_mode)
+        else:
+            source_frame = source.copy()
+        transformed = transform(source_frame)
+        transformed.info = {**source.info, **transformed.info}
+        yield transformed
+
 
 class PillowConverter(ConverterInterface):
-    supported_input_formats: set = {
-        'jpeg', 
-        'png',
-        'gif', 
-        'bmp', 
-        'tiff', 
-        'tif',
-        'webp', 
-        'ico', 
-        'ppm', 
-        'pgm', 
-        'pbm', 
-        'pcx',
-        'heif',
-        'heic',
-        'svg'
-    }
-    supported_output_formats: set = set(supported_input_formats)
-    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str):
+    supported_input_formats: set = PILLOW_FORMATS
+    supported_output_formats: set = PILLOW_FORMATS
+    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str, options: Optional[dict] = None):
         """
         Initialize Pillow converter.
         
@@ -55,9 +397,25 @@ class PillowConverter(ConverterInterface):
             output_dir: Directory where the converted file will be saved
             input_type: Input file format (e.g., 'jpg', 'png', 'bmp')
             output_type: Output file format (e.g., 'jpg', 'png', 'bmp')
+            options: Conversion options from the request (optional)
         """
-        super().__init__(input_file, output_dir, input_type, output_type)
+        super().__init__(input_file, output_dir, input_type, output_type, options)
         HeifImagePlugin.register_heif_opener()
+
+        # Optional resize (bounding box and fit mode), applied first
+        image_options = self.options.get('image_options') or {}
+        self.max_width = image_options.get('max_width')
+        self.max_height = image_options.get('max_height')
+        self.fit = image_options.get('fit', 'contain')
+        # Transform operations, applied in order after the resize
+        self.operations = image_options.get('operations') or []
+        self.auto_orient = image_options.get('auto_orient', True)
+        self.strip_metadata = image_options.get('strip_metadata', False)
+        self.encode_profile = self.options.get('encode_profile') or get_settings().image_encode_profile
+        self.max_pixels = get_settings().image_max_pixels
+        self.max_memory_bytes = get_settings().image_max_memory_mb * 1024 * 1024
+        self._source_size = None
+        self._metadata = {}
     
     def __can_convert(self) -> bool:
         """
@@ -86,18 +444,215 @@ class PillowConverter(ConverterInterface):
         Returns:
             Set of compatible formats.
         """
-        base_formats = super().get_formats_compatible_with(format_type)
-        # Can convert FROM SVG but not TO SVG (rasterization only)
-        base_formats.discard('svg')
-        return base_formats
+        return pillow_compatible(format_type.lower())
     
+    def _render_svg(self) -> Image.Image:
+        """
+        Rasterize SVG input with cairosvg.
+
+        When the image is resized first, the SVG is rendered straight at the
+        target size instead of being rasterized at full size and scaled down.
+        """
+        render_kwargs = {}
+        bounds = self._decode_bounds()
+        if bounds is not None:
+            max_width, max_height, fit = bounds
+            intrinsic_size = svg_intrinsic_size(self.input_file)
+            if intrinsic_size is not None:
+                (width, height), _ = fit_size(
+                    round(intrinsic_size[0]), round(intrinsic_size[1]),
+                    max_width, max_height, fit
+                )
+                render_kwargs = {'output_width': width, 'output_height': height}
+            elif max_width:
+                # Unknown aspect ratio: constrain one side, _transform() handles the rest
+                render_kwargs = {'output_width': max_width}
+            else:
+                render_kwargs = {'output_height': max_height}
+        # Check the render size when it is known before rasterizing
+        if 'output_width' in render_kwargs and 'output_height' in render_kwargs:
+            self._check_budget((render_kwargs['output_width'], render_kwargs['output_height']), 'RGBA')
+        elif not render_kwargs and (intrinsic_size := svg_intrinsic_size(self.input_file)) is not None:
+            self._check_budget((round(intrinsic_size[0]), round(intrinsic_size[1])), 'RGBA')
+        # Convert SVG to PNG with transparency using cairosvg
+        png_data = cairosvg.svg2png(url=self.input_file, **render_kwargs)
+        return Image.open(BytesIO(png_data))
+
+    def _decode_bounds(self) -> Optional[tuple]:
+        """
+        Bounding box known before decoding, usable for reduced-size decoding.
+
+        Returns:
+            (max_width, max_height, fit) of the first resize step, or None if
+            the image is not resized before any other operation
+        """
+        if self.max_width or self.max_height:
+            return self.max_width, self.max_height, self.fit
+        if self.operations and self.operations[0]['op'] == 'resize':
+            first = self.operations[0]
+            return first.get('max_width'), first.get('max_height'), first.get('fit', 'contain')
+        return None
+
+    def _open_image(self) -> Image.Image:
+        """
+        Open the input image, decoding at reduced size when possible.
+
+        For JPEG input that is resized first, Pillow's draft mode lets libjpeg
+        decode at 1/2, 1/4 or 1/8 scale (still at least the target size),
+        which skips most of the IDCT work and memory of a full decode.
+        """
+        if self.input_type == 'svg':
+            return self._render_svg()
+
+        try:
+            img = Image.open(self.input_file)
+        except Image.DecompressionBombError as e:
+            # Over twice the pixel budget
+            raise ConversionLimitExceeded("pixels", f"Image is over the limit of {self.max_pixels} pixels ({e})")
+        orientation = img.getexif().get(ExifTags.Base.Orientation) if self.auto_orient else None
+        transposed = orientation in TRANSPOSED_ORIENTATIONS
+        # Size of the upright image before any reduction
+        self._source_size = img.size[::-1] if transposed else img.size
+
+        # Header dimensions are known before any pixel data is decoded
+        if img.width * img.height > self.max_pixels:
+            raise ConversionLimitExceeded(
+                "pixels", f"Image is {img.width}x{img.height} pixels, over the limit of {self.max_pixels} pixels"
+            )
+
+        bounds = self._decode_bounds()
+        if bounds is not None and img.format == 'JPEG':
+            size, _ = fit_size(*self._source_size, *bounds)
+            img.draft(None, size[::-1] if transposed else size)
+
+        if decoded_bytes(img.size, img.mode) > self.max_memory_bytes:
+            return self._decode_within_budget(img, bounds, transposed)
+        return img
+
+    def _check_budget(self, size: tuple[int, int], mode: str):
+        """
+        Reject images whose decoded size exceeds the pixel or memory budget.
+
+        Raises:
+            ConversionLimitExceeded: If either budget would be exceeded
+        """
+        if size[0] * size[1] > self.max_pixels:
+            raise ConversionLimitExceeded("pixels", f"Image is {size[0]}x{size[1]} pixels, over the limit of {self.max_pixels} pixels")
+        needed_bytes = decoded_bytes(size, mode)
+        if needed_bytes > self.max_memory_bytes:
+            raise ConversionLimitExceeded(
+                "memory",
+                f"Decoding a {size[0]}x{size[1]} {mode} image needs {needed_bytes // (1024 * 1024)} MiB, "
+                f"over the limit of {self.max_memory_bytes // (1024 * 1024)} MiB"
+            )
+
+    def _decode_within_budget(self, img: Image.Image, bounds: Optional[tuple], transposed: bool) -> Image.Image:
+        """
+        Decode an image too large for the memory budget at reduced resolution.
+
+        Only possible when the image is resized first and its strips or tiles
+        can be decoded separately (uncompressed TIFF). The image is then read
+        band by band and shrunk by the largest integer factor that still
+        leaves it at least as large as the target size.
+
+        Raises:
+            ConversionLimitExceeded: If the image cannot be decoded within the budget
+        """
+        band_decodable = (
+            img.format == 'TIFF'
+            and not getattr(img, 'use_load_libtiff', True)
+            and (
+                len(img.tile) > 1
+                or (img.tile[0].codec_name == 'raw' and img.tile[0].args[2:3] in [(), (1,)])
+            )
+        )
+        if bounds is None or not band_decodable:
+            self._check_budget(img.size, img.mode)
+
+        size, _ = fit_size(*self._source_size, *bounds)
+        if transposed:
+            size = size[::-1]
+        factor = max(1, min(img.width // size[0], img.height // size[1]))
+        self._check_budget((math.ceil(img.width / factor), math.ceil(img.height / factor)), img.mode)
+        img.close()
+        return decode_by_bands(self.input_file, factor)
+
+    def _needs_transform(self, img: Image.Image) -> bool:
+        """Whether _transform would change the image (resize, operations or EXIF orientation)."""
+        if self.max_width or self.max_height or self.operations:
+            return True
+        return self.auto_orient and img.getexif().get(ExifTags.Base.Orientation, 1) != 1
+
+    def _transform(self, img: Image.Image) -> Image.Image:
+        """
+        Run orientation, resize and the requested operations on the decoded image.
+
+        Every step works on the same in-memory image, so any number of
+        operations costs one decode and one encode.
+        """
+        if self.auto_orient and img.getexif().get(ExifTags.Base.Orientation, 1) != 1:
+            img = ImageOps.exif_transpose(img)
+        # Operations such as flatten build new images, so keep the metadata now
+        self._metadata = dict(img.info)
+
+        # The first resize is computed from the full-size dimensions, since
+        # draft mode may already have reduced the decoded image
+        source_size = self._source_size
+        if self.max_width or self.max_height:
+            img = resize_image(img, self.max_width, self.max_height, self.fit, source_size)
+            source_size = None
+        for operation in self.operations:
+            if operation['op'] == 'resize' and source_size is not None:
+                img = resize_image(img, operation.get('max_width'), operation.get('max_height'), operation.get('fit', 'contain'), source_size)
+            else:
+                img = apply_operation(img, operation)
+            source_size = None
+        return img
+
+    def _metadata_save_kwargs(self, img: Image.Image, metadata: dict, decoded_mode: str) -> dict:
+        """
+        Decide which metadata to write with the output.
+
+        With strip_metadata, EXIF, ICC, XMP and comments are removed entirely.
+        Otherwise EXIF is carried over, and the ICC profile is kept as long as
+        the color mode it describes is unchanged.
+        """
+        if self.strip_metadata:
+            # Some encoders fall back to img.info, so drop the keys there too
+            for key in METADATA_KEYS:
+                img.info.pop(key, None)
+            return {}
+        save_kwargs = {}
+        if isinstance(metadata.get('exif'), bytes):
+            save_kwargs['exif'] = metadata['exif']
+        if metadata.get('icc_profile') and img.mode == decoded_mode:
+            save_kwargs['icc_profile'] = metadata['icc_profile']
+        return save_kwargs
+
+    def _animation_save_kwargs(self, source: Image.Image, output_fmt: str) -> dict:
+        """
+        Writer options that keep every frame and the animation timing.
+
+        The GIF writer reads each frame's duration as it goes, but WebP and
+        AVIF take a list up front, so it is collected from the frame headers.
+        """
+        save_kwargs = {'save_all': True, 'loop': source.info.get('loop', 0)}
+        if output_fmt != 'gif':
+            durations = []
+            for frame in range(source.n_frames):
+                source.seek(frame)
+                durations.append(source.info.get('duration', 100))
+            source.seek(0)
+            save_kwargs['duration'] = durations
+        return save_kwargs
+
     def convert(self, overwrite: bool = True, quality: Optional[str] = None) -> list[str]:
         """
         Convert the input image file to the output format using Pillow.
         
         Args:
             overwrite: Whether to overwrite existing output file (default: True)
-            quality: Quality setting for lossy formats ('high', 'medium', 'low')
+            quality: Quality setting for lossy formats ('high', 'medium', 'low', 'lossless')
         
         Returns:
             List containing the path to the converted output file
@@ -105,6 +660,7 @@ class PillowConverter(ConverterInterface):
         Raises:
             FileNotFoundError: If input file doesn't exist
             ValueError: If the conversion is not supported
+            ConversionLimitExceeded: If the image is over the pixel or memory budget
             RuntimeError: If image conversion fails
         """
         # Validate conversion is possible
@@ -127,48 +683,43 @@ class PillowConverter(ConverterInterface):
             return [output_file]
         
         try:
-            # Handle SVG input specially
-            input_fmt = self.input_type.lower()
-            if input_fmt == 'svg':
-                # Convert SVG to PNG with transparency using cairosvg
-                png_data = cairosvg.svg2png(url=self.input_file)
-                img = Image.open(BytesIO(png_data))
+            img = self._open_image()
+            decoded_mode = img.mode
+            output_fmt = self.output_type.lower()
+            # Animated input keeps every frame, decoded one at a time as it is encoded
+            animated = getattr(img, 'is_animated', False) and output_fmt in ANIMATED_OUTPUT_FORMATS
+            animation_save_kwargs = {}
+            if animated:
+                source = img
+                # Frame durations are read before the frames are decoded
+                animation_save_kwargs = self._animation_save_kwargs(source, output_fmt)
+                if self._needs_transform(source):
+                    frames = transformed_frames(source, self._transform)
+                    img = next(frames)
+                    animation_save_kwargs['append_images'] = frames
+                else:
+                    # The writers seek through the source frames themselves
+                    self._metadata = dict(source.info)
             else:
-                # Open the image
-                img = Image.open(self.input_file)
+                img = self._transform(img)
             
             # Handle transparency for formats that don't support it
-            output_fmt = self.output_type.lower()
             if output_fmt in ['jpg', 'jpeg'] and img.mode in ['RGBA', 'LA', 'P']:
                 # Convert RGBA to RGB for JPEG (add white background)
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                if img.mode in ['RGBA', 'LA']:
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'LA':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1])  # Use alpha channel as mask
-                    img = background
-            
-            # Set quality parameters
-            save_kwargs = {}
-            if output_fmt in ['jpg', 'jpeg', 'webp']:
-                if quality == 'high':
-                    save_kwargs['quality'] = 95
-                elif quality == 'low':
-                    save_kwargs['quality'] = 60
-                else:  # medium or None
-                    save_kwargs['quality'] = 85
+                img = flatten_alpha(img)
             
-            # For PNG, handle optimization
-            if output_fmt == 'png':
-                save_kwargs['optimize'] = True
+            # Set encoder parameters (quality level and speed/size profile) and metadata
+            save_kwargs = encoder_save_kwargs(output_fmt, quality, self.encode_profile)
+            save_kwargs.update(self._metadata_save_kwargs(img, self._metadata, decoded_mode))
+            save_kwargs.update(animation_save_kwargs)
             
             # Save the image
             img.save(output_file, **save_kwargs)
             
             return [output_file]
             
+        except (InvalidConversionOptions, ConversionLimitExceeded):
+            raise
         except Exception as e:
             error_msg = f"Image conversion failed: {str(e)}"
             raise RuntimeError(error_msg)
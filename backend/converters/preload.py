@@ -0,0 +1,29 @@
+"""
+Imports every converter implementation.
+
+Conversion worker processes import this module (via the forkserver where
+available), so pandas, pyarrow, Pillow and the other converter libraries
+are loaded once, before the first job, instead of on every conversion. A
+converter whose dependencies fail to import is logged and skipped; its
+conversions fail as they would without preloading.
+"""
+import logging
+
+from .manifest import CONVERTER_MANIFEST
+
+
+logger = logging.getLogger("transmute.workers")
+
+for spec in CONVERTER_MANIFEST:
+    try:
+        spec.load()
+    except Exception as e:
+        logger.warning("Could not preload %s: %s", spec.name, e)
+
+# Loaded lazily on a converter's first use otherwise
+try:
+    from PIL import Image
+    Image.init()
+    import pyarrow.parquet
+except Exception as e:
+    logger.warning("Could not preload converter plugins: %s", e)
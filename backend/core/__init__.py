@@ -3,20 +3,28 @@ from .media_types import media_type_aliases
 
 from .helper_functions import (
     detect_media_type,
+    detect_media_type_from_buffer,
     sanitize_extension,
     delete_file_and_metadata,
     validate_sql_identifier,
     validate_safe_path,
-    validate_hexadecimal_filename
+    validate_hexadecimal_filename,
+    hash_file,
+    move_and_hash,
+    link_or_copy
 )
 
 __all__ = [
     "get_settings", 
     "detect_media_type", 
+    "detect_media_type_from_buffer",
     "sanitize_extension", 
     "delete_file_and_metadata", 
     "media_type_aliases",
     "validate_sql_identifier",
     "validate_safe_path",
-    "validate_hexadecimal_filename"
+    "validate_hexadecimal_filename",
+    "hash_file",
+    "move_and_hash",
+    "link_or_copy"
 ]
\ No newline at end of file
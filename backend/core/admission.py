@@ -0,0 +1,191 @@
+"""
+Admission control for uploads and conversions.
+
+AdmissionMiddleware turns uploads and conversions away before their body
+is read, instead of accepting everything until the disk or memory runs out:
+
+- 503 while free disk, tmp usage, queued conversions or worker memory is
+  past its watermark (the server is saturated). tmp usage is the storage
+  gauge's running total plus the estimated output of the conversions
+  running, and queued conversions are the scheduler's; neither is scanned
+- 429 when the client already has ADMISSION_MAX_CLIENT_REQUESTS uploads
+  and conversions in flight
+
+Both responses carry Retry-After. Every other request (downloads,
+listings, health checks) is always let through. /api/health/ready reports
+the same saturation so a load balancer can steer traffic elsewhere.
+Counters are per worker process; with several HTTP workers, the other
+workers' counters are added in (core/shared_state.py).
+"""
+import json
+import os
+import re
+import shutil
+import sys
+from functools import lru_cache
+
+from core import metrics
+from core.scheduler import get_scheduler
+from core.settings import get_settings
+
+
+UPLOAD = "upload"
+CONVERSION = "conversion"
+
+# (method, path) of the requests that are subject to admission control
+ADMITTED_ROUTES = [
+    ("POST", re.compile(r"^/api/files/?$"), UPLOAD),
+    ("PUT", re.compile(r"^/api/files/?$"), UPLOAD),
+    ("POST", re.compile(r"^/api/files/uploads/?$"), UPLOAD),
+    ("PUT", re.compile(r"^/api/files/uploads/[^/]+/chunks/\d+/?$"), UPLOAD),
+    ("POST", re.compile(r"^/api/conversions/?$"), CONVERSION),
+]
+
+MB = 1024 * 1024
+
+
+def classify(method: str, path: str) -> str | None:
+    """The admission kind of a request, or None if it is not admission controlled."""
+    for route_method, pattern, kind in ADMITTED_ROUTES:
+        if method == route_method and pattern.match(path):
+            return kind
+    return None
+
+
+def current_rss_bytes() -> int | None:
+    """Resident memory of this process, or None where /proc is unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class AdmissionController:
+    """Watermark checks and in-flight counters for one worker process."""
+
+    def __init__(self):
+        settings = get_settings()
+        self.settings = settings
+        self.client_in_flight: dict[str, int] = {}
+        # On the other HTTP worker processes, as last published
+        self.peer_client_in_flight: dict[str, int] = {}
+        self.peer_queued_conversions = 0
+        self.peer_tmp_reserved_bytes = 0
+
+    def tmp_usage_bytes(self) -> int:
+        """Bytes in tmp, plus the estimated output of the conversions writing to it."""
+        reserved = sum(job.info.get("estimated_output_bytes") or 0 for job in get_scheduler().running.values())
+        return int(metrics.storage_bytes.get(directory="tmp")) + reserved + self.peer_tmp_reserved_bytes
+
+    def queued_conversions(self) -> int:
+        """Conversions waiting for a worker slot on every worker process."""
+        local = sum(lane.queued_count for lane in get_scheduler().lanes.values())
+        return local + self.peer_queued_conversions
+
+    def saturation(self, kind: str = CONVERSION) -> str | None:
+        """
+        Check the watermarks that apply to a kind of request.
+
+        Args:
+            kind: UPLOAD or CONVERSION (conversions are also limited by tmp
+                usage and the conversion queue)
+
+        Returns:
+            The reason the server is saturated, or None if it has capacity
+        """
+        s = self.settings
+        if s.admission_min_free_disk_mb:
+            free = shutil.disk_usage(s.data_dir).free
+            if free < s.admission_min_free_disk_mb * MB:
+                return f"free disk {free // MB} MB is below {s.admission_min_free_disk_mb} MB"
+        if s.admission_max_worker_memory_mb:
+            rss = current_rss_bytes()
+            if rss is not None and rss > s.admission_max_worker_memory_mb * MB:
+                return f"worker memory {rss // MB} MB is above {s.admission_max_worker_memory_mb} MB"
+        if kind == CONVERSION:
+            if s.admission_max_tmp_mb:
+                usage = self.tmp_usage_bytes()
+                if usage > s.admission_max_tmp_mb * MB:
+                    return f"tmp usage {usage // MB} MB is above {s.admission_max_tmp_mb} MB"
+            queued = self.queued_conversions()
+            if s.admission_max_queued_conversions and queued >= s.admission_max_queued_conversions:
+                return f"{queued} conversions are already queued"
+        return None
+
+    def client_id(self, scope) -> str:
+        if self.settings.admission_trust_forwarded_for:
+            for name, value in scope["headers"]:
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def client_requests(self, client: str) -> int:
+        """Uploads and conversions the client has in flight on every worker process."""
+        return self.client_in_flight.get(client, 0) + self.peer_client_in_flight.get(client, 0)
+
+    def acquire(self, client: str):
+        self.client_in_flight[client] = self.client_in_flight.get(client, 0) + 1
+
+    def release(self, client: str):
+        remaining = self.client_in_flight[client] - 1
+        if remaining:
+            self.client_in_flight[client] = remaining
+        else:
+            del self.client_in_flight[client]
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController:
+    """Shared controller, so the middleware and readiness check see the same counters."""
+    return AdmissionController()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that applies admission control to uploads and conversions."""
+
+    def __init__(self, app):
+        self.app = app
+        self.controller = get_admission_controller()
+        settings = get_settings()
+        self.max_client_requests = settings.admission_max_client_requests
+        self.retry_after = str(settings.admission_retry_after_seconds)
+
+    async def reject(self, send, status: int, detail: str):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", self.retry_after.encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        kind = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = self.controller.client_id(scope)
+        if self.max_client_requests and self.controller.client_requests(client) >= self.max_client_requests:
+            metrics.admission_rejections.inc(kind=kind, reason="client_limit")
+            await self.reject(send, 429, f"Too many uploads and conversions in flight for this client (limit {self.max_client_requests})")
+            return
+        reason = self.controller.saturation(kind)
+        if reason is not None:
+            metrics.admission_rejections.inc(kind=kind, reason="saturated")
+            await self.reject(send, 503, f"Server is saturated: {reason}")
+            return
+
+        self.controller.acquire(client)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(client)
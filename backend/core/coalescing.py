@@ -0,0 +1,98 @@
+"""
+In-flight coalescing of identical work.
+
+Concurrent requests for the same work (e.g. many clients converting a
+popular file to the same format) share one execution: the first request
+starts it, and the ones arriving while it runs wait for its result instead
+of starting their own. Once it finishes, later requests start a new one;
+nothing is cached beyond the execution.
+
+The shared work runs in its own task. A waiter that is cancelled (its
+client went away) just stops waiting. The work is cancelled only when its
+last waiter is. Coalescing is per worker process.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from core.metrics import record_cache_lookup
+
+
+class Flight:
+    """One execution and the requests waiting for it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class Coalescer:
+    """
+    Runs work once for all concurrent callers with the same key.
+
+    Args:
+        name: Label of the coalescing lookups in transmute_cache_requests_total
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.flights: dict[Hashable, Flight] = {}
+
+    def in_flight(self) -> int:
+        return len(self.flights)
+
+    async def run(
+        self,
+        key: Hashable,
+        work: Callable[[], Awaitable],
+        consume: Callable[[Any], Any],
+        discard: Callable[[Any], None] | None = None
+    ) -> Any:
+        """
+        Join the execution of work for key, starting it if none is in flight.
+
+        Args:
+            key: Identity of the work; callers with equal keys share it
+            work: Coroutine function doing the work (called by the first caller only)
+            consume: Called by every caller with the shared result, e.g. to
+                take its own copy of an output file; its return value is returned
+            discard: Called once with the shared result after the last caller
+                has consumed it (or left), e.g. to remove a shared file
+
+        Returns:
+            What consume returned for this caller (work's exception is raised)
+        """
+        flight = self.flights.get(key)
+        if flight is not None and flight.task.done():
+            # Finished; its result may already have been discarded
+            flight = None
+        record_cache_lookup(self.name, flight is not None)
+        if flight is None:
+            flight = Flight(asyncio.get_running_loop().create_task(work()))
+            self.flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+            return consume(result)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Nobody else wants the result: stop the work, and make sure
+                # a request arriving meanwhile starts a fresh execution
+                self._forget(key, flight)
+                flight.task.cancel()
+                if discard is not None:
+                    flight.task.add_done_callback(lambda task: self._discard(task, discard))
+            raise
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and flight.task.done() and discard is not None:
+                self._discard(flight.task, discard)
+
+    def _forget(self, key: Hashable, flight: Flight):
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+
+    @staticmethod
+    def _discard(task: asyncio.Task, discard: Callable[[Any], None]):
+        if not task.cancelled() and task.exception() is None:
+            discard(task.result())
@@ -0,0 +1,103 @@
+"""
+Conversion time and output size estimates, learned from past conversions.
+
+A conversion's cost is modelled from one measure of the work in its input:
+
+- seconds of audio or video (duration_seconds)
+- pixels of an image (width x height)
+- rows of a tabular file (row_count)
+- bytes, for everything the upload probe could not measure
+
+For every converter, format pair and measure, the stats database keeps
+running sums of each finished conversion's work, wall time and output size.
+A line (fixed overhead plus cost per unit of work) is fitted to those sums
+by least squares, so an estimate costs one row lookup however much history
+there is. Until a model has MIN_MODEL_SAMPLES conversions, time falls back
+to the converter's cost per MB and output size to the input size.
+"""
+from typing import Optional
+
+
+# Conversions needed before a fitted model replaces the prior
+MIN_MODEL_SAMPLES = 3
+
+
+def work_measure(metadata: dict) -> tuple[str, float]:
+    """
+    The measure of work in a file, from its stored (probed) metadata.
+
+    Args:
+        metadata: File metadata as stored by FileDB
+
+    Returns:
+        (unit, amount), where unit is 'seconds', 'pixels', 'rows' or 'bytes'
+    """
+    # Duration first: it dominates the cost of a video, which also has a size
+    if metadata.get('duration_seconds'):
+        return 'seconds', float(metadata['duration_seconds'])
+    if metadata.get('width') and metadata.get('height'):
+        return 'pixels', float(metadata['width'] * metadata['height'])
+    if metadata.get('row_count'):
+        return 'rows', float(metadata['row_count'])
+    return 'bytes', float(metadata['size_bytes'])
+
+
+def fit_line(samples: int, sum_x: float, sum_xx: float, sum_y: float, sum_xy: float) -> tuple[float, float]:
+    """
+    Least-squares fit of y = intercept + slope * x from running sums.
+
+    When the inputs are too alike to separate overhead from cost per unit
+    (or the fit comes out with a negative slope), the line is fitted
+    through the origin instead.
+
+    Returns:
+        (intercept, slope)
+    """
+    denominator = samples * sum_xx - sum_x * sum_x
+    if samples >= 2 and denominator > 1e-9 * samples * sum_xx:
+        slope = (samples * sum_xy - sum_x * sum_y) / denominator
+        if slope >= 0:
+            return (sum_y - slope * sum_x) / samples, slope
+    if sum_xx > 0:
+        return 0.0, sum_xy / sum_xx
+    return (sum_y / samples if samples else 0.0), 0.0
+
+
+def estimate_conversion(metadata: dict, model: Optional[dict], prior_seconds: float) -> dict:
+    """
+    Estimate a conversion's wall time and output size.
+
+    Args:
+        metadata: Stored metadata of the input file
+        model: Running sums for the converter, format pair and the input's
+            work unit (ConverterStatsDB.get_model), or None without history
+        prior_seconds: Time estimate to use until the model has enough samples
+
+    Returns:
+        Dict with estimated_seconds, estimated_output_bytes, work_unit,
+        work_amount, samples and basis ('history' or 'prior')
+    """
+    unit, amount = work_measure(metadata)
+    samples = model['samples'] if model else 0
+    if samples >= MIN_MODEL_SAMPLES:
+        time_intercept, time_slope = fit_line(
+            samples, model['sum_work'], model['sum_work_squared'], model['sum_seconds'], model['sum_work_seconds']
+        )
+        size_intercept, size_slope = fit_line(
+            samples, model['sum_work'], model['sum_work_squared'], model['sum_output_bytes'], model['sum_work_output_bytes']
+        )
+        seconds = max(0.0, time_intercept + time_slope * amount)
+        output_bytes = max(0.0, size_intercept + size_slope * amount)
+        basis = 'history'
+    else:
+        seconds = prior_seconds
+        output_bytes = float(metadata['size_bytes'])
+        basis = 'prior'
+    return {
+        "estimated_seconds": round(seconds, 3),
+        "estimated_output_bytes": int(output_bytes),
+        "work_unit": unit,
+        "work_amount": amount,
+        "samples": samples,
+        "basis": basis,
+    }
@@ -1,5 +1,8 @@
 import os
 import re
+import shutil
+import errno
+import hashlib
 import mimetypes
 import magic
 
@@ -11,6 +14,8 @@ if TYPE_CHECKING:
     from db import FileDB
     
 from core.settings import get_settings
+from core.metrics import adjust_storage
+from core.timing import phase
 
 
 def validate_sql_identifier(identifier: str) -> str:
@@ -46,7 +51,23 @@ def detect_media_type(file_path: Path) -> str:
     _, extension = os.path.splitext(file_path)
     if not extension:
         # If no extension, try to detect using magic
-        media_type = magic.from_file(str(file_path), mime=True)
+        with phase("sniff"):
+            media_type = magic.from_file(str(file_path), mime=True)
+        extension = mimetypes.guess_extension(media_type) or ""
+    media_type = extension.lstrip('.').lower()
+    return media_type
+
+def detect_media_type_from_buffer(filename: str, head: bytes) -> str:
+    """
+    Detect the media type of an upload from its name and first bytes.
+
+    Same rules as detect_media_type(), but sniffs the in-memory start of the
+    file instead of reopening it from disk.
+    """
+    _, extension = os.path.splitext(filename)
+    if not extension:
+        with phase("sniff"):
+            media_type = magic.from_buffer(head, mime=True)
         extension = mimetypes.guess_extension(media_type) or ""
     media_type = extension.lstrip('.').lower()
     return media_type
@@ -214,4 +235,103 @@ def delete_file_and_metadata(file_id: str, file_db: "FileDB", raise_if_not_found
     validate_safe_path(storage_path, raise_exception=True)
     
     os.unlink(storage_path)
-    file_db.delete_file_metadata(file_id)
\ No newline at end of file
+    adjust_storage(storage_path, -(metadata['size_bytes'] or 0))
+    file_db.delete_file_metadata(file_id)
+
+
+# Read size for hashing and copying; large enough to keep syscall overhead
+# negligible, small enough that memory stays flat for any file size
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def hash_file(file_path: str | Path, hasher=None, start: int = 0, end: int | None = None):
+    """
+    Hash a file (or the byte range [start, end) of it) in fixed-size blocks.
+
+    Reads go into one reused buffer, and hashlib releases the GIL while
+    hashing large blocks, so this is suited to running in a worker thread.
+
+    Args:
+        file_path: File to hash
+        hasher: Running hashlib object to update (a new SHA-256 if omitted)
+        start: First byte to hash
+        end: End of the range to hash (end of file if omitted)
+
+    Returns:
+        The updated hasher
+    """
+    hasher = hasher or hashlib.sha256()
+    buffer = bytearray(HASH_BLOCK_SIZE)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        f.seek(start)
+        remaining = end - start if end is not None else None
+        while remaining is None or remaining > 0:
+            read = f.readinto(view if remaining is None else view[:min(HASH_BLOCK_SIZE, remaining)])
+            if not read:
+                if remaining is not None:
+                    raise RuntimeError(f"{file_path} is shorter than expected")
+                break
+            hasher.update(view[:read])
+            if remaining is not None:
+                remaining -= read
+    return hasher
+
+
+def move_and_hash(source: str | Path, destination: str | Path) -> tuple[Path, int, str]:
+    """
+    Move a file and compute its size and SHA-256, reading it only once.
+
+    A rename within the same filesystem moves no data, so the file is hashed
+    in place. Across filesystems the copy and the hash share each block read.
+
+    Args:
+        source: File to move
+        destination: Target path
+
+    Returns:
+        Tuple of (destination path, size in bytes, sha256 hex digest)
+    """
+    destination = Path(destination)
+    try:
+        with phase("move"):
+            os.rename(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        hasher = hashlib.sha256()
+        buffer = bytearray(HASH_BLOCK_SIZE)
+        view = memoryview(buffer)
+        # The destination is buffered: a buffered write retries short writes
+        # until the whole block is out, where a raw one may stop partway
+        with phase("move"), open(source, "rb", buffering=0) as src, open(destination, "wb") as dst:
+            while read := src.readinto(view):
+                hasher.update(view[:read])
+                dst.write(view[:read])
+        os.unlink(source)
+        return destination, destination.stat().st_size, hasher.hexdigest()
+    with phase("hash_output"):
+        checksum = hash_file(destination).hexdigest()
+    return destination, destination.stat().st_size, checksum
+
+
+def link_or_copy(source: str | Path, destination: str | Path) -> Path:
+    """
+    Give a file a second path, as a hard link where the filesystem allows it.
+
+    The two paths share the file's data until either is deleted, so
+    outputs shared by several conversions take no extra space.
+
+    Args:
+        source: Existing file
+        destination: New path
+
+    Returns:
+        The destination path
+    """
+    destination = Path(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+    return destination
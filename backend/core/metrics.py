@@ -0,0 +1,330 @@
+"""
+Minimal in-process Prometheus metrics.
+
+Counters, gauges and histograms with labels, rendered in the Prometheus
+text exposition format by render_metrics(). Kept dependency-free; every
+update takes a short lock so metrics can be recorded from worker threads.
+
+Values are kept per process. With several HTTP worker processes, each
+publishes snapshot_metrics() (core/shared_state.py) and render_metrics()
+adds the other workers' snapshots to its own values. Storage usage is
+server-wide instead: each worker also publishes storage_changes(), and
+the others add them to their own storage gauges.
+"""
+import copy
+import re
+import time
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from core.settings import get_settings
+from core.timing import phase
+
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+_registry: list["Metric"] = []
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """Base class: a named metric family with a fixed set of label names."""
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), server_wide: bool = False):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # The value describes the whole server rather than one process, so
+        # the values of other worker processes are not added to it
+        self.server_wide = server_wide
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> list:
+        """Every sample as [label values, value], in a JSON-compatible form."""
+        with self._lock:
+            return [[list(key), copy.deepcopy(value)] for key, value in self._values.items()]
+
+    def _merge(self, value, other):
+        return value + other
+
+    def render(self, peers: list[dict] = ()) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            values = dict(self._values)
+        if not self.server_wide:
+            for peer in peers:
+                for key, value in peer.get(self.name, []):
+                    key = tuple(key)
+                    values[key] = self._merge(values[key], value) if key in values else value
+        lines.extend(self._render_samples(sorted(values.items())))
+        return lines
+
+    def _render_samples(self, items: list) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def _merge(self, value, other):
+        return {
+            "counts": [a + b for a, b in zip(value["counts"], other["counts"])],
+            "sum": value["sum"] + other["sum"],
+            "count": value["count"] + other["count"],
+        }
+
+    def _render_samples(self, items: list) -> list[str]:
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+def snapshot_metrics() -> dict:
+    """Every registered metric's samples, by metric name, for other worker processes."""
+    return {metric.name: metric.snapshot() for metric in _registry}
+
+
+def render_metrics(peers: list[dict] = ()) -> str:
+    """
+    Render every registered metric in the Prometheus text format.
+
+    Args:
+        peers: snapshot_metrics() of the other worker processes, added to
+            this process's values
+    """
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render(peers))
+    return "\n".join(lines) + "\n"
+
+
+# ===== Metric definitions =====
+
+conversion_duration = Histogram(
+    "transmute_conversion_duration_seconds", "Time spent converting a file",
+    ("converter", "input_format", "output_format"),
+)
+conversions_total = Counter(
+    "transmute_conversions_total", "Conversions finished, by outcome",
+    ("converter", "input_format", "output_format", "status"),
+)
+conversion_input_bytes = Counter(
+    "transmute_conversion_input_bytes_total", "Bytes read by conversions",
+    ("input_format", "output_format"),
+)
+conversion_output_bytes = Counter(
+    "transmute_conversion_output_bytes_total", "Bytes written by conversions",
+    ("input_format", "output_format"),
+)
+conversions_in_progress = Gauge(
+    "transmute_conversions_in_progress", "Conversions currently running (active workers)",
+)
+conversion_queue_depth = Gauge(
+    "transmute_conversion_queue_depth", "Conversions waiting for a worker, by scheduler lane",
+    ("lane",),
+)
+conversion_worker_recycles = Counter(
+    "transmute_conversion_worker_recycles_total", "Conversion worker processes replaced, by reason (jobs, rss, limit or crash)",
+    ("reason",),
+)
+upload_bytes = Counter(
+    "transmute_upload_bytes_total", "Bytes received by uploads",
+    ("method",),
+)
+upload_duration = Histogram(
+    "transmute_upload_duration_seconds", "Time spent receiving an upload request",
+    ("method",),
+)
+db_query_duration = Histogram(
+    "transmute_db_query_duration_seconds", "SQLite statement execution time",
+    ("operation", "table"), buckets=DB_BUCKETS,
+)
+cache_requests = Counter(
+    "transmute_cache_requests_total", "Cache lookups, by cache and result (hit or miss)",
+    ("cache", "result"),
+)
+admission_rejections = Counter(
+    "transmute_admission_rejections_total", "Uploads and conversions turned away by admission control",
+    ("kind", "reason"),
+)
+storage_bytes = Gauge(
+    "transmute_storage_bytes", "Bytes stored per data directory, tracked as files are added and removed",
+    ("directory",), server_wide=True,
+)
+
+for lane in ("interactive", "bulk"):
+    conversion_queue_depth.set(0, lane=lane)
+conversions_in_progress.set(0)
+
+
+# ===== Helpers =====
+
+def record_cache_lookup(cache: str, hit: bool):
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def storage_directory(file_path: str | Path) -> str | None:
+    """Name of the data directory ('uploads', 'outputs' or 'tmp') holding a file."""
+    settings = get_settings()
+    resolved = Path(file_path).resolve()
+    for name, directory in [("uploads", settings.upload_dir), ("outputs", settings.output_dir), ("tmp", settings.tmp_dir)]:
+        if resolved.is_relative_to(Path(directory).resolve()):
+            return name
+    return None
+
+
+# This process's own storage changes since seed_storage(), published to the
+# other worker processes, and when the gauges were seeded
+_storage_changes: dict[str, int] = {}
+_storage_changes_lock = threading.Lock()
+storage_seeded_at = 0.0
+
+
+def seed_storage(totals: dict[str, int]):
+    """Set the storage gauges to the usage of every directory, as measured now."""
+    global storage_seeded_at
+    with _storage_changes_lock:
+        for directory, total in totals.items():
+            storage_bytes.set(total, directory=directory)
+        _storage_changes.clear()
+        storage_seeded_at = time.time()
+
+
+def adjust_storage(file_path: str | Path, delta_bytes: int):
+    """Add (or with a negative delta, remove) bytes from a directory's usage."""
+    directory = storage_directory(file_path)
+    if directory is not None:
+        with _storage_changes_lock:
+            storage_bytes.inc(delta_bytes, directory=directory)
+            _storage_changes[directory] = _storage_changes.get(directory, 0) + delta_bytes
+
+
+def storage_changes() -> dict[str, int]:
+    """Bytes this process has added to (or removed from) each directory since the gauges were seeded."""
+    with _storage_changes_lock:
+        return dict(_storage_changes)
+
+
+_SQL_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE(?:\s+IF\s+NOT\s+EXISTS)?)\s+(\w+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def _statement_labels(sql: str) -> tuple[str, str]:
+    operation = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    match = _SQL_TABLE.search(sql)
+    return operation, match.group(1) if match else ""
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that records how long each statement takes to execute."""
+
+    def execute(self, sql, parameters=(), /):
+        start = time.perf_counter()
+        try:
+            with phase("db"):
+                return super().execute(sql, parameters)
+        finally:
+            operation, table = _statement_labels(sql)
+            db_query_duration.observe(time.perf_counter() - start, operation=operation, table=table)
+
+
+class TimedConnection(sqlite3.Connection):
+    """
+    SQLite connection whose statements are timed into db_query_duration.
+
+    Pass as `factory=` to sqlite3.connect(). Both conn.execute() and
+    conn.cursor().execute() are measured.
+    """
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=(), /):
+        # The C implementation of execute() bypasses cursor(), so route it here
+        return self.cursor().execute(sql, parameters)
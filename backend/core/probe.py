@@ -0,0 +1,97 @@
+"""
+Cheap media probes, run once after upload.
+
+Each probe reads only what it needs: the image header via Pillow, the
+container and stream headers via ffprobe, or the parquet footer. The
+results are stored with the file's metadata, so scheduling, estimates and
+listings never have to open the file again.
+
+Heavy libraries are imported inside the probes, so importing this module
+keeps startup light.
+"""
+import json
+import logging
+import subprocess
+
+from converters.manifest import FFMPEG_FORMATS, PILLOW_FORMATS
+
+
+logger = logging.getLogger("transmute.probe")
+
+FFPROBE_TIMEOUT_SECONDS = 30
+
+
+def probe_image(file_path: str, media_type: str) -> dict:
+    """Dimensions from the image header (the pixel data is not decoded)."""
+    from PIL import Image
+    if media_type in ("heic", "heif"):
+        from pillow_heif import register_heif_opener
+        register_heif_opener()
+    with Image.open(file_path) as img:
+        width, height = img.size
+    return {"width": width, "height": height}
+
+
+def probe_media(file_path: str) -> dict:
+    """Duration, codecs, resolution and bit rate from ffprobe."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", file_path],
+        capture_output=True,
+        text=True,
+        timeout=FFPROBE_TIMEOUT_SECONDS,
+        check=True,
+    )
+    info = json.loads(result.stdout)
+    fmt = info.get("format", {})
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    probe = {
+        "duration_seconds": float(fmt["duration"]) if fmt.get("duration") else None,
+        "bit_rate": int(fmt["bit_rate"]) if fmt.get("bit_rate") else None,
+        "video_codec": video.get("codec_name") if video else None,
+        "audio_codec": audio.get("codec_name") if audio else None,
+    }
+    if video:
+        probe["width"] = video.get("width")
+        probe["height"] = video.get("height")
+    return probe
+
+
+def probe_parquet(file_path: str) -> dict:
+    """Row count and schema from the parquet footer."""
+    import pyarrow.parquet as pq
+    metadata = pq.read_metadata(file_path)
+    schema = metadata.schema.to_arrow_schema()
+    return {
+        "row_count": metadata.num_rows,
+        "data_schema": [{"name": field.name, "type": str(field.type)} for field in schema],
+    }
+
+
+def probe_file(file_path: str, media_type: str) -> dict:
+    """
+    Probe a stored file according to its media type.
+
+    Args:
+        file_path: Path of the stored file
+        media_type: Detected media type (e.g. 'png', 'mp4', 'parquet')
+
+    Returns:
+        Probed properties plus probe_status: 'ok', 'failed', or
+        'unsupported' when there is no cheap probe for the media type
+    """
+    try:
+        # GIF is also an FFmpeg format; the Pillow header is cheaper to read
+        if media_type in PILLOW_FORMATS and media_type != "svg":
+            probe = probe_image(file_path, media_type)
+        elif media_type in FFMPEG_FORMATS:
+            probe = probe_media(file_path)
+        elif media_type == "parquet":
+            probe = probe_parquet(file_path)
+        else:
+            return {"probe_status": "unsupported"}
+    except Exception as e:
+        logger.warning("Probe of %s (%s) failed: %s", file_path, media_type, e)
+        return {"probe_status": "failed"}
+    return {**probe, "probe_status": "ok"}
@@ -0,0 +1,177 @@
+"""
+Opt-in per-request CPU and memory profiling.
+
+ProfilingMiddleware is only installed when PROFILING_ENABLED is set, so
+requests pay nothing for it otherwise. A request is profiled when it sends
+the PROFILING_HEADER header, or at random with PROFILING_SAMPLE_RATE. It
+runs under cProfile and tracemalloc, and three files are written to the
+profile directory under one profile ID:
+
+    <id>.prof   cProfile stats, for pstats or snakeviz
+    <id>.txt    top functions by cumulative time and top allocation sites
+    <id>.json   request method, path, status and duration
+
+The ID is sent back in the X-Transmute-Profile-Id response header.
+
+Python allows one active profiler at a time, so only one request is profiled
+at once; requests arriving meanwhile run unprofiled. The profile covers
+everything that runs while the request is in flight, including other
+requests served by the event loop. On Python 3.12+ cProfile sees all
+threads; before that, work handed to worker threads is missing.
+"""
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import pstats
+import random
+import re
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+from core.settings import get_settings
+
+
+logger = logging.getLogger("transmute.profiling")
+
+PROFILE_ID_PATTERN = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = 10
+
+
+def new_profile_id() -> str:
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def is_profile_id(value: str) -> bool:
+    return PROFILE_ID_PATTERN.match(value) is not None
+
+
+def write_profile(
+    profile_dir: Path,
+    profile_id: str,
+    profiler: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot,
+    peak_bytes: int,
+    info: dict
+):
+    """
+    Write the stats, the text report and the request info of one profile.
+
+    Args:
+        profile_dir: Directory to write to
+        profile_id: Shared file name stem of the three files
+        profiler: The disabled profiler
+        snapshot: tracemalloc snapshot taken at the end of the request
+        peak_bytes: Peak traced memory during the request
+        info: Request method, path, status and duration
+    """
+    profiler.dump_stats(profile_dir / f"{profile_id}.prof")
+
+    report = io.StringIO()
+    report.write(f"{info['method']} {info['path']} -> {info['status']} in {info['duration_ms']:.2f} ms\n\n")
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    allocations = snapshot.statistics("lineno")
+    report.write(f"Peak traced memory: {peak_bytes / 2**20:.2f} MiB\n")
+    report.write(f"Memory still allocated at the end of the request, top {TOP_ALLOCATIONS} sites:\n")
+    for stat in allocations[:TOP_ALLOCATIONS]:
+        report.write(f"  {stat}\n")
+    (profile_dir / f"{profile_id}.txt").write_text(report.getvalue())
+
+    info = {**info, "id": profile_id, "peak_memory_bytes": peak_bytes}
+    (profile_dir / f"{profile_id}.json").write_text(json.dumps(info))
+
+
+def list_profiles(profile_dir: Path) -> list[dict]:
+    """Request info of every captured profile, newest first."""
+    if not profile_dir.exists():
+        return []
+    profiles = []
+    for path in profile_dir.glob("*.json"):
+        if not is_profile_id(path.stem):
+            continue
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda info: info["id"], reverse=True)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that runs selected requests under cProfile and tracemalloc.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        settings = get_settings()
+        self.profile_dir = settings.profile_dir
+        self.sample_rate = settings.profiling_sample_rate
+        self.header = settings.profiling_header.lower().encode("latin-1")
+        self.active = False
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+    def wants_profile(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == self.header:
+                return value.strip().lower() not in (b"", b"0", b"false")
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.active or not self.wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self.active = True
+        profile_id = new_profile_id()
+        status = None
+
+        async def tagged_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-transmute-profile-id", profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        # Leave tracing running if something else started it
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, tagged_send)
+        finally:
+            profiler.disable()
+            duration_ms = (time.perf_counter() - started) * 1000
+            snapshot = tracemalloc.take_snapshot()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            self.active = False
+            info = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "duration_ms": round(duration_ms, 2),
+                "created_at": time.time(),
+            }
+            try:
+                await asyncio.to_thread(write_profile, self.profile_dir, profile_id, profiler, snapshot, peak_bytes, info)
+            except OSError:
+                logger.exception("Failed to write profile %s", profile_id)
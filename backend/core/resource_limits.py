@@ -0,0 +1,220 @@
+"""
+Resource limits and usage accounting for conversion worker processes.
+
+Each conversion runs in a worker process (core/worker_pool.py) under:
+
+- CONVERSION_MAX_CPU_SECONDS: a soft RLIMIT_CPU, re-armed for every job.
+  SIGXCPU then fails the job, and the worker keeps running.
+- CONVERSION_MAX_ADDRESS_SPACE_MB: RLIMIT_AS on the worker. An allocation
+  past it fails with MemoryError.
+- CONVERSION_MAX_WALL_SECONDS: enforced by the API process, which kills a
+  worker (and its subprocesses) that runs past it.
+- CONVERSION_CGROUP_DIR: optional, a cgroup v2 directory delegated to the
+  service. Each worker gets a child cgroup with memory.max set to
+  CONVERSION_CGROUP_MEMORY_MB, which also covers subprocesses such as
+  ffmpeg.
+
+The rlimits are inherited by the subprocesses a converter starts, which
+count their own CPU time.
+
+Every job also reports its usage: CPU seconds (its subprocesses included),
+peak RSS and bytes read and written. These are measured from getrusage and
+/proc, so peak RSS and I/O are only reported on Linux. Where the resource
+module is unavailable (Windows), only the wall-clock limit applies.
+"""
+import logging
+import math
+import os
+import signal
+import sys
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from core.settings import get_settings
+
+
+logger = logging.getLogger("transmute.workers")
+
+MB = 1024 * 1024
+IS_LINUX = sys.platform.startswith("linux")
+
+# Whether a job is running under the CPU limit (SIGXCPU outside a job is stale)
+_cpu_limit_armed = False
+
+
+class ConversionLimitExceeded(RuntimeError):
+    """A conversion was stopped for exceeding one of its resource limits."""
+
+    def __init__(self, limit: str, message: str):
+        super().__init__(message)
+        self.limit = limit
+
+    def __reduce__(self):
+        # Raised in worker processes and sent back to the API process
+        return type(self), (self.limit, str(self))
+
+
+def _raise_cpu_limit(signum, frame):
+    if not _cpu_limit_armed:
+        return
+    raise ConversionLimitExceeded("cpu", f"Conversion exceeded its CPU time limit of {get_settings().conversion_max_cpu_seconds} s")
+
+
+def apply_worker_limits():
+    """Set the limits that apply to a worker process for its whole life (called in the worker)."""
+    if resource is None:
+        return
+    settings = get_settings()
+    # Own process group, so a worker killed for its wall-clock limit takes
+    # the subprocesses of its conversion with it
+    os.setpgid(0, 0)
+    if settings.conversion_max_address_space_mb:
+        limit = settings.conversion_max_address_space_mb * MB
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+
+
+def arm_cpu_limit():
+    """Allow the next job CONVERSION_MAX_CPU_SECONDS on top of the CPU time used so far."""
+    global _cpu_limit_armed
+    seconds = get_settings().conversion_max_cpu_seconds
+    if resource is None or not seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = math.ceil(usage.ru_utime + usage.ru_stime + seconds)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    _cpu_limit_armed = True
+
+
+def disarm_cpu_limit():
+    global _cpu_limit_armed
+    if resource is None:
+        return
+    _cpu_limit_armed = False
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+
+def _io_counters() -> tuple[int, int] | None:
+    """Bytes read and written by this process and its reaped children."""
+    try:
+        with open("/proc/self/io") as f:
+            counters = dict(line.split(": ") for line in f.read().splitlines())
+        return int(counters["rchar"]), int(counters["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _peak_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def start_usage() -> tuple | None:
+    """Snapshot this process's usage before a job (called in the worker)."""
+    if resource is None:
+        return None
+    if IS_LINUX:
+        # Reset the peak RSS (VmHWM) so it covers this job only
+        try:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            pass
+    return resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN), _io_counters()
+
+
+def finish_usage(start: tuple | None) -> dict:
+    """
+    Usage of the job since start_usage (called in the worker).
+
+    Returns:
+        Dict with cpu_seconds, peak_rss_bytes, bytes_read and bytes_written;
+        each is None where it cannot be measured
+    """
+    if start is None:
+        return {"cpu_seconds": None, "peak_rss_bytes": None, "bytes_read": None, "bytes_written": None}
+    self_before, children_before, io_before = start
+    self_after = resource.getrusage(resource.RUSAGE_SELF)
+    children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    io_after = _io_counters()
+
+    children_cpu = (children_after.ru_utime + children_after.ru_stime) - (children_before.ru_utime + children_before.ru_stime)
+    cpu_seconds = (self_after.ru_utime + self_after.ru_stime) - (self_before.ru_utime + self_before.ru_stime) + children_cpu
+    peak_rss = _peak_rss_bytes()
+    # ru_maxrss of children is the largest subprocess so far (in KB), so it
+    # is only attributed to a job that ran subprocesses
+    if peak_rss is not None and children_cpu > 0:
+        peak_rss = max(peak_rss, children_after.ru_maxrss * 1024)
+    usage = {"cpu_seconds": round(cpu_seconds, 3), "peak_rss_bytes": peak_rss, "bytes_read": None, "bytes_written": None}
+    if io_before and io_after:
+        usage["bytes_read"] = io_after[0] - io_before[0]
+        usage["bytes_written"] = io_after[1] - io_before[1]
+    return usage
+
+
+class WorkerCgroup:
+    """
+    Child cgroup (v2) holding one worker process and its subprocesses.
+
+    Args:
+        parent: cgroup directory delegated to the service
+        pid: Worker process ID
+        memory_mb: memory.max of the cgroup
+    """
+
+    def __init__(self, parent: Path, pid: int, memory_mb: int):
+        self.path = Path(parent) / f"transmute-worker-{pid}"
+        self.path.mkdir(exist_ok=True)
+        if memory_mb:
+            (self.path / "memory.max").write_text(str(memory_mb * MB))
+            # Without this the kernel swaps instead of enforcing the limit
+            swap_max = self.path / "memory.swap.max"
+            if swap_max.exists():
+                swap_max.write_text("0")
+        (self.path / "cgroup.procs").write_text(str(pid))
+
+    def oom_killed(self) -> bool:
+        """Whether the kernel killed a process of the cgroup for exceeding memory.max."""
+        try:
+            for line in (self.path / "memory.events").read_text().splitlines():
+                name, value = line.split()
+                if name == "oom_kill" and int(value) > 0:
+                    return True
+        except (OSError, ValueError):
+            pass
+        return False
+
+    def remove(self):
+        try:
+            self.path.rmdir()
+        except OSError as e:
+            logger.warning("Could not remove cgroup %s: %s", self.path, e)
+
+
+def create_worker_cgroup(pid: int) -> WorkerCgroup | None:
+    """Put a worker in its own cgroup when CONVERSION_CGROUP_DIR is set (called in the API process)."""
+    settings = get_settings()
+    if settings.conversion_cgroup_dir is None:
+        return None
+    try:
+        return WorkerCgroup(settings.conversion_cgroup_dir, pid, settings.conversion_cgroup_memory_mb)
+    except OSError as e:
+        logger.warning("Could not create a cgroup for worker %d in %s: %s", pid, settings.conversion_cgroup_dir, e)
+        return None
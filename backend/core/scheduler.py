@@ -0,0 +1,301 @@
+"""
+Conversion scheduler with priority lanes and fair queueing.
+
+Conversions run on CONVERSION_WORKERS worker threads instead of on the
+event loop (each thread hands its job to a worker process, see
+core/worker_pool.py). Each job goes into a lane:
+
+- interactive: jobs estimated to finish within
+  SCHEDULER_INTERACTIVE_MAX_SECONDS, or requested with priority "interactive"
+- bulk: everything else, or requested with priority "bulk"
+
+Each lane has reserved worker slots that the other lane never uses, so a
+burst of long video encodes cannot hold every worker while small image
+conversions wait. The remaining slots are shared, with interactive jobs
+taking them first.
+
+Within a lane, clients are served by start-time fair queueing weighted by
+the jobs' estimated cost: while several clients have jobs queued, each
+gets about the same worker time, however many jobs it submits and however
+large they are.
+
+Job costs come from the conversion estimator (core/estimator.py). The same
+estimates give each job an ETA, by replaying the lane policy over the
+running and queued jobs.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Callable
+
+from core import metrics
+from core.settings import get_settings
+from core.timing import current_timer
+
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+# Jobs whose cost is estimated as zero still advance their client's virtual time
+MIN_JOB_COST = 0.001
+
+
+class Job:
+    """One queued or running conversion."""
+
+    def __init__(self, fn: Callable, lane: str, client: str, cost: float, info: dict):
+        self.id = str(uuid.uuid4())
+        self.fn = fn
+        self.lane = lane
+        self.client = client
+        self.cost = max(cost, MIN_JOB_COST)
+        self.info = info
+        self.context = contextvars.copy_context()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.state = "queued"
+        self.queued_at = time.time()
+        self.started_at: float | None = None
+        self.tag = 0.0
+
+    def describe(self) -> dict:
+        return {
+            "id": self.id,
+            "lane": self.lane,
+            "client": self.client,
+            "state": self.state,
+            "estimated_seconds": round(self.cost, 3),
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            **self.info,
+        }
+
+
+class Lane:
+    """Queue of one lane, ordered by fair-queueing start tag."""
+
+    def __init__(self, name: str, reserved: int):
+        self.name = name
+        self.reserved = reserved
+        self.running = 0
+        self.queue: list[tuple[float, int, Job]] = []
+        self.queued_count = 0
+        self.virtual_time = 0.0
+        self.client_tags: dict[str, float] = {}
+
+    def push(self, job: Job, sequence: int):
+        # A client's next job starts where its previous one finished in
+        # virtual time, or now if it has been idle
+        job.tag = max(self.virtual_time, self.client_tags.get(job.client, 0.0))
+        self.client_tags[job.client] = job.tag + job.cost
+        heapq.heappush(self.queue, (job.tag, sequence, job))
+        self.queued_count += 1
+
+    def pop(self) -> Job | None:
+        while self.queue:
+            _, _, job = heapq.heappop(self.queue)
+            # Cancelled jobs stay in the heap until they reach the top
+            if job.state == "queued":
+                self.queued_count -= 1
+                self.virtual_time = job.tag
+                return job
+        return None
+
+    def queued(self) -> list[Job]:
+        return [job for _, _, job in sorted(self.queue) if job.state == "queued"]
+
+
+class ConversionScheduler:
+    """Runs conversion jobs on a fixed number of worker slots split into lanes."""
+
+    def __init__(self):
+        settings = get_settings()
+        # Every HTTP worker process has its own scheduler, so by default
+        # they split the CPUs between them
+        self.workers = settings.conversion_workers or max(1, (os.cpu_count() or 1) // settings.server_workers())
+        self.interactive_max_seconds = settings.scheduler_interactive_max_seconds
+        self.lanes = {
+            INTERACTIVE: Lane(INTERACTIVE, settings.scheduler_interactive_reserved),
+            BULK: Lane(BULK, settings.scheduler_bulk_reserved),
+        }
+        self.running: dict[str, Job] = {}
+        self.sequence = itertools.count()
+
+    def classify(self, estimated_seconds: float, priority: str | None = None) -> str:
+        """Lane for a job: the requested priority, else by estimated cost."""
+        if priority in LANES:
+            return priority
+        return INTERACTIVE if estimated_seconds <= self.interactive_max_seconds else BULK
+
+    def has_free_slot(self, lane_name: str, running: dict[str, int]) -> bool:
+        """Whether a lane may start a job while running[lane] jobs run in each lane."""
+        if sum(running.values()) >= self.workers:
+            return False
+        if running[lane_name] < self.lanes[lane_name].reserved:
+            return True
+        shared = max(0, self.workers - sum(lane.reserved for lane in self.lanes.values()))
+        used = sum(max(0, count - self.lanes[name].reserved) for name, count in running.items())
+        return used < shared
+
+    def can_start(self, lane: Lane) -> bool:
+        return self.has_free_slot(lane.name, {name: lane.running for name, lane in self.lanes.items()})
+
+    def dispatch(self):
+        """Start queued jobs while their lane has a free slot (interactive first)."""
+        for lane in self.lanes.values():
+            while self.can_start(lane):
+                job = lane.pop()
+                if job is None:
+                    break
+                self.start(job)
+        self.update_queue_metrics()
+
+    def start(self, job: Job):
+        job.state = "running"
+        job.started_at = time.time()
+        self.lanes[job.lane].running += 1
+        self.running[job.id] = job
+        metrics.conversions_in_progress.inc()
+        asyncio.get_running_loop().create_task(self.execute(job))
+
+    async def execute(self, job: Job):
+        try:
+            # Run in the submitting request's context, so its timing phases
+            # and annotations land on that request
+            result = await asyncio.to_thread(job.context.run, job.fn)
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            job.state = "done"
+            self.lanes[job.lane].running -= 1
+            del self.running[job.id]
+            metrics.conversions_in_progress.dec()
+            self.dispatch()
+
+    def update_queue_metrics(self):
+        for lane in self.lanes.values():
+            metrics.conversion_queue_depth.set(lane.queued_count, lane=lane.name)
+
+    async def run(
+        self,
+        fn: Callable,
+        *,
+        lane: str,
+        client: str,
+        cost: float,
+        info: dict | None = None,
+        discard: Callable[[Any], None] | None = None
+    ):
+        """
+        Queue a blocking function as a job and wait for its result.
+
+        A running thread cannot be stopped, so when the caller is cancelled
+        the job still finishes; its result then goes to discard.
+
+        Args:
+            fn: Function to run on a worker thread
+            lane: INTERACTIVE or BULK
+            client: Client the job is accounted to for fair queueing
+            cost: Estimated run time in seconds
+            info: Descriptive fields shown in the job list
+            discard: Called with the result of a job that finishes after its
+                caller was cancelled, e.g. to remove its output files
+
+        Returns:
+            The function's return value (its exception is raised here)
+        """
+        job = Job(fn, lane, client, cost, info or {})
+        self.lanes[lane].push(job, next(self.sequence))
+        self.dispatch()
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            # The request went away: drop the job if it has not started yet
+            if job.state == "queued":
+                job.state = "cancelled"
+                self.lanes[lane].queued_count -= 1
+                self.update_queue_metrics()
+            elif discard is not None:
+                job.future.add_done_callback(lambda future: self._discard(future, discard))
+            raise
+        finally:
+            timer = current_timer()
+            if timer is not None and job.started_at is not None:
+                timer.add("queue", int((job.started_at - job.queued_at) * 1e9))
+
+    @staticmethod
+    def _discard(future: asyncio.Future, discard: Callable[[Any], None]):
+        # Reading the exception also keeps asyncio from logging it as never retrieved
+        if not future.cancelled() and future.exception() is None:
+            discard(future.result())
+
+    def forecast(self, new_job: tuple[str, float] | None = None) -> dict[str, tuple[float, float]]:
+        """
+        Expected start and finish of every running and queued job.
+
+        Replays the lane policy assuming the estimates hold and no other job
+        arrives (a client's later jobs can still overtake by fair queueing).
+
+        Args:
+            new_job: Optional (lane, estimated seconds) of a job that would
+                be queued now, forecast under the id 'new'
+
+        Returns:
+            (start, finish) in seconds from now, keyed by job id
+        """
+        now = time.time()
+        forecast = {}
+        finishing: dict[str, list[float]] = {name: [] for name in self.lanes}
+        for job in self.running.values():
+            remaining = max(0.0, job.cost - (now - job.started_at))
+            forecast[job.id] = (0.0, remaining)
+            finishing[job.lane].append(remaining)
+        queues = {name: [(job.id, job.cost) for job in lane.queued()] for name, lane in self.lanes.items()}
+        if new_job is not None:
+            queues[new_job[0]].append(("new", max(new_job[1], MIN_JOB_COST)))
+        clock = 0.0
+        while True:
+            for name in self.lanes:
+                queue = queues[name]
+                while queue and self.has_free_slot(name, {lane: len(ends) for lane, ends in finishing.items()}):
+                    job_id, cost = queue.pop(0)
+                    forecast[job_id] = (clock, clock + cost)
+                    finishing[name].append(clock + cost)
+            if not any(queues.values()) or not any(finishing.values()):
+                break
+            # Advance to the next job to finish
+            clock = min(end for ends in finishing.values() for end in ends)
+            finishing = {name: [end for end in ends if end > clock] for name, ends in finishing.items()}
+        return forecast
+
+    def list_jobs(self) -> list[dict]:
+        """Running jobs, then queued jobs in the order they will start, per lane, with their ETA."""
+        jobs = list(self.running.values())
+        for lane in self.lanes.values():
+            jobs.extend(lane.queued())
+        forecast = self.forecast()
+        return [
+            {**job.describe(), "eta_seconds": round(forecast[job.id][1], 3) if job.id in forecast else None}
+            for job in jobs
+        ]
+
+    def lane_stats(self) -> list[dict]:
+        return [
+            {"lane": lane.name, "reserved": lane.reserved, "running": lane.running, "queued": lane.queued_count}
+            for lane in self.lanes.values()
+        ]
+
+
+@lru_cache
+def get_scheduler() -> ConversionScheduler:
+    """Shared scheduler for this worker process."""
+    return ConversionScheduler()
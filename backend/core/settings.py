@@ -1,3 +1,4 @@
+import os
 from functools import lru_cache
 from pathlib import Path
 from pydantic import Field
@@ -35,11 +36,93 @@ class Settings(BaseSettings):
     upload_dir: Path | None = None
     output_dir: Path | None = None
     tmp_dir: Path | None = None
+    profile_dir: Path | None = None
+    run_dir: Path | None = None
+
+    # Bytes of a raw upload buffered in memory before each disk write
+    upload_buffer_mb: int = 8
+
+    # Default chunk size for resumable uploads
+    upload_chunk_mb: int = 16
+    # Largest file a resumable upload may announce (its space is reserved
+    # up front); 0 = no limit
+    upload_session_max_mb: int = 51200
+    # Resumable uploads without a new chunk for this long are deleted
+    upload_session_idle_hours: int = 24
+    # A chunk upload that has written nothing for this long (e.g. its worker
+    # process died) no longer blocks the chunk from being sent again
+    upload_chunk_claim_seconds: int = 300
 
     # ===== SQLite =====
     file_table_name: str = "FILES_METADATA"
     conversion_table_name: str = "CONVERSIONS_METADATA"
     conversion_relations_table_name: str = "CONVERSION_RELATIONS"
+    upload_session_table_name: str = "UPLOAD_SESSIONS"
+    converter_stats_table_name: str = "CONVERTER_STATS"
+
+    # ===== Conversions =====
+
+    # Share of conversions (0.0 to 1.0) run by a converter whose cost for the
+    # format pair has not been measured yet, instead of the cheapest one
+    converter_exploration_rate: float = 0.05
+
+    # Rows (or records) held in memory at once when streaming tabular data
+    data_chunk_rows: int = 50_000
+
+    # Default parquet writer settings (overridable per request)
+    parquet_compression: str = "snappy"
+    parquet_compression_level: int | None = None
+    parquet_row_group_size: int = 1_048_576
+    parquet_write_statistics: bool = True
+
+    # Default image encode profile: "fast", "balanced" or "smallest"
+    image_encode_profile: str = "balanced"
+
+    # Image decode budgets, checked from the image header before decoding
+    image_max_pixels: int = 1_000_000_000
+    image_max_memory_mb: int = 1024
+
+    # ===== Scheduler =====
+
+    # Conversions run at once per HTTP worker (0 = number of CPUs, split
+    # between the HTTP workers)
+    conversion_workers: int = 0
+    # Run conversions in pre-warmed worker processes that have every
+    # converter library imported (false runs them on threads of the API process)
+    conversion_processes: bool = True
+    # A worker process is replaced after this many conversions, or when its
+    # resident memory is above the limit after a conversion (0 = no limit)
+    conversion_worker_max_jobs: int = 200
+    conversion_worker_max_rss_mb: int = 2048
+    # Limits of each conversion in a worker process (0 = no limit). CPU
+    # time and address space are rlimits; the wall clock is enforced by
+    # killing the worker. See core/resource_limits.py
+    conversion_max_cpu_seconds: int = 1800
+    conversion_max_address_space_mb: int = 8192
+    conversion_max_wall_seconds: int = 3600
+    # cgroup v2 directory delegated to the service: each worker gets a child
+    # cgroup whose memory.max also covers converter subprocesses
+    conversion_cgroup_dir: Path | None = None
+    conversion_cgroup_memory_mb: int = 4096
+    # Worker slots only the interactive / bulk lane may use; the rest are shared
+    scheduler_interactive_reserved: int = 1
+    scheduler_bulk_reserved: int = 1
+    # Jobs estimated to take at most this long go to the interactive lane
+    scheduler_interactive_max_seconds: float = 2.0
+
+    # ===== Admission control =====
+
+    # Uploads and conversions are turned away (503 + Retry-After) while a
+    # watermark is crossed, and with 429 when a client already has too many
+    # of them in flight. 0 disables a check.
+    admission_min_free_disk_mb: int = 1024
+    admission_max_tmp_mb: int = 10240
+    admission_max_queued_conversions: int = 32
+    admission_max_worker_memory_mb: int = 0
+    admission_max_client_requests: int = 8
+    admission_retry_after_seconds: int = 5
+    # Identify clients by the first X-Forwarded-For address (behind a proxy)
+    admission_trust_forwarded_for: bool = False
 
     # ===== Redis =====
 
@@ -51,8 +134,27 @@ class Settings(BaseSettings):
 
     # ===== Server =====
 
+    host: str = "0.0.0.0"
     port: int = 3313
 
+    # HTTP worker processes started by main.py (0 = number of CPUs). With
+    # more than one, see core/shared_state.py for what they share
+    workers: int = 1
+    # Seconds in-flight requests get to finish on shutdown before they are cancelled
+    graceful_shutdown_seconds: int = 30
+    # How often each HTTP worker publishes its state to the others
+    shared_state_interval_seconds: float = 1.0
+
+    # Requests slower than this are written to the slow request log
+    slow_request_threshold_ms: int = 5000
+
+    # Opt-in cProfile + tracemalloc capture of requests. When disabled the
+    # profiling middleware is not installed at all. Requests are profiled if
+    # they send the header, or at random with the sample rate (0.0 to 1.0).
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_header: str = "X-Transmute-Profile"
+
     def model_post_init(self, __context):
         """Compute derived paths after initialization."""
 
@@ -60,16 +162,12 @@ class Settings(BaseSettings):
         self.upload_dir = self.data_dir / "uploads"
         self.output_dir = self.data_dir / "outputs"
         self.tmp_dir = self.data_dir / "tmp"
+        self.profile_dir = self.data_dir / "profiles"
+        self.run_dir = self.data_dir / "run"
 
-        # Ensure directories exist
-        for path in [
-            self.data_dir,
-            self.db_path.parent,
-            self.upload_dir,
-            self.output_dir,
-            self.tmp_dir,
-        ]:
-            path.mkdir(parents=True, exist_ok=True)
+    def server_workers(self) -> int:
+        """Number of HTTP worker processes."""
+        return self.workers or os.cpu_count() or 1
 
 
 @lru_cache
@@ -0,0 +1,211 @@
+"""
+State shared between the HTTP worker processes of a multi-worker server.
+
+With WORKERS > 1, every worker process has its own scheduler, admission
+counters and metrics. Each one publishes a snapshot of them to
+<data_dir>/run/worker-<pid>.json every SHARED_STATE_INTERVAL_SECONDS and
+reads the snapshots of the others. Whichever worker serves a request:
+
+- /api/metrics adds up the metrics of every worker
+- the storage gauges (which also feed admission control) add up the files
+  every worker has added and removed since it seeded them from the
+  databases. Changes a worker made shortly before another one started can
+  be missed by that one, until it restarts
+- /api/jobs lists the jobs of every worker
+- admission control counts the queued conversions of every worker, the
+  estimated output of their running conversions, and a client's in-flight
+  requests on every worker
+
+The other workers' state is at most about an interval old. A snapshot that
+has not been updated for STALE_INTERVALS intervals belongs to a worker that
+is gone, so it is ignored and removed.
+
+Files, conversions and converter statistics live in SQLite, which every
+worker shares already. Some state stays per process:
+
+- the scheduler's worker slots (CONVERSION_WORKERS; by default the CPUs
+  are split between the workers)
+- the conversion worker pool
+- in-flight coalescing
+- the running checksums of resumable uploads (session_hashes and
+  session_locks in api/routes/uploads.py). A received chunk cannot be
+  rewritten, so every worker's checksum is right; a worker completing an
+  upload whose chunks another worker hashed hashes the file from disk
+- the registry's format cache, which is derived from the converter
+  manifest and so is the same in every worker
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from core import metrics
+from core.admission import get_admission_controller
+from core.scheduler import get_scheduler
+from core.settings import get_settings
+
+
+logger = logging.getLogger("transmute.shared_state")
+
+# Intervals without an update after which a worker's snapshot is dropped
+STALE_INTERVALS = 5
+
+
+class SharedState:
+    """
+    Publishes this worker's state and reads the other workers'.
+
+    Args:
+        run_dir: Directory that holds the snapshots of every worker
+        interval: Seconds between two publications
+    """
+
+    def __init__(self, run_dir: Path, interval: float):
+        self.run_dir = Path(run_dir)
+        self.interval = interval
+        self.pid = os.getpid()
+        self.path = self.run_dir / f"worker-{self.pid}.json"
+        self.peers: list[dict] = []
+        # Storage changes of each peer already added to the storage gauges
+        self.storage_applied: dict[int, dict[str, int]] = {}
+
+    def snapshot(self) -> dict:
+        """This worker's state (taken on the event loop, which owns the scheduler)."""
+        scheduler = get_scheduler()
+        admission = get_admission_controller()
+        return {
+            "pid": self.pid,
+            "published_at": time.time(),
+            "metrics": metrics.snapshot_metrics(),
+            "workers": scheduler.workers,
+            "lanes": scheduler.lane_stats(),
+            "jobs": scheduler.list_jobs(),
+            "client_in_flight": dict(admission.client_in_flight),
+            "storage_changes": metrics.storage_changes(),
+            "storage_seeded_at": metrics.storage_seeded_at,
+        }
+
+    def exchange(self, snapshot: dict):
+        """Publish this worker's snapshot and read the other workers'."""
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so readers never see a partial snapshot
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(snapshot))
+        os.replace(tmp_path, self.path)
+
+        peers = []
+        stale_before = time.time() - STALE_INTERVALS * self.interval
+        for path in self.run_dir.glob("worker-*.json"):
+            if path == self.path:
+                continue
+            try:
+                peer = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if peer["published_at"] < stale_before:
+                path.unlink(missing_ok=True)
+                continue
+            peers.append(peer)
+        self.peers = peers
+        self.apply_storage_changes(peers)
+
+        queued = 0
+        tmp_reserved = 0
+        client_in_flight: dict[str, int] = {}
+        for peer in peers:
+            queued += sum(lane["queued"] for lane in peer["lanes"])
+            tmp_reserved += sum(
+                job.get("estimated_output_bytes") or 0 for job in peer["jobs"] if job["state"] == "running"
+            )
+            for client, count in peer["client_in_flight"].items():
+                client_in_flight[client] = client_in_flight.get(client, 0) + count
+        admission = get_admission_controller()
+        admission.peer_queued_conversions = queued
+        admission.peer_tmp_reserved_bytes = tmp_reserved
+        admission.peer_client_in_flight = client_in_flight
+
+    def apply_storage_changes(self, peers: list[dict]):
+        """Add the storage the other workers added or removed since the last exchange."""
+        applied = {}
+        for peer in peers:
+            changes = peer["storage_changes"]
+            seen = self.storage_applied.get(peer["pid"])
+            if seen is None:
+                # Changes of a worker that seeded its gauges after this one
+                # are all new; the seed of this one already has the changes
+                # of an older worker
+                seen = {} if peer["storage_seeded_at"] >= metrics.storage_seeded_at else changes
+            for directory, total in changes.items():
+                delta = total - seen.get(directory, 0)
+                if delta:
+                    metrics.storage_bytes.inc(delta, directory=directory)
+            applied[peer["pid"]] = changes
+        # A worker that is gone keeps its changes in the gauges
+        self.storage_applied = applied
+
+    async def run(self):
+        """Exchange state every interval until cancelled."""
+        while True:
+            try:
+                await asyncio.to_thread(self.exchange, self.snapshot())
+            except Exception:
+                logger.exception("Could not exchange state with the other worker processes")
+            await asyncio.sleep(self.interval)
+
+    def close(self):
+        """Withdraw this worker's snapshot (on shutdown)."""
+        self.path.unlink(missing_ok=True)
+        self.path.with_suffix(".tmp").unlink(missing_ok=True)
+
+    def peer_metrics(self) -> list[dict]:
+        return [peer["metrics"] for peer in self.peers]
+
+    def merge_jobs(self, listing: dict) -> dict:
+        """
+        Add the other workers' jobs to this worker's job listing.
+
+        Args:
+            listing: This worker's listing (workers, lanes and jobs, each job
+                with its worker_pid)
+
+        Returns:
+            The listing for the whole server: worker slots and lane load
+            summed, and the running jobs followed by the queued jobs in
+            order of their ETA
+        """
+        workers = listing["workers"]
+        lanes = {lane["lane"]: dict(lane) for lane in listing["lanes"]}
+        jobs = list(listing["jobs"])
+        now = time.time()
+        for peer in self.peers:
+            workers += peer["workers"]
+            for lane in peer["lanes"]:
+                totals = lanes.setdefault(lane["lane"], {"lane": lane["lane"], "reserved": 0, "running": 0, "queued": 0})
+                for field in ("reserved", "running", "queued"):
+                    totals[field] += lane[field]
+            # ETAs were forecast when the snapshot was published
+            age = max(0.0, now - peer["published_at"])
+            for job in peer["jobs"]:
+                eta = job["eta_seconds"]
+                jobs.append({
+                    **job,
+                    "worker_pid": peer["pid"],
+                    "eta_seconds": None if eta is None else round(max(0.0, eta - age), 3),
+                })
+        jobs.sort(key=lambda job: (
+            job["state"] != "running",
+            float("inf") if job["eta_seconds"] is None else job["eta_seconds"],
+        ))
+        return {"workers": workers, "lanes": list(lanes.values()), "jobs": jobs}
+
+
+@lru_cache
+def get_shared_state() -> SharedState | None:
+    """This worker's shared state, or None when the server runs a single worker process."""
+    settings = get_settings()
+    if settings.server_workers() <= 1:
+        return None
+    return SharedState(settings.run_dir, settings.shared_state_interval_seconds)
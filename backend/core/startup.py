@@ -0,0 +1,69 @@
+"""
+One-time start-up work: data directories and the database schema.
+
+Several HTTP worker processes may start at once (WORKERS > 1), and their
+schema creation and migrations must not interleave. run_startup() runs
+under an exclusive lock on <data_dir>/startup.lock, so concurrent
+processes take turns, and every step is idempotent.
+
+The launcher in main.py runs it once before starting the workers and
+passes its PID in TRANSMUTE_STARTUP_DONE, so workers it started skip it.
+A server started some other way (e.g. `uvicorn --workers`) runs it in
+every worker, one at a time. Without fcntl (Windows) there is no lock.
+"""
+import logging
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from core.settings import get_settings
+from db import FileDB, ConversionDB, ConversionRelationsDB, UploadSessionDB, ConverterStatsDB
+
+
+logger = logging.getLogger("transmute.startup")
+
+STARTUP_DONE_ENV = "TRANSMUTE_STARTUP_DONE"
+
+
+@contextmanager
+def startup_lock():
+    """Hold the exclusive start-up lock of the data directory."""
+    settings = get_settings()
+    settings.data_dir.mkdir(parents=True, exist_ok=True)
+    with open(settings.data_dir / "startup.lock", "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def startup_done() -> bool:
+    """Whether the launcher of this process (or this process) already ran the start-up work."""
+    return os.environ.get(STARTUP_DONE_ENV) in (str(os.getpid()), str(os.getppid()))
+
+
+def run_startup():
+    """Create the data directories and database tables (skipped if the launcher did)."""
+    if startup_done():
+        return
+    settings = get_settings()
+    with startup_lock():
+        for path in [
+            settings.db_path.parent,
+            settings.upload_dir,
+            settings.output_dir,
+            settings.tmp_dir,
+            settings.run_dir,
+        ]:
+            path.mkdir(parents=True, exist_ok=True)
+        # Each database creates and migrates its tables when opened
+        for db_class in [FileDB, ConversionDB, ConversionRelationsDB, UploadSessionDB, ConverterStatsDB]:
+            db_class().close()
+    logger.info("Start-up work done for %s", settings.data_dir)
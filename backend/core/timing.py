@@ -0,0 +1,127 @@
+"""
+Per-request phase timing.
+
+ServerTimingMiddleware starts a RequestTimer for every HTTP request and
+stores it in a context variable. Code anywhere in the request (including
+worker threads started with asyncio.to_thread, which copy the context)
+adds time to named phases with `with phase("db"):`. The breakdown is sent
+back as a Server-Timing header, and requests slower than
+SLOW_REQUEST_THRESHOLD_MS are written to the "transmute.slow" log.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from core.settings import get_settings
+
+
+slow_log = logging.getLogger("transmute.slow")
+
+_current_timer: ContextVar["RequestTimer | None"] = ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    """Accumulated time per phase, plus descriptive fields for the slow log."""
+
+    def __init__(self):
+        self.started = time.perf_counter_ns()
+        self.phases: dict[str, int] = {}
+        self.fields: dict = {}
+
+    def add(self, name: str, elapsed_ns: int):
+        self.phases[name] = self.phases.get(name, 0) + elapsed_ns
+
+    def elapsed_ns(self) -> int:
+        return time.perf_counter_ns() - self.started
+
+    def server_timing(self) -> str:
+        """Format the phases measured so far as a Server-Timing header value."""
+        total = self.elapsed_ns()
+        entries = [f"{name};dur={elapsed / 1e6:.2f}" for name, elapsed in self.phases.items()]
+        entries.append(f"other;dur={max(0, total - sum(self.phases.values())) / 1e6:.2f}")
+        entries.append(f"total;dur={total / 1e6:.2f}")
+        return ", ".join(entries)
+
+
+def current_timer() -> RequestTimer | None:
+    return _current_timer.get()
+
+
+@contextmanager
+def phase(name: str):
+    """Add the time spent in the block to the current request's `name` phase."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter_ns() - started)
+
+
+def annotate(**fields):
+    """Attach fields (converter, formats, input size...) to the current request's slow log entry."""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.fields.update(fields)
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware that times request phases.
+
+    Time spent waiting on the request body counts as the "receive" phase,
+    and time from the response headers to the last body chunk as "respond".
+    The header only carries phases up to the start of the response;
+    "respond" appears in the slow log.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.threshold_ns = get_settings().slow_request_threshold_ms * 1_000_000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+        status = None
+        response_started = None
+
+        async def timed_receive():
+            with phase("receive"):
+                return await receive()
+
+        async def timed_send(message):
+            nonlocal status, response_started
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+                response_started = time.perf_counter_ns()
+            await send(message)
+
+        try:
+            await self.app(scope, timed_receive, timed_send)
+        finally:
+            if response_started is not None:
+                timer.add("respond", time.perf_counter_ns() - response_started)
+            _current_timer.reset(token)
+            total = timer.elapsed_ns()
+            if total >= self.threshold_ns:
+                slow_log.warning(json.dumps({
+                    "event": "slow_request",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "total_ms": round(total / 1e6, 2),
+                    "phases_ms": {name: round(elapsed / 1e6, 2) for name, elapsed in timer.phases.items()},
+                    **timer.fields,
+                }))
@@ -0,0 +1,285 @@
+"""
+Pool of pre-warmed conversion worker processes.
+
+Conversions run in long-lived worker processes. Each worker has already
+imported every converter (converters/preload.py), so a job pays no import
+or process start-up cost. Where the platform supports it, workers are
+forked from a forkserver that did the imports once, and a new worker costs
+a fork.
+
+A worker is replaced once it has run CONVERSION_WORKER_MAX_JOBS jobs, or
+when its resident memory is above CONVERSION_WORKER_MAX_RSS_MB after a job.
+This bounds what a leaking converter library can hold. A worker that dies
+mid-job (e.g. killed for running out of memory) fails only that job and is
+replaced.
+
+Jobs run under the CPU, memory and wall-clock limits of
+core/resource_limits.py, and each result carries the job's resource usage.
+
+The scheduler decides how many jobs run at once. Each of its worker threads
+hands its job to a worker process and blocks until the result comes back.
+
+As with any forkserver or spawn start method, multiprocessing imports the
+launching script in every worker as __mp_main__. A script that builds the
+app (create_app()) must do so under `if __name__ == "__main__":`, as
+main.py does; otherwise every conversion fails with the worker exiting.
+Set CONVERSION_PROCESSES=false to run conversions on threads instead.
+"""
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from core import metrics
+from core.admission import current_rss_bytes
+from core.resource_limits import (
+    ConversionLimitExceeded,
+    apply_worker_limits,
+    arm_cpu_limit,
+    disarm_cpu_limit,
+    start_usage,
+    finish_usage,
+    create_worker_cgroup,
+)
+from core.scheduler import get_scheduler
+from core.settings import get_settings
+from converters.manifest import CONVERTER_MANIFEST
+
+
+logger = logging.getLogger("transmute.workers")
+
+PRELOAD_MODULE = "converters.preload"
+BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+
+MB = 1024 * 1024
+
+_specs = {spec.name: spec for spec in CONVERTER_MANIFEST}
+
+
+class ConversionTask:
+    """
+    A conversion, described so it can be sent to a worker process.
+
+    Args:
+        converter: Converter class name from the manifest
+        input_file: Path to the input file
+        output_dir: Directory where the output files are written
+        input_type: Format of the input file
+        output_type: Format of the output file
+        options: Converter-specific conversion options
+        quality: Quality setting for the conversion
+    """
+
+    def __init__(self, converter: str, input_file: str, output_dir: str, input_type: str, output_type: str, options: dict | None = None, quality: str | None = None):
+        self.converter = converter
+        self.input_file = input_file
+        self.output_dir = output_dir
+        self.input_type = input_type
+        self.output_type = output_type
+        self.options = options
+        self.quality = quality
+
+    def run(self) -> list[str]:
+        """Run the conversion in this process and return the output file paths."""
+        converter_class = _specs[self.converter].load()
+        converter = converter_class(self.input_file, self.output_dir, self.input_type, self.output_type, options=self.options)
+        return converter.convert(quality=self.quality)
+
+
+def worker_main(conn):
+    """Entry point of a worker process: run tasks from the pipe until told to stop."""
+    # Shutdown is driven by the API process, not by a Ctrl-C sent to the group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    __import__(PRELOAD_MODULE)
+    apply_worker_limits()
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        usage_start = start_usage()
+        try:
+            arm_cpu_limit()
+            try:
+                reply = ("ok", task.run())
+            finally:
+                disarm_cpu_limit()
+        except Exception as e:
+            try:
+                pickle.loads(pickle.dumps(e))
+            except Exception:
+                # Not every exception survives pickling; send its message instead
+                e = RuntimeError(f"{type(e).__name__}: {e}")
+            reply = ("error", e)
+        conn.send((*reply, current_rss_bytes(), finish_usage(usage_start)))
+
+
+class WorkerProcess:
+    """One worker process and the pipe to it."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn,), name="transmute-conversion-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.cgroup = create_worker_cgroup(self.process.pid)
+        self.jobs = 0
+
+    def kill(self):
+        """Kill the worker and the subprocesses of its current conversion."""
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (AttributeError, OSError):
+            # Not (yet) a process group leader, or no process groups (Windows)
+            self.process.kill()
+        self.process.join()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.kill()
+        if self.cgroup is not None:
+            self.cgroup.remove()
+
+
+class WorkerPool:
+    """Pre-warmed worker processes shared by the scheduler's worker threads."""
+
+    def __init__(self, size: int):
+        settings = get_settings()
+        self.size = size
+        self.max_jobs = settings.conversion_worker_max_jobs
+        self.max_rss_bytes = settings.conversion_worker_max_rss_mb * MB
+        self.max_wall_seconds = settings.conversion_max_wall_seconds or None
+        # forkserver is not available on Windows
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            # The forkserver imports its preload modules with a default
+            # sys.path (not this process's), so make the backend importable
+            # however the server was started
+            python_path = os.environ.get("PYTHONPATH", "").split(os.pathsep)
+            if BACKEND_DIR not in python_path:
+                os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [BACKEND_DIR, *python_path]))
+            # Only the converters: jobs and the worker entry point live in
+            # this module, which the preload imports. Preloading "__main__"
+            # would also run the launching script's top-level code here
+            self.context.set_forkserver_preload([PRELOAD_MODULE])
+        self.idle: list[WorkerProcess] = []
+        self.lock = threading.Lock()
+        self.started = False
+        self.closed = False
+
+    def start(self):
+        """Start the worker processes (once); blocks until they are forked."""
+        with self.lock:
+            if self.started or self.closed:
+                return
+            self.started = True
+        workers = [WorkerProcess(self.context) for _ in range(self.size)]
+        with self.lock:
+            self.idle.extend(workers)
+        logger.info("Started %d conversion worker processes", len(workers))
+
+    def acquire(self) -> WorkerProcess:
+        self.start()
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        # Every worker is busy or being replaced
+        return WorkerProcess(self.context)
+
+    def release(self, worker: WorkerProcess, rss: int | None):
+        reason = None
+        if self.max_jobs and worker.jobs >= self.max_jobs:
+            reason = "jobs"
+        elif self.max_rss_bytes and rss is not None and rss > self.max_rss_bytes:
+            reason = "rss"
+        if reason is None:
+            with self.lock:
+                if not self.closed and len(self.idle) < self.size:
+                    self.idle.append(worker)
+                    return
+            worker.stop()
+            return
+        metrics.conversion_worker_recycles.inc(reason=reason)
+        # Replace the worker off the request path
+        threading.Thread(target=self.replace, args=(worker,), daemon=True).start()
+
+    def replace(self, worker: WorkerProcess):
+        worker.stop()
+        replacement = WorkerProcess(self.context)
+        self.release(replacement, None)
+
+    def run(self, task: ConversionTask) -> tuple[list[str], dict]:
+        """
+        Run a conversion in a worker process, blocking until it finishes.
+
+        Args:
+            task: The conversion to run
+
+        Returns:
+            Paths of the converted output files and the job's resource usage.
+            The converter's exception is raised here, with the usage as its
+            usage attribute; ConversionLimitExceeded if a limit stopped it.
+        """
+        worker = self.acquire()
+        started = time.monotonic()
+        try:
+            worker.conn.send(task)
+            if not worker.conn.poll(self.max_wall_seconds):
+                worker.kill()
+                metrics.conversion_worker_recycles.inc(reason="limit")
+                threading.Thread(target=self.replace, args=(worker,), daemon=True).start()
+                raise ConversionLimitExceeded(
+                    "wall", f"Conversion exceeded its wall-clock limit of {self.max_wall_seconds:g} s"
+                )
+            status, value, rss, usage = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(timeout=5)
+            exitcode = worker.process.exitcode
+            oom_killed = worker.cgroup is not None and worker.cgroup.oom_killed()
+            metrics.conversion_worker_recycles.inc(reason="limit" if oom_killed else "crash")
+            threading.Thread(target=self.replace, args=(worker,), daemon=True).start()
+            if oom_killed:
+                raise ConversionLimitExceeded(
+                    "memory", f"Conversion exceeded its memory limit of {get_settings().conversion_cgroup_memory_mb} MB"
+                )
+            raise RuntimeError(
+                f"Conversion worker exited with code {exitcode} after {time.monotonic() - started:.1f} s converting {task.input_file}"
+            )
+        worker.jobs += 1
+        self.release(worker, rss)
+        if status == "error":
+            value.usage = usage
+            raise value
+        return value, usage
+
+    def shutdown(self):
+        """Stop every idle worker; busy workers are stopped as their jobs finish."""
+        with self.lock:
+            self.closed = True
+            workers, self.idle = self.idle, []
+        for worker in workers:
+            worker.stop()
+
+
+@lru_cache
+def get_worker_pool() -> WorkerPool | None:
+    """Shared worker pool, or None when conversions run on threads of this process."""
+    settings = get_settings()
+    if not settings.conversion_processes:
+        return None
+    return WorkerPool(get_scheduler().workers)
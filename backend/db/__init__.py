@@ -1,5 +1,7 @@
 from .file_db import FileDB
 from .conversion_db import ConversionDB
 from .conversion_relations_db import ConversionRelationsDB
+from .upload_session_db import UploadSessionDB
+from .converter_stats_db import ConverterStatsDB
 
-__all__ = ["FileDB", "ConversionDB", "ConversionRelationsDB"]
\ No newline at end of file
+__all__ = ["FileDB", "ConversionDB", "ConversionRelationsDB", "UploadSessionDB", "ConverterStatsDB"]
\ No newline at end of file
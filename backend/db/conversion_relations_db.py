@@ -1,5 +1,6 @@
 import sqlite3
 from core import get_settings, validate_sql_identifier
+from core.metrics import TimedConnection
 
 class ConversionRelationsDB:
     settings = get_settings()
@@ -9,7 +10,7 @@ class ConversionRelationsDB:
     def __init__(self):
         # Validate table name on initialization to prevent SQL injection
         self.TABLE_NAME = validate_sql_identifier(self.TABLE_NAME)
-        self.conn = sqlite3.connect(self.DB_PATH, check_same_thread=False)
+        self.conn = sqlite3.connect(self.DB_PATH, check_same_thread=False, factory=TimedConnection)
         self.create_tables()
     
     def create_tables(self):
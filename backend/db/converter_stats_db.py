@@ -0,0 +1,200 @@
+import sqlite3
+from core import get_settings, validate_sql_identifier
+from core.metrics import TimedConnection
+
+class ConverterStatsDB:
+    settings = get_settings()
+    DB_PATH = settings.db_path
+    TABLE_NAME = settings.converter_stats_table_name
+
+    def __init__(self):
+        # Validate table name on initialization to prevent SQL injection
+        self.TABLE_NAME = validate_sql_identifier(self.TABLE_NAME)
+        self.MODEL_TABLE_NAME = validate_sql_identifier(f"{self.TABLE_NAME}_MODELS")
+        self.USAGE_TABLE_NAME = validate_sql_identifier(f"{self.TABLE_NAME}_USAGE")
+        self.conn = sqlite3.connect(self.DB_PATH, check_same_thread=False, factory=TimedConnection)
+        self.create_tables()
+
+    def create_tables(self):
+        with self.conn:
+            # Running totals per converter and format pair, so recording a
+            # run is a single upsert and the table stays small
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
+                converter TEXT,
+                input_format TEXT,
+                output_format TEXT,
+                runs INTEGER DEFAULT 0,
+                total_seconds REAL DEFAULT 0,
+                total_input_bytes INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (converter, input_format, output_format)
+                )
+            """)
+            # Running sums for the estimator's least-squares fit of wall time
+            # and output size against the input's work (see core/estimator.py)
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.MODEL_TABLE_NAME} (
+                converter TEXT,
+                input_format TEXT,
+                output_format TEXT,
+                work_unit TEXT,
+                samples INTEGER DEFAULT 0,
+                sum_work REAL DEFAULT 0,
+                sum_work_squared REAL DEFAULT 0,
+                sum_seconds REAL DEFAULT 0,
+                sum_work_seconds REAL DEFAULT 0,
+                sum_output_bytes REAL DEFAULT 0,
+                sum_work_output_bytes REAL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (converter, input_format, output_format, work_unit)
+                )
+            """)
+            # Resources used by each conversion, kept per run for capacity planning
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.USAGE_TABLE_NAME} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                converter TEXT,
+                input_format TEXT,
+                output_format TEXT,
+                status TEXT,
+                wall_seconds REAL,
+                cpu_seconds REAL,
+                peak_rss_bytes INTEGER,
+                bytes_read INTEGER,
+                bytes_written INTEGER,
+                input_bytes INTEGER,
+                output_bytes INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            self.conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS {self.USAGE_TABLE_NAME}_PAIR
+                ON {self.USAGE_TABLE_NAME} (converter, input_format, output_format)
+            """)
+
+    def record_run(self, converter: str, input_format: str, output_format: str, seconds: float, input_bytes: int):
+        """Add one successful conversion to the converter's totals for the format pair."""
+        with self.conn:
+            self.conn.execute(f"""
+                INSERT INTO {self.TABLE_NAME} (
+                converter, input_format, output_format, runs, total_seconds, total_input_bytes
+                ) VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT (converter, input_format, output_format) DO UPDATE SET
+                runs = runs + 1,
+                total_seconds = total_seconds + excluded.total_seconds,
+                total_input_bytes = total_input_bytes + excluded.total_input_bytes,
+                updated_at = CURRENT_TIMESTAMP
+            """, (converter, input_format, output_format, seconds, input_bytes))
+
+    def record_sample(
+        self,
+        converter: str,
+        input_format: str,
+        output_format: str,
+        work_unit: str,
+        work: float,
+        seconds: float,
+        output_bytes: int
+    ):
+        """Add one successful conversion to the estimator's sums for its work unit."""
+        with self.conn:
+            self.conn.execute(f"""
+                INSERT INTO {self.MODEL_TABLE_NAME} (
+                converter, input_format, output_format, work_unit, samples, sum_work, sum_work_squared,
+                sum_seconds, sum_work_seconds, sum_output_bytes, sum_work_output_bytes
+                ) VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (converter, input_format, output_format, work_unit) DO UPDATE SET
+                samples = samples + 1,
+                sum_work = sum_work + excluded.sum_work,
+                sum_work_squared = sum_work_squared + excluded.sum_work_squared,
+                sum_seconds = sum_seconds + excluded.sum_seconds,
+                sum_work_seconds = sum_work_seconds + excluded.sum_work_seconds,
+                sum_output_bytes = sum_output_bytes + excluded.sum_output_bytes,
+                sum_work_output_bytes = sum_work_output_bytes + excluded.sum_work_output_bytes,
+                updated_at = CURRENT_TIMESTAMP
+            """, (
+                converter, input_format, output_format, work_unit, work, work * work,
+                seconds, work * seconds, output_bytes, work * output_bytes
+            ))
+
+    def get_model(self, converter: str, input_format: str, output_format: str, work_unit: str) -> dict | None:
+        """The estimator's sums for a converter, format pair and work unit, or None without history."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"SELECT * FROM {self.MODEL_TABLE_NAME} WHERE converter = ? AND input_format = ? AND output_format = ? AND work_unit = ?",
+            (converter, input_format, output_format, work_unit)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, row))
+
+    def record_usage(self, usage: dict):
+        """
+        Record the resources one conversion used.
+
+        Args:
+            usage: converter, input_format, output_format, status ('success',
+                'error' or 'limit'), wall_seconds, cpu_seconds, peak_rss_bytes,
+                bytes_read, bytes_written, input_bytes and output_bytes; the
+                measurements may be None
+        """
+        columns = [
+            'converter', 'input_format', 'output_format', 'status', 'wall_seconds', 'cpu_seconds',
+            'peak_rss_bytes', 'bytes_read', 'bytes_written', 'input_bytes', 'output_bytes'
+        ]
+        with self.conn:
+            self.conn.execute(
+                f"INSERT INTO {self.USAGE_TABLE_NAME} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                tuple(usage.get(column) for column in columns)
+            )
+
+    def usage_summary(self) -> list[dict]:
+        """Resource usage aggregated per converter and format pair."""
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT
+            converter,
+            input_format,
+            output_format,
+            COUNT(*) AS runs,
+            SUM(status = 'error') AS failures,
+            SUM(status = 'limit') AS limits_exceeded,
+            AVG(wall_seconds) AS avg_wall_seconds,
+            MAX(wall_seconds) AS max_wall_seconds,
+            AVG(cpu_seconds) AS avg_cpu_seconds,
+            MAX(cpu_seconds) AS max_cpu_seconds,
+            SUM(cpu_seconds) * 1e6 / NULLIF(SUM(CASE WHEN cpu_seconds IS NOT NULL THEN input_bytes END), 0) AS cpu_seconds_per_input_mb,
+            AVG(peak_rss_bytes) AS avg_peak_rss_bytes,
+            MAX(peak_rss_bytes) AS max_peak_rss_bytes,
+            SUM(bytes_read) AS total_bytes_read,
+            SUM(bytes_written) AS total_bytes_written
+            FROM {self.USAGE_TABLE_NAME}
+            GROUP BY converter, input_format, output_format
+            ORDER BY converter, input_format, output_format
+        """)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get_pair_stats(self, input_format: str, output_format: str) -> dict[str, dict]:
+        """Totals of every converter that has run this format pair, keyed by converter name."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"SELECT * FROM {self.TABLE_NAME} WHERE input_format = ? AND output_format = ?",
+            (input_format, output_format)
+        )
+        columns = [column[0] for column in cursor.description]
+        return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+
+    def list_stats(self) -> list[dict]:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT * FROM {self.TABLE_NAME} ORDER BY converter, input_format, output_format")
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        """Close the database connection"""
+        if self.conn:
+            self.conn.close()
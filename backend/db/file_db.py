@@ -1,15 +1,30 @@
+import json
 import sqlite3
 from core import get_settings, validate_sql_identifier
+from core.metrics import TimedConnection
 
 class FileDB:
     settings = get_settings()
     DB_PATH = settings.db_path
     TABLE_NAME = settings.file_table_name
 
+    # Media properties filled in by the upload probe (see core/probe.py)
+    PROBE_COLUMNS = {
+        'width': 'INTEGER',
+        'height': 'INTEGER',
+        'duration_seconds': 'REAL',
+        'video_codec': 'TEXT',
+        'audio_codec': 'TEXT',
+        'bit_rate': 'INTEGER',
+        'row_count': 'INTEGER',
+        'data_schema': 'TEXT',
+        'probe_status': 'TEXT'
+    }
+
     def __init__(self):
         # Validate table name on initialization to prevent SQL injection
         self.TABLE_NAME = validate_sql_identifier(self.TABLE_NAME)
-        self.conn = sqlite3.connect(self.DB_PATH, check_same_thread=False)
+        self.conn = sqlite3.connect(self.DB_PATH, check_same_thread=False, factory=TimedConnection)
         self.create_tables()
     
     def create_tables(self):
@@ -26,6 +41,23 @@ class FileDB:
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+            # Add the probe columns to tables created before they existed
+            existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({self.TABLE_NAME})")}
+            for column, column_type in self.PROBE_COLUMNS.items():
+                if column in existing:
+                    continue
+                try:
+                    self.conn.execute(f"ALTER TABLE {self.TABLE_NAME} ADD COLUMN {column} {column_type}")
+                except sqlite3.OperationalError as e:
+                    # Another worker process added it first
+                    if "duplicate column" not in str(e):
+                        raise
+
+    def _row_to_metadata(self, columns: list[str], row: tuple) -> dict:
+        metadata = dict(zip(columns, row))
+        if metadata.get('data_schema'):
+            metadata['data_schema'] = json.loads(metadata['data_schema'])
+        return metadata
   
     def insert_file_metadata(self, metadata: dict):
         required_fields = [
@@ -61,19 +93,39 @@ class FileDB:
         if row is None:
             return None
         columns = [column[0] for column in cursor.description]
-        return dict(zip(columns, row))
+        return self._row_to_metadata(columns, row)
 
     def list_files(self) -> list[dict]:
         cursor = self.conn.cursor()
         cursor.execute(f"SELECT * FROM {self.TABLE_NAME}")
         rows = cursor.fetchall()
         columns = [column[0] for column in cursor.description]
-        return [dict(zip(columns, row)) for row in rows]
+        return [self._row_to_metadata(columns, row) for row in rows]
+
+    def update_probe(self, file_id: str, probe: dict):
+        """Store the probed media properties of a file."""
+        unknown = set(probe) - set(self.PROBE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown probe fields: {unknown}")
+        values = dict(probe)
+        if values.get('data_schema') is not None:
+            values['data_schema'] = json.dumps(values['data_schema'])
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        with self.conn:
+            self.conn.execute(
+                f"UPDATE {self.TABLE_NAME} SET {assignments} WHERE id = ?",
+                (*values.values(), file_id)
+            )
 
     def delete_file_metadata(self, file_id: str):
         with self.conn:
             self.conn.execute(f"DELETE FROM {self.TABLE_NAME} WHERE id = ?", (file_id,))
     
+    def total_size_bytes(self) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT COALESCE(SUM(size_bytes), 0) FROM {self.TABLE_NAME}")
+        return cursor.fetchone()[0]
+    
     def close(self):
         """Close the database connection"""
         if self.conn:
@@ -0,0 +1,155 @@
+import sqlite3
+from core import get_settings, validate_sql_identifier
+from core.metrics import TimedConnection
+
+class UploadSessionDB:
+    settings = get_settings()
+    DB_PATH = settings.db_path
+    TABLE_NAME = settings.upload_session_table_name
+
+    def __init__(self):
+        # Validate table name on initialization to prevent SQL injection
+        self.TABLE_NAME = validate_sql_identifier(self.TABLE_NAME)
+        self.CHUNK_TABLE_NAME = validate_sql_identifier(f"{self.TABLE_NAME}_CHUNKS")
+        self.conn = sqlite3.connect(self.DB_PATH, check_same_thread=False, factory=TimedConnection)
+        self.create_tables()
+
+    def create_tables(self):
+        with self.conn:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
+                id TEXT PRIMARY KEY UNIQUE,
+                storage_path TEXT,
+                original_filename TEXT,
+                extension TEXT,
+                size_bytes INTEGER,
+                chunk_size INTEGER,
+                sha256_checksum TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # One row per claimed chunk, so parallel chunk uploads never
+            # read-modify-write the same row. A chunk is claimed before it is
+            # written and marked received once it is on disk
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.CHUNK_TABLE_NAME} (
+                session_id TEXT,
+                chunk_index INTEGER,
+                received INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (session_id, chunk_index)
+                )
+            """)
+
+    def insert_session(self, metadata: dict):
+        required_fields = [
+            'id',
+            'storage_path',
+            'original_filename',
+            'extension',
+            'size_bytes',
+            'chunk_size',
+            'sha256_checksum'
+        ]
+        if metadata.keys() != set(required_fields):
+            raise ValueError(f"Metadata must contain the following fields: {required_fields}. Missing or extra fields: {set(required_fields).symmetric_difference(metadata.keys())}")
+        with self.conn:
+            self.conn.execute(f"""
+                INSERT INTO {self.TABLE_NAME} (
+                id, storage_path, original_filename, extension, size_bytes, chunk_size, sha256_checksum
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                metadata['id'],
+                metadata['storage_path'],
+                metadata['original_filename'],
+                metadata['extension'],
+                metadata['size_bytes'],
+                metadata['chunk_size'],
+                metadata['sha256_checksum']
+            ))
+
+    def get_session(self, session_id: str) -> dict | None:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT * FROM {self.TABLE_NAME} WHERE id = ?", (session_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, row))
+
+    def claim_chunk(self, session_id: str, chunk_index: int, stale_seconds: float) -> bool:
+        """
+        Reserve a chunk for writing; False if it is already received or being written.
+
+        A claim that has not been refreshed for stale_seconds belongs to an
+        upload that died (e.g. with its worker process) and is taken over.
+        """
+        with self.conn:
+            self.conn.execute(f"""
+                DELETE FROM {self.CHUNK_TABLE_NAME}
+                WHERE session_id = ? AND chunk_index = ? AND received = 0 AND updated_at < datetime('now', ?)
+            """, (session_id, chunk_index, f"-{stale_seconds} seconds"))
+            cursor = self.conn.execute(f"""
+                INSERT OR IGNORE INTO {self.CHUNK_TABLE_NAME} (session_id, chunk_index) VALUES (?, ?)
+            """, (session_id, chunk_index))
+            return cursor.rowcount == 1
+
+    def refresh_chunk_claim(self, session_id: str, chunk_index: int):
+        """Show that the upload holding a chunk's claim is still writing."""
+        with self.conn:
+            self.conn.execute(f"""
+                UPDATE {self.CHUNK_TABLE_NAME} SET updated_at = CURRENT_TIMESTAMP
+                WHERE session_id = ? AND chunk_index = ? AND received = 0
+            """, (session_id, chunk_index))
+
+    def release_chunk(self, session_id: str, chunk_index: int):
+        """Drop the claim on a chunk whose write failed, so it can be sent again."""
+        with self.conn:
+            self.conn.execute(
+                f"DELETE FROM {self.CHUNK_TABLE_NAME} WHERE session_id = ? AND chunk_index = ? AND received = 0",
+                (session_id, chunk_index)
+            )
+
+    def mark_chunk_received(self, session_id: str, chunk_index: int):
+        with self.conn:
+            self.conn.execute(f"""
+                UPDATE {self.CHUNK_TABLE_NAME} SET received = 1, updated_at = CURRENT_TIMESTAMP
+                WHERE session_id = ? AND chunk_index = ?
+            """, (session_id, chunk_index))
+
+    def list_received_chunks(self, session_id: str) -> list[int]:
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"SELECT chunk_index FROM {self.CHUNK_TABLE_NAME} WHERE session_id = ? AND received = 1 ORDER BY chunk_index",
+            (session_id,)
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def list_idle_sessions(self, max_idle_hours: float) -> list[dict]:
+        """Sessions that have not received a chunk for max_idle_hours (or since they were created)."""
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT s.* FROM {self.TABLE_NAME} s
+            LEFT JOIN {self.CHUNK_TABLE_NAME} c ON c.session_id = s.id
+            GROUP BY s.id
+            HAVING MAX(s.created_at, COALESCE(MAX(c.updated_at), s.created_at)) < datetime('now', ?)
+        """, (f"-{max_idle_hours} hours",))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def delete_session(self, session_id: str) -> bool:
+        """Delete a session; False if it was already gone (e.g. completed or aborted concurrently)."""
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {self.CHUNK_TABLE_NAME} WHERE session_id = ?", (session_id,))
+            cursor = self.conn.execute(f"DELETE FROM {self.TABLE_NAME} WHERE id = ?", (session_id,))
+            return cursor.rowcount == 1
+
+    def total_size_bytes(self) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT COALESCE(SUM(size_bytes), 0) FROM {self.TABLE_NAME}")
+        return cursor.fetchone()[0]
+
+    def close(self):
+        """Close the database connection"""
+        if self.conn:
+            self.conn.close()
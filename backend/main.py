@@ -1,22 +1,62 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI, HTTPException, Response, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, RedirectResponse
 from fastapi.openapi.docs import get_redoc_html
 from api import router
+from api.routes.metrics import seed_storage_metrics
 from core import get_settings
+from core.timing import ServerTimingMiddleware
+from core.profiling import ProfilingMiddleware
+from core.admission import AdmissionMiddleware
+from core.worker_pool import get_worker_pool
+from core.shared_state import get_shared_state
+from core.startup import run_startup, STARTUP_DONE_ENV
 import uvicorn
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    worker_pool = get_worker_pool()
+    if worker_pool is not None:
+        # Warm the conversion workers in the background, so the server
+        # starts accepting requests without waiting for the converter imports
+        asyncio.get_running_loop().run_in_executor(None, worker_pool.start)
+    shared_state = get_shared_state()
+    if shared_state is not None:
+        exchange = asyncio.create_task(shared_state.run())
+    yield
+    # uvicorn has stopped accepting connections and let in-flight requests
+    # finish (up to GRACEFUL_SHUTDOWN_SECONDS) by the time this runs
+    if shared_state is not None:
+        exchange.cancel()
+        shared_state.close()
+    if worker_pool is not None:
+        worker_pool.shutdown()
+
 def create_app() -> FastAPI:
     settings = get_settings()
+    run_startup()
     app = FastAPI(
         title=f"{settings.app_name} API",
         description=f"API to interact with {settings.app_name} without the need for a frontend",
         version=f"{settings.app_version}",
         docs_url=None,
         redoc_url=None,
-        redirect_slashes=True
+        redirect_slashes=True,
+        lifespan=lifespan
     )
+    app.add_middleware(ServerTimingMiddleware)
+    # Only installed when enabled, so unprofiled deployments pay nothing for it
+    if settings.profiling_enabled:
+        app.add_middleware(ProfilingMiddleware)
+    # Outermost, so rejected requests are turned away before anything else runs
+    app.add_middleware(AdmissionMiddleware)
     app.include_router(router, prefix="/api")
+    seed_storage_metrics()
     web_dir = settings.web_dir
     if web_dir.exists():
         app.mount("/assets", StaticFiles(directory=web_dir / "assets"), name="assets")
@@ -42,6 +82,22 @@ def create_app() -> FastAPI:
     
     return app
 
+def main():
+    """Run the server with WORKERS HTTP worker processes."""
+    settings = get_settings()
+    # Once for every worker, before any of them starts
+    run_startup()
+    os.environ[STARTUP_DONE_ENV] = str(os.getpid())
+    # Each worker builds its own app, which needs the app given by import path
+    uvicorn.run(
+        "main:create_app",
+        factory=True,
+        app_dir=str(Path(__file__).resolve().parent),
+        host=settings.host,
+        port=settings.port,
+        workers=settings.server_workers(),
+        timeout_graceful_shutdown=settings.graceful_shutdown_seconds,
+    )
+
 if __name__ == "__main__":
-    app = create_app()
-    uvicorn.run(app, host="0.0.0.0", port=3313)
+    main()
@@ -1,3 +1,3 @@
-from .registry import ConverterRegistry
+from .registry import ConverterRegistry, get_registry
 
-__all__ = ["ConverterRegistry"]
\ No newline at end of file
+__all__ = ["ConverterRegistry", "get_registry"]
@@ -1,57 +1,60 @@
-import sys
-import os
-import inspect
-from core import media_type_aliases
-from converters import ConverterInterface
-import converters
+import random
+from functools import lru_cache
+from core import get_settings, media_type_aliases
+from core.metrics import record_cache_lookup
+from typing import Optional
+from converters import ConverterSpec, CONVERTER_MANIFEST
+
+
+# Observed costs are trusted once a converter has run a format pair this often
+MIN_COST_RUNS = 3
 
 
 class ConverterRegistry:
     """
     Registry for managing available converters.
-    Automatically discovers and registers all converter classes.
+    Registers every converter declared in the converter manifest. Routing
+    uses the declared formats only; a converter's implementation module is
+    imported when its class is first requested.
     """
     def __init__(self):
-        self.converters = {}
-        self.input_format_map = {}  # Maps input format -> list of converter classes
-        self.output_format_map = {}  # Maps output format -> list of converter classes
+        self.converters = {}  # Maps converter name -> ConverterSpec
+        self.input_format_map = {}  # Maps input format -> list of converter specs
+        self.output_format_map = {}  # Maps output format -> list of converter specs
+        self.compatible_formats_cache = {}  # Maps normalized format -> compatible output formats
+        self.exploration_rate = get_settings().converter_exploration_rate
         self._auto_register()
     
     def _auto_register(self):
         """
-        Automatically discover and register all converter classes from the converters module.
+        Register every converter declared in the converter manifest.
         """
-        # Get all classes from the converters module
-        for name, obj in inspect.getmembers(converters, inspect.isclass):
-            # Check if it's a subclass of ConverterInterface (but not the interface itself)
-            if issubclass(obj, ConverterInterface) and obj is not ConverterInterface:
-                self.register_converter(obj)
+        for spec in CONVERTER_MANIFEST:
+            self.register_converter(spec)
     
-    def register_converter(self, converter_class):
+    def register_converter(self, spec: ConverterSpec):
         """
-        Register a converter class in the registry.
+        Register a converter declaration in the registry.
         
         Args:
-            converter_class: The converter class to register
+            spec: The converter's formats and implementing module
         """
-        self.converters[converter_class.__name__] = converter_class
+        self.converters[spec.name] = spec
+        self.compatible_formats_cache.clear()
         
         # Map supported formats to this converter
-        if hasattr(converter_class, 'supported_input_formats'):
-            for fmt in converter_class.supported_input_formats:
-                if fmt not in self.input_format_map:
-                    self.input_format_map[fmt] = []
-                self.input_format_map[fmt].append(converter_class)
-        # Map supported formats to this converter
-        if hasattr(converter_class, 'supported_output_formats'):
-            for fmt in converter_class.supported_output_formats:
-                if fmt not in self.output_format_map:
-                    self.output_format_map[fmt] = []
-                self.output_format_map[fmt].append(converter_class)
+        for fmt in spec.supported_input_formats:
+            if fmt not in self.input_format_map:
+                self.input_format_map[fmt] = []
+            self.input_format_map[fmt].append(spec)
+        for fmt in spec.supported_output_formats:
+            if fmt not in self.output_format_map:
+                self.output_format_map[fmt] = []
+            self.output_format_map[fmt].append(spec)
     
     def get_converter(self, name):
         """
-        Retrieve a converter class by name.
+        Retrieve a converter class by name, importing its module on first use.
         
         Args:
             name: The name of the converter class to retrieve
@@ -59,7 +62,8 @@ class ConverterRegistry:
         Returns:
             The converter class if found, else None
         """
-        return self.converters.get(name, None)
+        spec = self.converters.get(name)
+        return spec.load() if spec is not None else None
     
     def get_formats(self):
         """
@@ -90,7 +94,7 @@ class ConverterRegistry:
             format_type: File format (e.g., 'mp4', 'jpg', 'csv')
         
         Returns:
-            List of converter classes that support this input format
+            List of converter specs that support this input format
         """
         normalized_format = self.get_normalized_format(format_type)
         return self.input_format_map.get(normalized_format, [])
@@ -103,31 +107,127 @@ class ConverterRegistry:
             format_type: File format (e.g., 'mp4', 'jpg', 'csv')
         
         Returns:
-            List of converter classes that support this output format
+            List of converter specs that support this output format
         """
         normalized_format = self.get_normalized_format(format_type)
         return self.output_format_map.get(normalized_format, [])
     
-    def get_converter_for_conversion(self, input_format, output_format):
+    def rank_converters(self, input_format, output_format, stats: Optional[dict] = None):
         """
-        Find the appropriate converter for a specific conversion.
+        Rank the converters that support a conversion, preferred first.
+        
+        Until any candidate has run the format pair MIN_COST_RUNS times, the
+        static priority decides. From then on the one with the lowest
+        estimated seconds per MB of input wins: observed for the measured
+        candidates, the declared prior for the others, so a measured
+        converter is compared against the ones that have not run yet. Ties
+        are broken by priority, then by name, so the ranking is always
+        deterministic.
         
         Args:
             input_format: Input file format
             output_format: Output file format
+            stats: Observed totals per converter name for this format pair
+                (see ConverterStatsDB.get_pair_stats)
         
         Returns:
-            Converter class that supports both formats, or None
+            List of candidates with name, priority, runs, seconds_per_mb
+            (observed) and estimated_seconds_per_mb (ranked on)
         """
         normalized_input = self.get_normalized_format(input_format)
         normalized_output = self.get_normalized_format(output_format)
-        input_converters = set(self.get_converters_for_input_format(normalized_input))
-        output_converters = set(self.get_converters_for_output_format(normalized_output))
+        input_converters = self.get_converters_for_input_format(normalized_input)
+        output_converters = self.get_converters_for_output_format(normalized_output)
+        stats = stats or {}
         
         # Find converters that support both formats
-        compatible = input_converters & output_converters
+        candidates = []
+        for spec in input_converters:
+            if spec not in output_converters:
+                continue
+            observed = stats.get(spec.name)
+            runs = observed['runs'] if observed else 0
+            seconds_per_mb = None
+            if runs and observed['total_input_bytes']:
+                seconds_per_mb = observed['total_seconds'] / (observed['total_input_bytes'] / 1e6)
+            candidates.append({
+                'name': spec.name,
+                'priority': spec.priority,
+                'runs': runs,
+                'seconds_per_mb': seconds_per_mb,
+                'estimated_seconds_per_mb': self._seconds_per_mb(spec, observed)
+            })
+        
+        measured = any(c['runs'] >= MIN_COST_RUNS and c['seconds_per_mb'] is not None for c in candidates)
+        candidates.sort(key=lambda c: (c['estimated_seconds_per_mb'] if measured else 0, c['priority'], c['name']))
+        return candidates
+    
+    def _seconds_per_mb(self, spec: ConverterSpec, observed: Optional[dict]) -> float:
+        """Observed seconds per MB once measured, the converter's declared prior until then."""
+        if observed and observed['runs'] >= MIN_COST_RUNS and observed['total_input_bytes']:
+            return observed['total_seconds'] / (observed['total_input_bytes'] / 1e6)
+        return spec.seconds_per_mb
+    
+    def estimate_seconds(self, converter_name, input_bytes, stats: Optional[dict] = None):
+        """
+        Estimate how long a converter takes for an input of the given size.
+        
+        Uses the observed seconds per MB for the format pair when the
+        converter has run it at least MIN_COST_RUNS times, and the
+        converter's declared prior otherwise.
+        
+        Args:
+            converter_name: Name of the converter
+            input_bytes: Size of the input file
+            stats: Observed totals per converter name for this format pair
+        
+        Returns:
+            Estimated conversion time in seconds
+        """
+        spec = self.converters[converter_name]
+        seconds_per_mb = self._seconds_per_mb(spec, (stats or {}).get(converter_name))
+        return seconds_per_mb * input_bytes / 1e6
+    
+    def select_converter(self, input_format, output_format, stats: Optional[dict] = None):
+        """
+        Name of the cheapest converter for a specific conversion, without importing it.
+        
+        Only the selected converter's runs are measured, so with
+        CONVERTER_EXPLORATION_RATE a candidate that has not run the format
+        pair MIN_COST_RUNS times yet is picked instead, until every
+        candidate has a measured cost.
+        
+        Args:
+            input_format: Input file format
+            output_format: Output file format
+            stats: Observed totals per converter name for this format pair
+        
+        Returns:
+            Converter name, or None if no converter supports both formats
+        """
+        candidates = self.rank_converters(input_format, output_format, stats)
+        if not candidates:
+            return None
+        unmeasured = [c for c in candidates[1:] if c['runs'] < MIN_COST_RUNS]
+        if unmeasured and random.random() < self.exploration_rate:
+            return random.choice(unmeasured)['name']
+        return candidates[0]['name']
+    
+    def get_converter_for_conversion(self, input_format, output_format, stats: Optional[dict] = None):
+        """
+        Find the cheapest converter for a specific conversion.
+        
+        Args:
+            input_format: Input file format
+            output_format: Output file format
+            stats: Observed totals per converter name for this format pair
         
-        return compatible.pop() if compatible else None
+        Returns:
+            Converter class that supports both formats, or None. Its module
+            is imported here if this is its first conversion.
+        """
+        name = self.select_converter(input_format, output_format, stats)
+        return self.converters[name].load() if name else None
     
     def list_converters(self):
         """
@@ -137,11 +237,8 @@ class ConverterRegistry:
             Dictionary mapping converter names to their supported formats
         """
         result = {}
-        for name, converter_class in self.converters.items():
-            if hasattr(converter_class, 'supported_formats'):
-                result[name] = list(converter_class.supported_formats)
-            else:
-                result[name] = []
+        for name, spec in self.converters.items():
+            result[name] = sorted(spec.supported_input_formats | spec.supported_output_formats)
         return result
     
     def get_compatible_formats(self, format_type):
@@ -159,18 +256,21 @@ class ConverterRegistry:
             Set of compatible format strings
         """
         normalized_format = self.get_normalized_format(format_type)
+        # Looked up for every listed file, and only changes when converters are registered
+        cached = self.compatible_formats_cache.get(normalized_format)
+        record_cache_lookup("compatible_formats", cached is not None)
+        if cached is not None:
+            return set(cached)
         compatible = set()
         
         # Find all converters that support this format
         converters_for_format = self.get_converters_for_input_format(normalized_format)
         
         # For each converter, determine valid output formats
-        for converter_class in converters_for_format:
-            if not hasattr(converter_class, 'get_formats_compatible_with'):
-                continue
-            
-            compatible.update(converter_class.get_formats_compatible_with(normalized_format))
+        for spec in converters_for_format:
+            compatible.update(spec.get_formats_compatible_with(normalized_format))
         
+        self.compatible_formats_cache[normalized_format] = frozenset(compatible)
         return compatible
     
     def get_format_compatibility_matrix(self):
@@ -187,4 +287,15 @@ class ConverterRegistry:
             normalized_fmt = self.get_normalized_format(fmt)
             matrix[normalized_fmt] = self.get_compatible_formats(normalized_fmt)
         
-        return matrix
\ No newline at end of file
+        return matrix
+
+
+@lru_cache
+def get_registry() -> ConverterRegistry:
+    """
+    Shared registry instance.
+
+    Ensures the registry (and its compatible formats cache) is built once
+    per process.
+    """
+    return ConverterRegistry()
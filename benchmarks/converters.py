@@ -0,0 +1,230 @@
+"""
+Throughput, peak memory and output size for every converter format pair.
+
+Walks each registered converter's compatibility matrix, converts a
+deterministic synthetic input (see fixtures.py) of each requested size, and
+compares the results against a committed baseline. Exits with status 1 if
+any case regressed beyond the tolerance.
+
+Each case runs in a forked child process, so its peak RSS (including any
+subprocess such as ffmpeg) is measured in isolation.
+
+Usage:
+    python benchmarks/converters.py [--sizes small,medium] [--match csv->] [--json results.json]
+    python benchmarks/converters.py --update-baseline
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent / "backend"))
+# Keep the app's data directories (created by the settings) out of the tree
+os.environ.setdefault("DATA_DIR", str(Path(tempfile.gettempdir()) / "transmute-benchmarks"))
+
+from fixtures import SIZES, GENERATORS, fixture
+from registry import ConverterRegistry, get_registry
+
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+DEFAULT_FIXTURES = BENCHMARKS_DIR / ".fixtures"
+
+
+def case_key(converter: str, input_format: str, output_format: str, size: str) -> str:
+    return f"{converter}:{input_format}->{output_format}:{size}"
+
+
+def list_cases(registry: ConverterRegistry, sizes: list[str], match: str | None) -> list[tuple]:
+    """Every (converter, input format, output format, size) in the compatibility matrix."""
+    cases = []
+    for name, spec in sorted(registry.converters.items()):
+        if name not in GENERATORS:
+            continue
+        for input_format in sorted(spec.supported_input_formats):
+            for output_format in sorted(spec.get_formats_compatible_with(input_format)):
+                for size in sizes:
+                    if match and match not in case_key(name, input_format, output_format, size):
+                        continue
+                    cases.append((name, input_format, output_format, size))
+    return cases
+
+
+def _peak_rss_bytes() -> int:
+    """Peak RSS of this process and its finished children (ru_maxrss is KiB on Linux)."""
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    if os.path.exists("/proc/self/status"):
+        # VmHWM honours the reset in _reset_peak_rss(), ru_maxrss does not
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    own = int(line.split()[1]) * 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return max(own, children)
+
+
+def _reset_peak_rss():
+    """Drop the peak RSS inherited from the parent at fork (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _run_case(conn, converter_name: str, input_path: str, input_format: str, output_format: str, repeat: int):
+    """Child process body: run one conversion and send back its measurements."""
+    _reset_peak_rss()
+    try:
+        converter_class = get_registry().get_converter(converter_name)
+        timings = []
+        with tempfile.TemporaryDirectory() as output_dir:
+            for _ in range(repeat):
+                converter = converter_class(input_path, f"{output_dir}/", input_format, output_format)
+                started = time.perf_counter()
+                output_files = converter.convert()
+                timings.append(time.perf_counter() - started)
+            output_bytes = sum(os.path.getsize(path) for path in output_files)
+        conn.send({"seconds": min(timings), "output_bytes": output_bytes, "peak_rss_bytes": _peak_rss_bytes()})
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_case(context, fixtures_dir: Path, case: tuple, repeat: int, timeout: float) -> dict:
+    converter_name, input_format, output_format, size = case
+    result = {"converter": converter_name, "input_format": input_format, "output_format": output_format, "size": size}
+    try:
+        input_path = fixture(fixtures_dir, converter_name, input_format, size)
+    except Exception as e:
+        return {**result, "error": f"fixture: {type(e).__name__}: {e}"}
+
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_run_case,
+        args=(child_conn, converter_name, str(input_path), input_format, output_format, repeat),
+    )
+    process.start()
+    child_conn.close()
+    if parent_conn.poll(timeout):
+        measured = parent_conn.recv()
+    else:
+        process.kill()
+        measured = {"error": f"timed out after {timeout:.0f}s"}
+    process.join()
+
+    result["input_bytes"] = input_path.stat().st_size
+    result.update(measured)
+    if "seconds" in measured:
+        result["throughput_mb_s"] = result["input_bytes"] / measured["seconds"] / 1e6
+    return result
+
+
+def compare(results: list[dict], baseline: dict, time_tolerance: float, size_tolerance: float, min_slowdown: float) -> list[str]:
+    """
+    Regressions against the baseline.
+
+    A case regresses if throughput drops by more than `time_tolerance`, if
+    peak RSS or output size grows by more than `size_tolerance`, or if it now
+    fails where the baseline passed. A throughput drop also has to cost at
+    least `min_slowdown` seconds, so timer noise on millisecond cases is not
+    reported. Cases missing from the baseline are not compared.
+    """
+    regressions = []
+    for result in results:
+        key = case_key(result["converter"], result["input_format"], result["output_format"], result["size"])
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        if "error" in result:
+            regressions.append(f"{key}: now fails ({result['error']})")
+            continue
+        if (result["throughput_mb_s"] < expected["throughput_mb_s"] * (1 - time_tolerance)
+                and result["seconds"] - expected["seconds"] > min_slowdown):
+            regressions.append(f"{key}: throughput {result['throughput_mb_s']:.2f} MB/s vs baseline {expected['throughput_mb_s']:.2f} MB/s")
+        if result["peak_rss_bytes"] > expected["peak_rss_bytes"] * (1 + size_tolerance):
+            regressions.append(f"{key}: peak RSS {result['peak_rss_bytes'] / 2**20:.1f} MiB vs baseline {expected['peak_rss_bytes'] / 2**20:.1f} MiB")
+        if result["output_bytes"] > expected["output_bytes"] * (1 + size_tolerance):
+            regressions.append(f"{key}: output {result['output_bytes']} bytes vs baseline {expected['output_bytes']} bytes")
+    return regressions
+
+
+def print_table(results: list[dict]):
+    print(f"{'case':<48}{'seconds':>10}{'MB/s':>10}{'peak MiB':>10}{'out KiB':>12}")
+    for r in results:
+        key = case_key(r["converter"], r["input_format"], r["output_format"], r["size"])
+        if "error" in r:
+            print(f"{key:<48}  error: {r['error'][:80]}")
+        else:
+            print(f"{key:<48}{r['seconds']:>10.3f}{r['throughput_mb_s']:>10.2f}"
+                  f"{r['peak_rss_bytes'] / 2**20:>10.1f}{r['output_bytes'] / 1024:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="small", help=f"Comma-separated sizes from {SIZES}")
+    parser.add_argument("--match", help="Only run cases whose key contains this text (e.g. 'PandasConverter:csv->')")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (best time is reported, so the first run warms up)")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before a case is abandoned")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="Allowed relative throughput drop (0.5 = 50%%)")
+    parser.add_argument("--size-tolerance", type=float, default=0.1, help="Allowed relative growth of peak RSS and output size")
+    parser.add_argument("--min-slowdown", type=float, default=0.05, help="Seconds a case must slow down by to count as a regression")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--fixtures-dir", type=Path, default=DEFAULT_FIXTURES)
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    if unknown := set(sizes) - set(SIZES):
+        parser.error(f"unknown sizes: {sorted(unknown)}")
+
+    # fork keeps the imports from the parent, so each case starts quickly.
+    # Converters load lazily, so import them all here first.
+    registry = get_registry()
+    for spec in registry.converters.values():
+        try:
+            spec.load()
+        except ImportError as e:
+            print(f"{spec.name} unavailable: {e}")
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+    cases = list_cases(registry, sizes, args.match)
+    results = [run_case(context, args.fixtures_dir, case, args.repeat, args.timeout) for case in cases]
+    print_table(results)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        for r in results:
+            # Failed cases (e.g. a missing tool) are left out rather than recorded
+            if "error" in r:
+                continue
+            key = case_key(r["converter"], r["input_format"], r["output_format"], r["size"])
+            baseline[key] = {k: r[k] for k in ("seconds", "throughput_mb_s", "peak_rss_bytes", "output_bytes", "input_bytes")}
+        args.baseline.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n")
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.time_tolerance, args.size_tolerance, args.min_slowdown)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Encode time vs output size for each image encode profile.
+
+Generates a deterministic synthetic photo-like image, converts it with
+PillowConverter to every profiled output format under each encode profile,
+and reports the encode time and output size.
+
+Usage:
+    python benchmarks/encode_profiles.py [--size 2048x1536] [--json results.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from converters.pillow_convert import PillowConverter, ENCODE_PROFILES
+from fixtures import synthetic_photo
+
+PROFILES = ["fast", "balanced", "smallest"]
+
+
+def run(width: int, height: int, quality: str | None, repeat: int) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        source = os.path.join(work_dir, "source.png")
+        synthetic_photo(width, height).save(source, compress_level=1)
+        for output_format in sorted(ENCODE_PROFILES):
+            if output_format not in PillowConverter.supported_output_formats:
+                continue
+            for profile in PROFILES:
+                timings = []
+                for _ in range(repeat):
+                    converter = PillowConverter(
+                        source, os.path.join(work_dir, "out"), "png", output_format,
+                        options={"encode_profile": profile}
+                    )
+                    start = time.perf_counter()
+                    output_file = converter.convert(quality=quality)[0]
+                    timings.append(time.perf_counter() - start)
+                results.append({
+                    "format": output_format,
+                    "profile": profile,
+                    "seconds": min(timings),
+                    "size_bytes": os.path.getsize(output_file),
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", default="2048x1536", help="Image size as WIDTHxHEIGHT")
+    parser.add_argument("--quality", default=None, choices=["high", "medium", "low", "lossless"])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per profile (best time is reported)")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    results = run(width, height, args.quality, args.repeat)
+
+    print(f"{'format':<8}{'profile':<10}{'encode ms':>12}{'size KiB':>12}")
+    for row in results:
+        print(f"{row['format']:<8}{row['profile']:<10}{row['seconds'] * 1000:>12.1f}{row['size_bytes'] / 1024:>12.1f}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Deterministic synthetic inputs for the benchmarks.
+
+Every generator takes a format and a size name ("small", "medium" or
+"large") and writes the same bytes for the same arguments, so results are
+comparable between runs and machines. Generated files are cached by name
+in the fixtures directory.
+"""
+import shutil
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+SIZES = ["small", "medium", "large"]
+
+IMAGE_SIZES = {"small": (320, 240), "medium": (1280, 960), "large": (4096, 3072)}
+TABLE_ROWS = {"small": 2_000, "medium": 100_000, "large": 1_000_000}
+MEDIA_SIZES = {"small": ("320x240", 2), "medium": ("640x480", 10), "large": ("1280x720", 30)}
+
+# Formats ffmpeg writes with a sine tone only (no video stream)
+AUDIO_FORMATS = {"aac", "flac", "m4a", "mp3", "ogg", "opus", "wav", "wma"}
+# Pillow plugin names for extensions that differ from the format name
+PILLOW_FORMATS = {"jpeg": "JPEG", "tif": "TIFF", "tiff": "TIFF", "heic": "HEIF", "heif": "HEIF", "pbm": "PPM", "pgm": "PPM", "ppm": "PPM"}
+PILLOW_MODES = {"pbm": "1", "pgm": "L", "pcx": "RGB", "ico": "RGBA", "gif": "P"}
+
+
+def synthetic_photo(width: int, height: int, seed: int = 0) -> Image.Image:
+    """Smooth gradients plus sensor-like noise, which compresses like a photo."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([
+        128 + 100 * np.sin(x / width * 6.28),
+        128 + 100 * np.cos(y / height * 6.28),
+        128 + 100 * np.sin((x + y) / (width + height) * 12.56),
+    ], axis=-1)
+    noise = rng.normal(0, 8, size=base.shape)
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8), "RGB")
+
+
+def synthetic_table(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Mixed-type table with repeated categories, like typical exported data."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(rows, dtype=np.int64),
+        "category": rng.choice(["alpha", "beta", "gamma", "delta", "epsilon"], size=rows),
+        "value": rng.normal(100, 25, size=rows).round(4),
+        "count": rng.integers(0, 10_000, size=rows),
+        "flag": rng.random(rows) < 0.3,
+        "label": [f"item-{i % 997:04d}" for i in range(rows)],
+    })
+
+
+def synthetic_svg(width: int, height: int, shapes: int, seed: int = 0) -> str:
+    rng = np.random.default_rng(seed)
+    elements = []
+    for _ in range(shapes):
+        cx, cy = rng.integers(0, width), rng.integers(0, height)
+        r = rng.integers(5, max(6, width // 8))
+        color = "#%02x%02x%02x" % tuple(rng.integers(0, 256, size=3))
+        elements.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="{color}" fill-opacity="0.6"/>')
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        '<defs><linearGradient id="g" x1="0" y1="0" x2="1" y2="1">'
+        '<stop offset="0" stop-color="#2b5876"/><stop offset="1" stop-color="#4e4376"/></linearGradient></defs>'
+        f'<rect width="{width}" height="{height}" fill="url(#g)"/>' + "".join(elements) + "</svg>"
+    )
+
+
+def synthetic_drawio(cells: int) -> str:
+    nodes = "".join(
+        f'<mxCell id="n{i}" value="Node {i}" style="rounded=1;" vertex="1" parent="1">'
+        f'<mxGeometry x="{(i % 10) * 140}" y="{(i // 10) * 80}" width="120" height="60" as="geometry"/></mxCell>'
+        for i in range(cells)
+    )
+    return (
+        '<mxfile><diagram id="bench" name="Page-1"><mxGraphModel><root>'
+        '<mxCell id="0"/><mxCell id="1" parent="0"/>' + nodes +
+        "</root></mxGraphModel></diagram></mxfile>"
+    )
+
+
+def write_image(path: Path, fmt: str, size: str):
+    width, height = IMAGE_SIZES[size]
+    if fmt == "svg":
+        path.write_text(synthetic_svg(width, height, shapes=width // 4))
+        return
+    img = synthetic_photo(width, height)
+    if fmt == "gif":
+        # Short animation, so multi-frame handling is part of the benchmark
+        frames = [img.rotate(angle).quantize(colors=255) for angle in (0, 5, 10, 15)]
+        frames[0].save(path, save_all=True, append_images=frames[1:], duration=100, loop=0)
+        return
+    if fmt == "ico":
+        img = img.resize((256, 256))
+    mode = PILLOW_MODES.get(fmt)
+    if mode:
+        img = img.convert(mode)
+    img.save(path, format=PILLOW_FORMATS.get(fmt, fmt.upper()))
+
+
+def write_table(path: Path, fmt: str, size: str):
+    df = synthetic_table(TABLE_ROWS[size])
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "json":
+        df.to_json(path, orient="records", indent=2)
+    elif fmt == "yaml":
+        import yaml
+        with path.open("w") as f:
+            yaml.dump(df.to_dict(orient="records"), f, Dumper=getattr(yaml, "CDumper", yaml.Dumper), sort_keys=False)
+    elif fmt == "xlsx":
+        df.to_excel(path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        raise ValueError(f"No table fixture for {fmt}")
+
+
+def write_media(path: Path, fmt: str, size: str):
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg is not installed")
+    resolution, duration = MEDIA_SIZES[size]
+    inputs = ["-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={duration}"]
+    if fmt not in AUDIO_FORMATS:
+        inputs = ["-f", "lavfi", "-i", f"testsrc2=size={resolution}:rate=25:duration={duration}"] + (
+            inputs if fmt != "gif" else []
+        )
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", *inputs, "-shortest", "-bitexact", str(path)],
+        check=True,
+    )
+
+
+def write_drawio(path: Path, fmt: str, size: str):
+    path.write_text(synthetic_drawio({"small": 10, "medium": 100, "large": 1000}[size]))
+
+
+# Generator used for each converter's inputs
+GENERATORS = {
+    "PillowConverter": ("image", write_image),
+    "PandasConverter": ("table", write_table),
+    "FFmpegConverter": ("media", write_media),
+    "DrawioConverter": ("diagram", write_drawio),
+}
+
+
+def fixture(fixtures_dir: Path, converter_name: str, fmt: str, size: str) -> Path:
+    """
+    Path to the synthetic input for a converter, format and size, generating it if needed.
+
+    Raises:
+        KeyError: If there is no generator for the converter
+        RuntimeError: If a required tool (e.g. ffmpeg) is missing
+    """
+    kind, generate = GENERATORS[converter_name]
+    path = fixtures_dir / kind / f"{size}.{fmt}"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f".{path.name}")
+        try:
+            generate(partial, fmt, size)
+            partial.rename(path)
+        finally:
+            partial.unlink(missing_ok=True)
+    return path
@@ -0,0 +1,350 @@
+"""
+End-to-end load test of the Transmute API.
+
+Drives the app built by create_app() through an async HTTP client. The
+target is either the app in-process (httpx ASGI transport, no network) or a
+real server: a URL, or a uvicorn process started by this script. Each
+scenario runs closed-loop at every requested concurrency level, so the level
+where p99 latency degrades is visible in one report.
+
+Scenarios:
+    upload-storm   POST /api/files/ multipart uploads (or raw PUT with --upload-mode raw)
+    image-flood    small PNG -> WebP conversions of one uploaded image
+    option-mix     concurrent PNG -> WebP conversions of one image at different
+                   max_width values; each output is downloaded and a wrong
+                   width counts as an error (needs CONVERSION_WORKERS > 1)
+    batch-zip      POST /api/files/batch downloading a ZIP of large files
+    list-scan      GET /api/files/ and /api/conversions/complete with many stored files
+
+Usage:
+    python benchmarks/loadtest.py --scenario image-flood --concurrency 1,8,32 --duration 20
+    python benchmarks/loadtest.py --serve --scenario upload-storm
+    python benchmarks/loadtest.py --url http://127.0.0.1:3313 --scenario list-scan
+
+Requires httpx (pip install httpx).
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCHMARKS_DIR.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from PIL import Image
+
+from fixtures import synthetic_photo
+
+
+def payload(size_bytes: int, seed: int = 0) -> bytes:
+    """Deterministic incompressible bytes."""
+    return np.random.default_rng(seed).bytes(size_bytes)
+
+
+def png_bytes(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    synthetic_photo(width, height).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def upload(client: httpx.AsyncClient, data: bytes, filename: str, mode: str = "multipart") -> httpx.Response:
+    if mode == "raw":
+        return await client.put("/api/files/", params={"filename": filename}, content=data)
+    return await client.post("/api/files/", files={"file": (filename, data)})
+
+
+async def upload_id(client: httpx.AsyncClient, data: bytes, filename: str) -> str:
+    response = await upload(client, data, filename)
+    response.raise_for_status()
+    return response.json()["metadata"]["id"]
+
+
+class Scenario:
+    """
+    One kind of request. setup() runs once per scenario before measuring;
+    request() is one measured operation and returns (response, bytes moved).
+    """
+    name = ""
+
+    def __init__(self, args):
+        self.args = args
+
+    async def setup(self, client: httpx.AsyncClient):
+        pass
+
+    async def request(self, client: httpx.AsyncClient, seq: int) -> tuple[httpx.Response, int]:
+        raise NotImplementedError
+
+
+class UploadStorm(Scenario):
+    name = "upload-storm"
+
+    async def setup(self, client):
+        self.data = payload(self.args.upload_kib * 1024)
+
+    async def request(self, client, seq):
+        response = await upload(client, self.data, f"load-{seq}.bin", self.args.upload_mode)
+        return response, len(self.data)
+
+
+class ImageFlood(Scenario):
+    name = "image-flood"
+
+    async def setup(self, client):
+        self.file_id = await upload_id(client, png_bytes(640, 480), "flood.png")
+
+    async def request(self, client, seq):
+        response = await client.post("/api/conversions/", json={"id": self.file_id, "output_format": "webp"})
+        return response, len(response.content)
+
+
+class OutputMismatch(Exception):
+    """A response that succeeded with the wrong content."""
+
+
+class OptionMix(Scenario):
+    name = "option-mix"
+    widths = (80, 120, 160, 200)
+
+    async def setup(self, client):
+        self.file_id = await upload_id(client, png_bytes(640, 480), "mix.png")
+
+    async def request(self, client, seq):
+        # Conversions of the same file that differ only in their options
+        width = self.widths[seq % len(self.widths)]
+        response = await client.post("/api/conversions/", json={
+            "id": self.file_id, "output_format": "webp", "image_options": {"max_width": width}
+        })
+        if response.status_code >= 400:
+            return response, 0
+        download = await client.get(f"/api/files/{response.json()['id']}")
+        download.raise_for_status()
+        received = Image.open(io.BytesIO(download.content)).width
+        if received != width:
+            raise OutputMismatch(f"asked for {width}px, got {received}px")
+        return download, len(download.content)
+
+
+class BatchZip(Scenario):
+    name = "batch-zip"
+
+    async def setup(self, client):
+        self.file_ids = [
+            await upload_id(client, payload(self.args.batch_file_mib * 1024 * 1024, seed=i), f"batch-{i}.bin")
+            for i in range(self.args.batch_files)
+        ]
+
+    async def request(self, client, seq):
+        received = 0
+        async with client.stream("POST", "/api/files/batch", json={"file_ids": self.file_ids}) as response:
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+        return response, received
+
+
+class ListScan(Scenario):
+    name = "list-scan"
+
+    async def setup(self, client):
+        data = payload(1024)
+        semaphore = asyncio.Semaphore(16)
+
+        async def seed_file(i):
+            async with semaphore:
+                await upload_id(client, data, f"scan-{i}.bin")
+
+        await asyncio.gather(*(seed_file(i) for i in range(self.args.list_files)))
+
+    async def request(self, client, seq):
+        path = "/api/files/" if seq % 2 == 0 else "/api/conversions/complete"
+        response = await client.get(path)
+        return response, len(response.content)
+
+
+SCENARIOS = {scenario.name: scenario for scenario in [UploadStorm, ImageFlood, OptionMix, BatchZip, ListScan]}
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_level(client: httpx.AsyncClient, scenario: Scenario, concurrency: int, duration: float, max_requests: int | None) -> dict:
+    """Run `concurrency` closed-loop workers for `duration` seconds (or `max_requests` in total)."""
+    latencies, errors, error_samples = [], 0, {}
+    moved_bytes = 0
+    issued = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors, moved_bytes, issued
+        while time.perf_counter() < deadline and (max_requests is None or issued < max_requests):
+            seq = issued
+            issued += 1
+            started = time.perf_counter()
+            try:
+                response, transferred = await scenario.request(client, seq)
+                failed = response.status_code >= 400
+                detail = f"HTTP {response.status_code}"
+            except Exception as e:
+                failed, transferred, detail = True, 0, type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            moved_bytes += transferred
+            if failed:
+                errors += 1
+                error_samples[detail] = error_samples.get(detail, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "throughput_mb_s": moved_bytes / elapsed / 1e6 if elapsed else 0.0,
+        "error_rate": errors / len(latencies) if latencies else 0.0,
+        "errors": error_samples,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p90": percentile(latencies, 90) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": (latencies[-1] if latencies else float("nan")) * 1000,
+        },
+    }
+
+
+# Every request comes from this one client, so the per-client admission
+# limit is lifted unless set explicitly; the global watermarks still apply
+SERVER_ENV = {"ADMISSION_MAX_CLIENT_REQUESTS": os.environ.get("ADMISSION_MAX_CLIENT_REQUESTS", "0")}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(data_dir: str, workers: int) -> tuple[subprocess.Popen, str]:
+    """Start uvicorn on a free local port with its own data directory."""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:create_app", "--factory",
+         "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        # WORKERS tells each worker how many there are, so they share state
+        env={**os.environ, **SERVER_ENV, "DATA_DIR": data_dir, "WORKERS": str(workers)},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/health/live", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("uvicorn did not become ready within 60s")
+
+
+def make_client(args) -> tuple[httpx.AsyncClient, subprocess.Popen | None]:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        return httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout, follow_redirects=True), None
+    if args.serve:
+        process, base_url = start_server(args.data_dir, args.workers)
+        return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout, follow_redirects=True), process
+
+    # In-process: settings are read on first import, so point them at the data dir first
+    os.environ.update(SERVER_ENV, DATA_DIR=args.data_dir)
+    from main import create_app
+    transport = httpx.ASGITransport(app=create_app())
+    return httpx.AsyncClient(transport=transport, base_url="http://transmute", timeout=timeout, follow_redirects=True), None
+
+
+def print_report(results: list[dict]):
+    print(f"{'scenario':<14}{'conc':>6}{'reqs':>8}{'req/s':>10}{'MB/s':>9}{'err %':>8}"
+          f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for r in results:
+        lat = r["latency_ms"]
+        print(f"{r['scenario']:<14}{r['concurrency']:>6}{r['requests']:>8}{r['throughput_rps']:>10.1f}"
+              f"{r['throughput_mb_s']:>9.1f}{r['error_rate'] * 100:>8.1f}"
+              f"{lat['p50']:>10.1f}{lat['p90']:>10.1f}{lat['p99']:>10.1f}{lat['max']:>10.1f}")
+        if r["errors"]:
+            print(f"{'':<14}errors: {r['errors']}")
+
+
+async def run(args) -> list[dict]:
+    client, server = make_client(args)
+    results = []
+    try:
+        async with client:
+            for name in args.scenarios:
+                scenario = SCENARIOS[name](args)
+                await scenario.setup(client)
+                for concurrency in args.concurrency:
+                    if args.warmup:
+                        await run_level(client, scenario, concurrency, args.warmup, None)
+                    results.append(await run_level(client, scenario, concurrency, args.duration, args.requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", dest="scenarios", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per concurrency level")
+    parser.add_argument("--requests", type=int, help="Stop each level after this many requests")
+    parser.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds before each level")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request timeout in seconds")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Load an already running server at this base URL")
+    target.add_argument("--serve", action="store_true", help="Start a local uvicorn server to load")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes with --serve")
+    parser.add_argument("--data-dir", default=None, help="Data directory for in-process or --serve (default: a temp dir)")
+    parser.add_argument("--upload-kib", type=int, default=1024, help="upload-storm file size")
+    parser.add_argument("--upload-mode", choices=["multipart", "raw"], default="multipart")
+    parser.add_argument("--batch-files", type=int, default=8, help="batch-zip files per ZIP")
+    parser.add_argument("--batch-file-mib", type=int, default=8, help="batch-zip size of each file")
+    parser.add_argument("--list-files", type=int, default=500, help="list-scan stored files")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    args.data_dir = args.data_dir or tempfile.mkdtemp(prefix="transmute-loadtest-")
+
+    results = asyncio.run(run(args))
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
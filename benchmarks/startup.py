@@ -0,0 +1,100 @@
+"""
+Cold start time of the API, checked against a budget.
+
+Starts a fresh interpreter that imports main and builds the app with
+create_app(), which is what every uvicorn worker does on startup, and
+compares the median over several runs with the budget. It also fails if a
+converter dependency was imported during startup: those load on a
+converter's first conversion (see backend/converters/manifest.py).
+
+Usage:
+    python benchmarks/startup.py [--budget-ms 1000] [--runs 5] [--importtime]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Modules that only the converter implementations need
+CONVERTER_DEPENDENCIES = ["pandas", "pyarrow", "numpy", "yaml", "PIL.Image", "pillow_heif", "cairosvg"]
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from main import create_app
+create_app()
+print(json.dumps({
+    "create_app_seconds": time.perf_counter() - started,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % CONVERTER_DEPENDENCIES
+
+
+def run_once(data_dir: str, extra_args: tuple = ()) -> tuple[float, dict, str]:
+    """Start one interpreter; returns (wall seconds, child report, stderr)."""
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, *extra_args, "-c", CHILD],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATA_DIR": data_dir},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - started, json.loads(process.stdout.strip().splitlines()[-1]), process.stderr
+
+
+def print_slowest_imports(data_dir: str, count: int):
+    """Print the imports with the largest cumulative time (python -X importtime)."""
+    _, _, stderr = run_once(data_dir, ("-X", "importtime"))
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    print("\nSlowest imports (cumulative):")
+    for cumulative, name in sorted(rows, reverse=True)[:count]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1000, help="Allowed median cold start, interpreter start included")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="Also list the slowest imports")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="transmute-startup-") as data_dir:
+        # First run warms the OS file cache and creates the database tables
+        run_once(data_dir)
+        runs = [run_once(data_dir) for _ in range(args.runs)]
+        if args.importtime:
+            print_slowest_imports(data_dir, 20)
+
+    wall_ms = statistics.median(wall for wall, _, _ in runs) * 1000
+    create_app_ms = statistics.median(report["create_app_seconds"] for _, report, _ in runs) * 1000
+    loaded = sorted({name for _, report, _ in runs for name in report["loaded"]})
+    print(f"\nCold start: {wall_ms:.0f} ms median ({create_app_ms:.0f} ms import + create_app), budget {args.budget_ms:.0f} ms")
+
+    failures = []
+    if wall_ms > args.budget_ms:
+        failures.append(f"cold start {wall_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    if loaded:
+        failures.append(f"converter dependencies imported at startup: {', '.join(loaded)}")
+    if failures:
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,19 @@ export DISPLAY=:99
 # Give Xvfb time to start
 sleep 2
 
-# Run the Python application
-python backend/main.py
+# Run the Python application, forwarding stop signals so it can finish
+# in-flight requests before exiting
+python backend/main.py &
+APP_PID=$!
+trap 'kill -TERM $APP_PID 2>/dev/null' TERM INT
+STATUS=0
+wait $APP_PID || STATUS=$?
+# wait returns as soon as a trapped signal arrives; wait for the exit itself
+if kill -0 $APP_PID 2>/dev/null; then
+    STATUS=0
+    wait $APP_PID || STATUS=$?
+fi
 
 # Cleanup on exit
 kill $XVFB_PID 2>/dev/null || true
+exit $STATUS